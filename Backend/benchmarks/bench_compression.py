@@ -0,0 +1,185 @@
+"""
+Bytes on the wire and CPU cost of response compression per encoding.
+
+Usage:
+    python benchmarks/bench_compression.py --runs 50
+    python benchmarks/bench_compression.py --gzip-levels 1 6 9 --brotli-qualities 1 4 --zstd-levels 1 3
+
+Responses are produced by small ASGI apps wrapped in CompressionMiddleware
+and driven directly (no HTTP client, no database):
+
+    student           GET /students/{id} (below COMPRESSION_MINIMUM_SIZE)
+    students_50       GET /students/?limit=50
+    students_1000     GET /students/?limit=1000
+    marks_1000        GET /marks/?limit=1000
+    marks_export      GET /marks/export, NDJSON streamed in batches of 1000
+
+Rows come from the synthetic generator. For each payload and encoding the
+report has the bytes sent, the compression ratio and the CPU time (process
+time) per request, plus the CPU added over the uncompressed response.
+Encodings whose package is not installed are skipped.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime
+
+from bson import ObjectId
+from fastapi.responses import StreamingResponse
+
+from _common import print_report
+from config import settings
+from routes.marks import marks_doc_to_dict, marks_doc_to_response
+from routes.students import student_doc_to_dict, student_doc_to_response
+from services.export_service import MARKS_EXPORT_COLUMNS, marks_export_row, stream_export
+from services.synthetic_data import SyntheticDataGenerator
+from utils import compression
+from utils.compression import CompressionMiddleware
+from utils.fast_json import FastJSONResponse, list_response
+
+
+class ListCursor:
+    """Just enough of a Motor cursor for stream_export."""
+    
+    def __init__(self, docs: list):
+        self._docs = docs
+    
+    def batch_size(self, size: int):
+        return self
+    
+    def __aiter__(self):
+        return self._iterate()
+    
+    async def _iterate(self):
+        for doc in self._docs:
+            yield doc
+
+
+def build_docs(count: int) -> tuple:
+    """`count` student documents and their marks documents (3 terms)."""
+    generator = SyntheticDataGenerator(terms=3)
+    now = datetime.utcnow()
+    students, marks = [], []
+    for number in range(1, count + 1):
+        student, student_marks = generator.student_with_marks(number, now)
+        for doc in [student] + student_marks:
+            doc["_id"] = ObjectId()
+        students.append(student)
+        marks.extend(student_marks)
+    return students, marks
+
+
+def payload_apps(students: list, marks: list) -> dict:
+    """ASGI apps returning each benchmarked response."""
+    def app_for(make_response):
+        async def app(scope, receive, send):
+            await make_response()(scope, receive, send)
+        return CompressionMiddleware(app)
+    
+    return {
+        "student": app_for(lambda: FastJSONResponse(student_doc_to_dict(students[0]))),
+        "students_50": app_for(lambda: list_response(students[:50], student_doc_to_dict, student_doc_to_response)),
+        "students_1000": app_for(lambda: list_response(students[:1000], student_doc_to_dict, student_doc_to_response)),
+        "marks_1000": app_for(lambda: list_response(marks[:1000], marks_doc_to_dict, marks_doc_to_response)),
+        "marks_export": app_for(lambda: StreamingResponse(
+            stream_export(ListCursor(marks), marks_export_row, MARKS_EXPORT_COLUMNS, "ndjson", 1000),
+            media_type="application/x-ndjson"
+        )),
+    }
+
+
+async def request(app, accept_encoding: str) -> tuple:
+    """Send one GET through `app`; return (bytes sent, Content-Encoding)."""
+    scope = {
+        "type": "http", "method": "GET", "path": "/", "query_string": b"",
+        "headers": [(b"accept-encoding", accept_encoding.encode())] if accept_encoding else []
+    }
+    sent = 0
+    content_encoding = None
+    
+    async def receive():
+        # StreamingResponse listens for a disconnect until the body is sent
+        await asyncio.Event().wait()
+    
+    async def send(message):
+        nonlocal sent, content_encoding
+        if message["type"] == "http.response.start":
+            for name, value in message["headers"]:
+                if name == b"content-encoding":
+                    content_encoding = value.decode()
+        else:
+            sent += len(message.get("body", b""))
+    
+    await app(scope, receive, send)
+    return sent, content_encoding
+
+
+async def measure(app, accept_encoding: str, runs: int) -> dict:
+    """Median CPU time per request and the bytes sent."""
+    samples = []
+    for _ in range(runs):
+        start = time.process_time()
+        sent, content_encoding = await request(app, accept_encoding)
+        samples.append(time.process_time() - start)
+    return {
+        "content_encoding": content_encoding,
+        "bytes": sent,
+        "cpu_ms": round(statistics.median(samples) * 1000, 3)
+    }
+
+
+def configurations(args) -> list:
+    """(label, Accept-Encoding, settings overrides) of every measured variant."""
+    settings.COMPRESSION_ENCODINGS = "br,zstd,gzip"
+    compression.available_encodings.cache_clear()
+    installed = compression.available_encodings()
+    
+    variants = [("identity", "", {})]
+    variants += [(f"gzip-{level}", "gzip", {"COMPRESSION_GZIP_LEVEL": level}) for level in args.gzip_levels]
+    if "br" in installed:
+        variants += [(f"br-{quality}", "br", {"COMPRESSION_BROTLI_QUALITY": quality})
+                     for quality in args.brotli_qualities]
+    if "zstd" in installed:
+        variants += [(f"zstd-{level}", "zstd", {"COMPRESSION_ZSTD_LEVEL": level}) for level in args.zstd_levels]
+    return variants
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=2000, help="Students generated (3 marks records each)")
+    parser.add_argument("--runs", type=int, default=30, help="Measured requests per payload and encoding")
+    parser.add_argument("--gzip-levels", type=int, nargs="+", default=[1, 6])
+    parser.add_argument("--brotli-qualities", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--zstd-levels", type=int, nargs="+", default=[1, 3])
+    args = parser.parse_args()
+    
+    settings.FAST_JSON_RESPONSES = True
+    students, marks = build_docs(args.students)
+    apps = payload_apps(students, marks)
+    variants = configurations(args)
+    
+    results = []
+    for payload, app in apps.items():
+        entry = {"payload": payload, "encodings": {}}
+        baseline = None
+        for label, accept_encoding, overrides in variants:
+            for name, value in overrides.items():
+                setattr(settings, name, value)
+            result = await measure(app, accept_encoding, args.runs)
+            if baseline is None:
+                baseline = result
+            result["ratio"] = round(baseline["bytes"] / result["bytes"], 2) if result["bytes"] else None
+            result["cpu_ms_added"] = round(result["cpu_ms"] - baseline["cpu_ms"], 3)
+            entry["encodings"][label] = result
+        results.append(entry)
+    
+    print_report({
+        "benchmark": "compression",
+        "minimum_size": settings.COMPRESSION_MINIMUM_SIZE,
+        "results": results
+    })
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,276 @@
+"""
+Load test the REST endpoints of main.app at configurable data scales.
+
+Usage:
+    python benchmarks/bench_endpoints.py --scales 1000 100000 --concurrency 50 --duration 10
+    python benchmarks/bench_endpoints.py --backend memory --scales 500 --output before.json
+    python benchmarks/bench_endpoints.py --compare before.json
+    python benchmarks/bench_endpoints.py --endpoints students summary --if-none-match
+    python benchmarks/bench_endpoints.py --endpoints student student_marks summary --read-cache off
+
+The app from main.py runs in-process (httpx ASGI transport) against either
+the benchmark database on a local mongod (`--backend mongod`, default) or an
+in-memory Motor-compatible stand-in (`--backend memory`, needs the optional
+mongomock-motor package). For every scale the database is recreated and
+seeded with the synthetic generator (`python -m seed`), then each endpoint
+is driven by `--concurrency` async clients for `--duration` seconds:
+
+    login           POST /auth/login
+    students        GET  /students/?limit=50
+    student         GET  /students/{id}
+    profile         GET  /students/{id}/profile
+    marks           GET  /marks/?limit=50
+    student_marks   GET  /marks/student/{id}
+    summary         GET  /marks/stats/summary
+
+With `--if-none-match` the clients poll like dashboards do: every request
+sends the ETag of the last response for its URL, so unchanged data is
+answered with 304 (counted under "statuses").
+
+`--read-cache` selects the read cache backend (`off` disables it); the hit
+rate of the cached reads is reported per endpoint. Students are picked at
+random, so at large scales most student and student_marks reads miss.
+
+The JSON report (throughput and p50/p95/p99 latency per endpoint) includes
+the git commit; `--compare` adds the change relative to an earlier report.
+The in-memory stand-in is only useful for spotting Python-side regressions:
+it is single-threaded, scans for every query and does not support the
+profile's $lookup pipeline, so `profile` is skipped there.
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import time
+from collections import Counter
+from pathlib import Path
+
+import httpx
+
+from _common import BACKEND_DIR, BENCH_DATABASE_NAME, BENCH_MONGODB_URI, summarize, print_report
+import database
+from config import settings
+from main import app
+from services.counter_service import format_student_id
+from services.seed_service import SeedService
+from services.stats_service import StatsService
+from services.suggest_service import student_suggest_index
+from utils.jwt import create_access_token
+from utils.read_cache import LocalSharedCacheBackend, MemoryCacheBackend, read_cache
+
+ENDPOINTS = ["login", "students", "student", "profile", "marks", "student_marks", "summary"]
+
+# Endpoints the in-memory stand-in cannot serve, with the reason
+MEMORY_UNSUPPORTED = {
+    "profile": "mongomock does not support $lookup with a pipeline"
+}
+
+
+def endpoint_request(name: str, rng: random.Random, student_ids: list) -> tuple:
+    """Return (method, url, json body) of one request to an endpoint."""
+    if name == "login":
+        return "POST", "/auth/login", {"username": settings.ADMIN_USERNAME, "password": settings.ADMIN_PASSWORD}
+    if name == "students":
+        return "GET", "/students/?limit=50", None
+    if name == "student":
+        return "GET", f"/students/{rng.choice(student_ids)}", None
+    if name == "profile":
+        return "GET", f"/students/{rng.choice(student_ids)}/profile", None
+    if name == "marks":
+        return "GET", "/marks/?limit=50", None
+    if name == "student_marks":
+        return "GET", f"/marks/student/{rng.choice(student_ids)}", None
+    return "GET", "/marks/stats/summary", None
+
+
+def configure_read_cache(backend: str):
+    """Enable the read cache with a fresh `backend`, or disable it ("off")."""
+    read_cache.enabled = backend != "off"
+    if backend == "local-shared":
+        read_cache.backend = LocalSharedCacheBackend()
+    else:
+        read_cache.backend = MemoryCacheBackend(settings.READ_CACHE_SIZE)
+
+
+def connect(backend: str, scale: int):
+    """Point the app's database at a fresh benchmark database."""
+    if backend == "memory":
+        import mongomock_motor
+        
+        # mongomock-motor returns a synchronous collection from with_options;
+        # there is a single in-memory "node", so read preferences do not matter
+        mongomock_motor.AsyncMongoMockCollection.with_options = lambda self, **kwargs: self
+        client = mongomock_motor.AsyncMongoMockClient()
+    else:
+        settings.MONGODB_URI = BENCH_MONGODB_URI
+        database.connect_client()
+        client = database.db_instance.client
+    
+    database.db_instance.client = client
+    database.db_instance.db = client[f"{BENCH_DATABASE_NAME}_{scale}"]
+
+
+async def prepare(backend: str, scale: int, terms: int, seed: int):
+    """Create and seed the database for one scale, like a deploy plus seed run."""
+    connect(backend, scale)
+    await database.db_instance.client.drop_database(database.db_instance.db.name)
+    
+    seed_service = SeedService(seed=seed)
+    await seed_service.seed_admin_user()
+    # Bulk load before creating indexes, which is faster on a fresh database
+    await seed_service.seed_synthetic(scale, terms=terms)
+    await database.create_indexes()
+    await StatsService().rebuild()
+    await student_suggest_index.load()
+
+
+async def drive(client: httpx.AsyncClient, name: str, concurrency: int, duration: float,
+                warmup: int, student_ids: list, if_none_match: bool = False) -> dict:
+    """Send requests to one endpoint from `concurrency` clients for `duration` seconds."""
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'bench', 'role': 'ADMIN'})}"}
+    rng = random.Random(name)
+    etags = {}
+    
+    async def send(method: str, url: str, body) -> httpx.Response:
+        request_headers = headers
+        if if_none_match and url in etags:
+            request_headers = {**headers, "If-None-Match": etags[url]}
+        response = await client.request(method, url, json=body, headers=request_headers)
+        if if_none_match and "etag" in response.headers:
+            etags[url] = response.headers["etag"]
+        return response
+    
+    for _ in range(warmup):
+        await send(*endpoint_request(name, rng, student_ids))
+    
+    read_cache.reset_stats()
+    latencies = []
+    statuses = Counter()
+    deadline = time.perf_counter() + duration
+    
+    async def worker():
+        while time.perf_counter() < deadline:
+            method, url, body = endpoint_request(name, rng, student_ids)
+            start = time.perf_counter()
+            response = await send(method, url, body)
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] += 1
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    
+    return {
+        "requests": len(latencies),
+        "errors": sum(count for code, count in statuses.items() if code >= 400),
+        "statuses": dict(statuses),
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "latency": summarize(latencies),
+        "read_cache_hit_rate": read_cache.stats()["hitRate"]
+    }
+
+
+def git_commit() -> str:
+    """Short hash of the checked out commit, if available."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: list, baseline: dict) -> list:
+    """Relative change of throughput and p50/p99 latency against an earlier report."""
+    earlier = {
+        (entry["scale"], name): result
+        for entry in baseline.get("results", [])
+        for name, result in entry["endpoints"].items()
+        if "latency" in result
+    }
+    changes = []
+    for entry in results:
+        for name, result in entry["endpoints"].items():
+            before = earlier.get((entry["scale"], name))
+            if before is None or "latency" not in result:
+                continue
+            change = {"scale": entry["scale"], "endpoint": name}
+            for key, now, then in (
+                ("requests_per_second", result["requests_per_second"], before["requests_per_second"]),
+                ("p50_ms", result["latency"]["p50_ms"], before["latency"]["p50_ms"]),
+                ("p99_ms", result["latency"]["p99_ms"], before["latency"]["p99_ms"]),
+            ):
+                change[key] = f"{(now - then) / then * 100:+.1f}%" if then else None
+            changes.append(change)
+    return changes
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["mongod", "memory"], default="mongod")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1000, 10000], help="Students per run")
+    parser.add_argument("--terms", type=int, default=3, help="Marks records per student")
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=ENDPOINTS)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per endpoint")
+    parser.add_argument("--warmup", type=int, default=10, help="Unrecorded requests per endpoint")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, help="Also write the report to this file")
+    parser.add_argument("--compare", type=Path, help="Earlier report to compare against")
+    parser.add_argument("--if-none-match", action="store_true", help="Poll with the last ETag per URL")
+    parser.add_argument("--read-cache", choices=["off", "memory", "local-shared"], default="memory",
+                        help="Read cache backend")
+    args = parser.parse_args()
+    
+    if args.backend == "memory":
+        try:
+            import mongomock_motor  # noqa: F401
+        except ImportError:
+            parser.error("--backend memory needs the mongomock-motor package")
+    
+    results = []
+    for scale in args.scales:
+        start = time.perf_counter()
+        configure_read_cache(args.read_cache)
+        await prepare(args.backend, scale, args.terms, args.seed)
+        entry = {"scale": scale, "seed_seconds": round(time.perf_counter() - start, 1), "endpoints": {}}
+        student_ids = [format_student_id(n) for n in range(1, scale + 1)]
+        
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            for name in args.endpoints:
+                if args.backend == "memory" and name in MEMORY_UNSUPPORTED:
+                    entry["endpoints"][name] = {"skipped": MEMORY_UNSUPPORTED[name]}
+                    continue
+                entry["endpoints"][name] = await drive(
+                    client, name, args.concurrency, args.duration, args.warmup, student_ids,
+                    args.if_none_match
+                )
+        
+        results.append(entry)
+        database.db_instance.client.close()
+    
+    report = {
+        "benchmark": "endpoints",
+        "commit": git_commit(),
+        "backend": args.backend,
+        "terms": args.terms,
+        "concurrency": args.concurrency,
+        "duration_seconds": args.duration,
+        "if_none_match": args.if_none_match,
+        "read_cache": args.read_cache,
+        "results": results
+    }
+    if args.compare:
+        report["compared_to"] = str(args.compare)
+        report["changes"] = compare(results, json.loads(args.compare.read_text()))
+    
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, default=str))
+    print_report(report)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,139 @@
+"""
+Measure backend startup import time with `python -X importtime`.
+
+Usage:
+    python benchmarks/bench_import_time.py --runs 5
+    python benchmarks/bench_import_time.py --write-baseline import_baseline.json
+    python benchmarks/bench_import_time.py --baseline import_baseline.json --tolerance 0.25
+
+Each entry point (main.py and the serverless api/index.py) is imported in
+fresh interpreters; the median total import time and the slowest top-level
+imports are reported. No database is needed: nothing connects on import.
+
+The script exits with status 1 when a dependency that should be loaded
+lazily (passlib, python-jose, Motor, openpyxl) is imported at startup, or,
+with --baseline, when an entry point got slower than the baseline by more
+than the tolerance. CI can run it on every change and keep the baseline
+from the main branch.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+from _common import BACKEND_DIR, print_report
+
+API_DIR = BACKEND_DIR.parent / "api"
+
+# Entry point name -> code that imports it
+ENTRY_POINTS = {
+    "main": "import main",
+    "api": f"import sys; sys.path.insert(0, {str(API_DIR)!r}); import index",
+}
+
+# Dependencies that must only be imported where they are first used
+LAZY_MODULES = ("passlib", "jose", "motor", "openpyxl")
+
+
+def parse_importtime(stderr: str) -> list:
+    """
+    Parse `-X importtime` output.
+    
+    Returns:
+        (module, self_us, cumulative_us, depth) tuples in import order
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        # One space after "|", then two per nesting level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return entries
+
+
+def import_once(code: str) -> list:
+    """Import an entry point in a fresh interpreter and return its import times."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BACKEND_DIR,
+        env=dict(os.environ, PYTHONPATH=str(BACKEND_DIR)),
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Import failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def measure(code: str, runs: int, top: int) -> dict:
+    """Import an entry point `runs` times and summarize the import times."""
+    # Warm-up run so every sample reads cached bytecode
+    import_once(code)
+    
+    totals = []
+    entries = []
+    for _ in range(runs):
+        entries = import_once(code)
+        totals.append(sum(e[2] for e in entries if e[3] == 0) / 1000)
+    
+    modules = {e[0] for e in entries}
+    # Modules imported directly by the entry point (or by `-c` code)
+    top_level = sorted((e for e in entries if e[3] <= 1 and e[0] not in ("main", "index")),
+                       key=lambda e: e[2], reverse=True)
+    return {
+        "total_ms": round(statistics.median(totals), 1),
+        "min_ms": round(min(totals), 1),
+        "max_ms": round(max(totals), 1),
+        "modules": len(modules),
+        "slowest": [{"module": e[0], "cumulative_ms": round(e[2] / 1000, 1)} for e in top_level[:top]],
+        "eager_lazy_modules": [m for m in LAZY_MODULES if m in modules]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Slowest direct imports to report")
+    parser.add_argument("--baseline", type=Path, help="Fail if slower than this baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown vs baseline (0.25 = 25%%)")
+    parser.add_argument("--write-baseline", type=Path, help="Save the measured totals as a baseline")
+    args = parser.parse_args()
+    
+    results = {name: measure(code, args.runs, args.top) for name, code in ENTRY_POINTS.items()}
+    failures = []
+    
+    for name, result in results.items():
+        if result["eager_lazy_modules"]:
+            failures.append(f"{name} imports {', '.join(result['eager_lazy_modules'])} at startup")
+    
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        for name, result in results.items():
+            if name not in baseline:
+                continue
+            limit = baseline[name]["total_ms"] * (1 + args.tolerance)
+            result["baseline_ms"] = baseline[name]["total_ms"]
+            if result["total_ms"] > limit:
+                failures.append(f"{name} import time {result['total_ms']} ms exceeds {limit:.1f} ms")
+    
+    if args.write_baseline:
+        args.write_baseline.write_text(json.dumps(
+            {name: {"total_ms": result["total_ms"]} for name, result in results.items()}, indent=2
+        ))
+    
+    print_report({
+        "benchmark": "import_time",
+        "python": sys.version.split()[0],
+        "results": results,
+        "failures": failures
+    })
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
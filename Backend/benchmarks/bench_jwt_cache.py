@@ -0,0 +1,64 @@
+"""
+Microbenchmark of per-request authentication overhead with and without the
+verified-token cache.
+
+Usage:
+    python benchmarks/bench_jwt_cache.py --requests 20000 --tokens 50
+
+Simulates a stream of requests where `--tokens` distinct sessions each send
+their token repeatedly, and runs the get_current_user dependency for every
+request. No database is needed.
+"""
+import argparse
+import asyncio
+import time
+
+from fastapi.security import HTTPAuthorizationCredentials
+
+from _common import print_report
+from config import settings
+from utils.jwt import create_access_token, get_current_user, token_cache
+
+
+async def run(tokens: list, requests: int, cache_enabled: bool) -> dict:
+    """Authenticate `requests` requests round-robin over `tokens`."""
+    settings.JWT_CACHE_ENABLED = cache_enabled
+    token_cache.clear()
+    credentials = [
+        HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+        for token in tokens
+    ]
+    
+    start = time.perf_counter()
+    for i in range(requests):
+        await get_current_user(credentials[i % len(credentials)])
+    elapsed = time.perf_counter() - start
+    
+    return {
+        "cache_enabled": cache_enabled,
+        "requests": requests,
+        "us_per_request": round(elapsed / requests * 1_000_000, 2),
+        "cache": token_cache.stats()
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--tokens", type=int, default=50)
+    args = parser.parse_args()
+    
+    tokens = [
+        create_access_token({"sub": f"user{i}", "role": "ADMIN", "user_id": str(i)})
+        for i in range(args.tokens)
+    ]
+    
+    results = [
+        await run(tokens, args.requests, cache_enabled=False),
+        await run(tokens, args.requests, cache_enabled=True)
+    ]
+    print_report({"benchmark": "jwt_cache", "results": results})
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
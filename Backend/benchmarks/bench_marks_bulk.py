@@ -0,0 +1,131 @@
+"""
+Benchmark marks ingestion: per-row POST /marks/ vs POST /marks/bulk.
+
+Usage:
+    python benchmarks/bench_marks_bulk.py --rows 100000 --per-row-sample 2000
+
+Runs the FastAPI app in-process (httpx ASGI transport) against the
+benchmark database. The per-row path is measured on a sample and
+extrapolated to `--rows`; the bulk path ingests all rows for real, sent in
+requests of `--request-size` rows.
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime
+
+import httpx
+
+from _common import get_bench_database, print_report
+import database
+from config import settings
+from main import app
+from utils.jwt import create_access_token
+
+SUBJECTS = ["Mathematics", "Science", "English", "Sinhala", "History", "Geography", "ICT", "Art"]
+TERMS = ["Term 1", "Term 2", "Term 3"]
+
+
+def generate_rows(count: int, students: int, offset: int = 0):
+    """Generate unique (studentId, term, year) marks rows."""
+    rng = random.Random(count)
+    rows = []
+    for i in range(offset, offset + count):
+        student_number = i % students + 1
+        slot = i // students
+        rows.append({
+            "studentId": f"STU-{student_number:03d}",
+            "term": TERMS[slot % len(TERMS)],
+            "year": 2000 + slot // len(TERMS),
+            "subjects": [
+                {"subjectName": name, "mark": round(rng.uniform(35, 100), 1)}
+                for name in rng.sample(SUBJECTS, 4)
+            ]
+        })
+    return rows
+
+
+async def reset(db, students: int):
+    """Recreate the students/marks collections with the production indexes."""
+    for name in ("students", "marks", "marks_stats"):
+        await db[name].drop()
+    await database.create_indexes()
+    now = datetime.utcnow()
+    await db["students"].insert_many([
+        {
+            "studentId": f"STU-{i:03d}",
+            "name": f"Bench Student {i}",
+            "grade": str(8 + i % 5),
+            "mobileNumbers": [],
+            "isActive": True,
+            "createdAt": now,
+            "updatedAt": now
+        }
+        for i in range(1, students + 1)
+    ])
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--students", type=int, default=20000)
+    parser.add_argument("--per-row-sample", type=int, default=2000)
+    parser.add_argument("--request-size", type=int, default=settings.MARKS_BULK_MAX_ROWS)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    
+    db = get_bench_database()
+    database.db_instance.db = db
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'bench', 'role': 'ADMIN'})}"}
+    transport = httpx.ASGITransport(app=app)
+    
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        # Per-row ingestion, sampled
+        await reset(db, args.students)
+        sample = generate_rows(args.per_row_sample, args.students)
+        semaphore = asyncio.Semaphore(args.concurrency)
+        
+        async def post_row(row):
+            async with semaphore:
+                response = await client.post("/marks/", json=row, headers=headers)
+                response.raise_for_status()
+        
+        start = time.perf_counter()
+        await asyncio.gather(*(post_row(row) for row in sample))
+        per_row_seconds = time.perf_counter() - start
+        
+        # Bulk ingestion of every row
+        await reset(db, args.students)
+        rows = generate_rows(args.rows, args.students)
+        inserted = 0
+        start = time.perf_counter()
+        for offset in range(0, len(rows), args.request_size):
+            response = await client.post(
+                "/marks/bulk", json=rows[offset:offset + args.request_size], headers=headers
+            )
+            response.raise_for_status()
+            inserted += response.json()["inserted"]
+        bulk_seconds = time.perf_counter() - start
+    
+    for name in ("students", "marks", "marks_stats"):
+        await db[name].drop()
+    
+    print_report({
+        "benchmark": "marks_bulk",
+        "rows": args.rows,
+        "per_row": {
+            "sampled_rows": args.per_row_sample,
+            "rows_per_second": round(args.per_row_sample / per_row_seconds, 1),
+            "estimated_seconds_for_all_rows": round(per_row_seconds / args.per_row_sample * args.rows, 2)
+        },
+        "bulk": {
+            "inserted": inserted,
+            "rows_per_second": round(args.rows / bulk_seconds, 1),
+            "seconds": round(bulk_seconds, 2)
+        }
+    })
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,102 @@
+"""
+Benchmark /marks/stats/summary: legacy Python aggregation vs the $facet
+pipeline vs the marks_stats rollup read.
+
+Usage:
+    python benchmarks/bench_marks_summary.py --sizes 10000 100000 1000000
+
+Each size is seeded into a fresh `marks` collection in the benchmark database.
+The legacy implementation is reproduced here (to_list + nested loop + two
+distinct calls) so both paths run against the same data.
+"""
+import argparse
+import asyncio
+import random
+from datetime import datetime
+
+from _common import get_bench_database, summarize, time_async, print_report
+import database
+from services.stats_service import StatsService, build_marks_summary_pipeline
+
+SUBJECTS = ["Mathematics", "Science", "English", "Sinhala", "History", "Geography", "ICT", "Art"]
+TERMS = ["Term 1", "Term 2", "Term 3"]
+
+
+async def seed_marks(collection, size: int, chunk_size: int = 10000):
+    """Insert `size` synthetic marks documents."""
+    await collection.drop()
+    rng = random.Random(size)
+    now = datetime.utcnow()
+    
+    for start in range(0, size, chunk_size):
+        docs = []
+        for i in range(start, min(start + chunk_size, size)):
+            docs.append({
+                "studentId": f"STU-{i // 6 + 1:03d}",
+                "term": TERMS[i % len(TERMS)],
+                "year": 2020 + (i // 3) % 6,
+                "subjects": [
+                    {"subjectName": name, "mark": round(rng.uniform(35, 100), 1), "isActive": True}
+                    for name in rng.sample(SUBJECTS, 4)
+                ],
+                "isActive": rng.random() > 0.05,
+                "createdAt": now,
+                "updatedAt": now
+            })
+        await collection.insert_many(docs, ordered=False)
+
+
+async def legacy_summary(collection):
+    """The pre-pipeline implementation (capped at 10,000 documents)."""
+    marks = await collection.find({"isActive": True}).to_list(length=10000)
+    total_marks = 0
+    subject_count = 0
+    for mark in marks:
+        for subject in mark.get("subjects", []):
+            if subject.get("isActive", True):
+                total_marks += subject["mark"]
+                subject_count += 1
+    await collection.distinct("term")
+    await collection.distinct("year")
+    return len(marks), subject_count
+
+
+async def pipeline_summary(collection):
+    """The aggregation pipeline used by the route."""
+    return await collection.aggregate(build_marks_summary_pipeline()).to_list(length=1)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+    
+    db = get_bench_database()
+    database.db_instance.db = db
+    collection = db["marks"]
+    report = {"benchmark": "marks_summary", "results": []}
+    
+    for size in args.sizes:
+        await seed_marks(collection, size)
+        legacy = await time_async(lambda: legacy_summary(collection), args.runs)
+        pipeline = await time_async(lambda: pipeline_summary(collection), args.runs)
+        
+        stats_service = StatsService()
+        await stats_service.rebuild()
+        rollup = await time_async(stats_service.get_summary, args.runs)
+        
+        report["results"].append({
+            "documents": size,
+            "legacy": summarize(legacy),
+            "pipeline": summarize(pipeline),
+            "rollup": summarize(rollup)
+        })
+    
+    await collection.drop()
+    await db["marks_stats"].drop()
+    print_report(report)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
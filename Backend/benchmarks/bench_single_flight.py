@@ -0,0 +1,111 @@
+"""
+Dashboard bursts: identical concurrent requests with request coalescing
+(single flight) off and on.
+
+Usage:
+    python benchmarks/bench_single_flight.py --students 10000 --burst 40 --bursts 20
+    python benchmarks/bench_single_flight.py --backend memory --students 500
+
+Every burst sends `--burst` identical requests at once, like a class of
+teachers opening the dashboard together, to each of:
+
+    summary     GET /marks/stats/summary
+    students    GET /students/?limit=50
+
+The database is seeded like bench_endpoints.py (`--backend mongod` or the
+in-memory stand-in). The read cache is disabled so every burst reaches the
+database, and a student is updated between bursts so each burst starts
+with new ETag versions. For each mode the report has the time until the
+whole burst is answered, per-request latency, and how many queries ran and
+how many requests were collapsed into them.
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from _common import summarize, print_report
+from bench_endpoints import prepare
+import database
+from config import settings
+from main import app
+from services.counter_service import format_student_id
+from utils.jwt import create_access_token
+from utils.read_cache import read_cache
+from utils.single_flight import single_flight
+
+ENDPOINTS = {
+    "summary": "/marks/stats/summary",
+    "students": "/students/?limit=50",
+}
+
+
+async def run_bursts(client: httpx.AsyncClient, url: str, burst: int, bursts: int, headers: dict) -> dict:
+    """Send `bursts` bursts of `burst` identical requests to `url`."""
+    burst_times, latencies = [], []
+    
+    async def timed_get():
+        start = time.perf_counter()
+        response = await client.get(url, headers=headers)
+        latencies.append(time.perf_counter() - start)
+        response.raise_for_status()
+    
+    single_flight.reset_stats()
+    for number in range(bursts):
+        # Bump the students version so no burst joins the previous one
+        await client.put(f"/students/{format_student_id(1)}", json={"name": f"Bench Student {number}"}, headers=headers)
+        start = time.perf_counter()
+        await asyncio.gather(*(timed_get() for _ in range(burst)))
+        burst_times.append(time.perf_counter() - start)
+    
+    groups = single_flight.stats()["groups"]
+    entry = next(iter(groups.values()), {"executed": bursts * burst, "collapsed": 0})
+    return {
+        "burst": summarize(burst_times),
+        "latency": summarize(latencies),
+        "queries": entry["executed"],
+        "collapsed": entry["collapsed"]
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["mongod", "memory"], default="mongod")
+    parser.add_argument("--students", type=int, default=10000, help="Students seeded")
+    parser.add_argument("--terms", type=int, default=3, help="Marks records per student")
+    parser.add_argument("--burst", type=int, default=40, help="Identical requests per burst")
+    parser.add_argument("--bursts", type=int, default=20, help="Measured bursts per endpoint and mode")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    
+    await prepare(args.backend, args.students, args.terms, args.seed)
+    read_cache.enabled = False
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'bench', 'role': 'ADMIN'})}"}
+    
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for name, url in ENDPOINTS.items():
+            entry = {"endpoint": name, "url": url}
+            for mode in ("off", "on"):
+                single_flight.enabled = mode == "on"
+                entry[mode] = await run_bursts(client, url, args.burst, args.bursts, headers)
+            off, on = entry["off"]["burst"]["p50_ms"], entry["on"]["burst"]["p50_ms"]
+            entry["burst_speedup"] = round(off / on, 1) if on else None
+            results.append(entry)
+    
+    database.db_instance.client.close()
+    print_report({
+        "benchmark": "single_flight",
+        "backend": args.backend,
+        "students": args.students,
+        "etags": settings.ETAGS_ENABLED,
+        "burst": args.burst,
+        "bursts": args.bursts,
+        "results": results
+    })
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,168 @@
+"""
+Benchmark GET /students/{id}/profile: find_one + find + Python statistics
+vs the single $lookup aggregation, at simulated network round-trip times.
+
+Usage:
+    python benchmarks/bench_student_profile.py --rtt-ms 0 2 20 60 --runs 50
+
+A local mongod has sub-millisecond round trips, which hides the cost of
+extra round trips. Each database call is therefore delayed by `--rtt-ms`
+(2 ms is typical inside one cloud region, 20-60 ms from an app server in
+another region to an Atlas cluster) before it is sent.
+"""
+import argparse
+import asyncio
+import random
+from datetime import datetime
+
+from _common import get_bench_database, summarize, time_async, print_report
+import database
+from services.student_service import StudentService
+
+SUBJECTS = ["Mathematics", "Science", "English", "Sinhala", "History", "Geography", "ICT", "Art"]
+TERMS = ["Term 1", "Term 2", "Term 3"]
+
+
+class DelayedCursor:
+    """Cursor wrapper that adds one round trip of latency to to_list()."""
+    
+    def __init__(self, cursor, rtt: float):
+        self.cursor = cursor
+        self.rtt = rtt
+    
+    async def to_list(self, length):
+        await asyncio.sleep(self.rtt)
+        return await self.cursor.to_list(length=length)
+
+
+class DelayedCollection:
+    """Collection wrapper that adds one round trip of latency to every call."""
+    
+    def __init__(self, collection, rtt: float):
+        self.collection = collection
+        self.rtt = rtt
+    
+    async def find_one(self, *args, **kwargs):
+        await asyncio.sleep(self.rtt)
+        return await self.collection.find_one(*args, **kwargs)
+    
+    def find(self, *args, **kwargs):
+        return DelayedCursor(self.collection.find(*args, **kwargs), self.rtt)
+    
+    def aggregate(self, *args, **kwargs):
+        return DelayedCursor(self.collection.aggregate(*args, **kwargs), self.rtt)
+
+
+async def legacy_profile(students, marks, student_id: str) -> dict:
+    """The previous implementation: two sequential queries plus statistics in Python."""
+    student = await students.find_one({"studentId": student_id})
+    marks_docs = await marks.find({"studentId": student_id, "isActive": True}).to_list(length=100)
+    
+    total_marks = 0
+    subject_count = 0
+    for mark in marks_docs:
+        for subject in mark.get("subjects", []):
+            if subject.get("isActive", True):
+                total_marks += subject["mark"]
+                subject_count += 1
+    
+    return {
+        "student": student,
+        "marks": marks_docs,
+        "statistics": {
+            "totalSubjects": subject_count,
+            "averageMark": round(total_marks / subject_count, 2) if subject_count > 0 else 0,
+            "totalTerms": len(marks_docs)
+        }
+    }
+
+
+async def seed(db, students: int, terms: int):
+    """Recreate students and marks with `terms` marks entries per student."""
+    for name in ("students", "marks"):
+        await db[name].drop()
+    await database.create_indexes()
+    rng = random.Random(students)
+    now = datetime.utcnow()
+    
+    await db["students"].insert_many([
+        {
+            "studentId": f"STU-{i:03d}",
+            "name": f"Bench Student {i}",
+            "grade": str(8 + i % 5),
+            "mobileNumbers": [],
+            "isActive": True,
+            "createdAt": now,
+            "updatedAt": now
+        }
+        for i in range(1, students + 1)
+    ])
+    await db["marks"].insert_many([
+        {
+            "studentId": f"STU-{i:03d}",
+            "term": TERMS[t % len(TERMS)],
+            "year": 2020 + t // len(TERMS),
+            "subjects": [
+                {"subjectName": name, "mark": round(rng.uniform(35, 100), 1), "isActive": True}
+                for name in rng.sample(SUBJECTS, 6)
+            ],
+            "isActive": True,
+            "createdAt": now,
+            "updatedAt": now
+        }
+        for i in range(1, students + 1)
+        for t in range(terms)
+    ])
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rtt-ms", type=float, nargs="+", default=[0, 2, 20, 60])
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--terms", type=int, default=6)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+    
+    db = get_bench_database()
+    database.db_instance.db = db
+    await seed(db, args.students, args.terms)
+    rng = random.Random(0)
+    
+    # Both implementations must agree before timing them
+    sample_id = "STU-001"
+    expected = (await legacy_profile(db["students"], db["marks"], sample_id))["statistics"]
+    actual = (await StudentService().get_profile(sample_id))["statistics"]
+    assert expected == actual, f"statistics differ: {expected} != {actual}"
+    
+    results = []
+    for rtt_ms in args.rtt_ms:
+        rtt = rtt_ms / 1000
+        students = DelayedCollection(db["students"], rtt)
+        marks = DelayedCollection(db["marks"], rtt)
+        service = StudentService()
+        service.collection = students
+        
+        def random_id():
+            return f"STU-{rng.randint(1, args.students):03d}"
+        
+        legacy = await time_async(lambda: legacy_profile(students, marks, random_id()), args.runs)
+        aggregated = await time_async(lambda: service.get_profile(random_id()), args.runs)
+        results.append({
+            "rtt_ms": rtt_ms,
+            "legacy_find_find": summarize(legacy),
+            "lookup_aggregation": summarize(aggregated)
+        })
+    
+    for name in ("students", "marks"):
+        await db[name].drop()
+    
+    print_report({
+        "benchmark": "student_profile",
+        "students": args.students,
+        "marks_per_student": args.terms,
+        "results": results
+    })
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
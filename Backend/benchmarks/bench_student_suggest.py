@@ -0,0 +1,97 @@
+"""
+Benchmark the in-memory student suggest index.
+
+Usage:
+    python benchmarks/bench_student_suggest.py --sizes 10000 100000 1000000
+
+No database needed: the index is built from synthetic students. Reports
+build time, approximate memory, per-keystroke suggest latency in
+microseconds and the cost of keeping the index current on writes.
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from _common import percentile, print_report
+from services.suggest_service import StudentSuggestIndex
+
+FIRST_NAMES = ["Kamal", "Nimali", "Sahan", "Dilini", "Ruwan", "Tharushi", "Kasun", "Ishara", "Chamara", "Sanduni"]
+SYLLABLES = ["pe", "ra", "fer", "nan", "do", "sil", "va", "ja", "ya", "war", "de", "na", "gu", "ne", "ti", "la", "ka"]
+
+
+def random_name(rng: random.Random) -> str:
+    surname = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+    return f"{rng.choice(FIRST_NAMES)} {surname}"
+
+
+def micro_summary(samples):
+    """Summarize samples (seconds) in microseconds."""
+    return {
+        "runs": len(samples),
+        "p50_us": round(percentile(samples, 50) * 1e6, 2),
+        "p95_us": round(percentile(samples, 95) * 1e6, 2),
+        "p99_us": round(percentile(samples, 99) * 1e6, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+    results = []
+    
+    for size in args.sizes:
+        rng = random.Random(size)
+        docs = [
+            {"studentId": f"STU-{i + 1:03d}", "name": random_name(rng), "grade": str(1 + i % 13)}
+            for i in range(size)
+        ]
+        
+        index = StudentSuggestIndex()
+        start = time.perf_counter()
+        index.build(docs)
+        build_seconds = time.perf_counter() - start
+        
+        # Memory is measured on a second build, since tracing slows it down
+        tracemalloc.start()
+        index = StudentSuggestIndex()
+        index.build(docs)
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        
+        # Every prefix of a name as it is typed, one keystroke at a time
+        keystrokes = []
+        while len(keystrokes) < args.queries:
+            name = rng.choice(docs)["name"]
+            keystrokes.extend(name[:n] for n in range(1, len(name) + 1))
+        
+        samples = []
+        for prefix in keystrokes[:args.queries]:
+            start = time.perf_counter()
+            index.suggest(prefix, args.limit)
+            samples.append(time.perf_counter() - start)
+        
+        writes = []
+        for i in range(min(1000, size)):
+            doc = dict(docs[i], name=random_name(rng))
+            start = time.perf_counter()
+            index.upsert(doc)
+            writes.append(time.perf_counter() - start)
+        
+        results.append({
+            "size": size,
+            "entries": len(index._entries),
+            "build_ms": round(build_seconds * 1000, 1),
+            "memory_mb": round(memory / 1024 / 1024, 1),
+            "suggest": micro_summary(samples),
+            "upsert": micro_summary(writes)
+        })
+    
+    print_report({"benchmark": "student_suggest", "limit": args.limit, "results": results})
+
+
+if __name__ == "__main__":
+    main()
@@ -20,6 +20,85 @@ class Settings(BaseSettings):
     MONGODB_URI: str = "mongodb://localhost:27017"
     DATABASE_NAME: str = "student_academic_db"
     
+    # Connection pool (per worker process)
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MIN_POOL_SIZE: int = 0
+    # Close connections idle for longer than this (0 = never)
+    MONGO_MAX_IDLE_TIME_MS: int = 0
+    # Fail a request waiting for a free connection after this long (0 = wait forever)
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = 0
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 30000
+    # Comma-separated wire compressors in order of preference: zstd, snappy, zlib
+    MONGO_COMPRESSORS: str = ""
+    # Default read preference: primary, primaryPreferred, secondary,
+    # secondaryPreferred or nearest
+    MONGO_READ_PREFERENCE: str = "primary"
+    # Read preference for analytics and list endpoints (summary, lists,
+    # exports), so they can be served by secondaries. While ETAGS_ENABLED
+    # is on, /students and the summary read the primary instead
+    ANALYTICS_READ_PREFERENCE: str = "secondaryPreferred"
+    # Skip secondaries lagging more than this (minimum 90; -1 = no limit)
+    ANALYTICS_MAX_STALENESS_SECONDS: int = 120
+    # Record connection pool events (checked out connections, wait times)
+    MONGO_POOL_METRICS_ENABLED: bool = True
+    
+    # ============================================
+    # METRICS CONFIGURATION
+    # ============================================
+    # Prometheus metrics at GET /metrics: per-route request counts and
+    # latency, MongoDB command durations, bcrypt time, JWT cache hit rate
+    METRICS_ENABLED: bool = True
+    # Log MongoDB commands slower than this (0 = off); GET /admin/slow-queries
+    SLOW_QUERY_THRESHOLD_MS: int = 100
+    # Slow commands kept in memory per worker
+    SLOW_QUERY_LOG_SIZE: int = 200
+    # Debug mode: explain a sample of slow reads and flag collection scans
+    SLOW_QUERY_EXPLAIN: bool = False
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = 0.1
+    
+    # ============================================
+    # RESPONSE CONFIGURATION
+    # ============================================
+    # List endpoints build plain dicts and encode them with orjson instead
+    # of validating every row twice through Pydantic (same JSON schema)
+    FAST_JSON_RESPONSES: bool = True
+    # ETags (from collection version counters) and 304s on polled reads.
+    # Tradeoff: /students and /marks/stats/summary then read the primary,
+    # not ANALYTICS_READ_PREFERENCE, so an ETag never outruns its data;
+    # disable to move those queries back to secondaries
+    ETAGS_ENABLED: bool = True
+    # Compress text/JSON responses (Accept-Encoding negotiated)
+    COMPRESSION_ENABLED: bool = True
+    # Complete responses smaller than this many bytes are sent uncompressed
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    # Server preference; br needs 'brotli' and zstd 'zstandard' installed
+    COMPRESSION_ENCODINGS: str = "br,zstd,gzip"
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    
+    # ============================================
+    # READ CACHE CONFIGURATION
+    # ============================================
+    # Cache hot reads (GET /students/{id}, /marks/student/{id},
+    # /marks/stats/summary); write routes invalidate the affected entries
+    READ_CACHE_ENABLED: bool = True
+    # memory (per worker), redis (shared, needs 'redis') or local-shared
+    READ_CACHE_BACKEND: str = "memory"
+    READ_CACHE_SIZE: int = 2048
+    # Also bounds how long other workers may serve an entry with the memory backend
+    READ_CACHE_TTL_SECONDS: float = 30.0
+    READ_CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    # Identical concurrent /students and summary queries share one database call
+    SINGLE_FLIGHT_ENABLED: bool = True
+    
+    # ============================================
+    # SERVERLESS CONFIGURATION (api/index.py)
+    # ============================================
+    # Create indexes and seed data on the first request of each instance.
+    # Off by default: run 'python manage.py migrate' (and 'seed') on deploy.
+    SERVERLESS_AUTO_SETUP: bool = False
+    
     # ============================================
     # CORS / FRONTEND CONFIGURATION
     # ============================================
@@ -32,12 +111,49 @@ class Settings(BaseSettings):
     JWT_SECRET_KEY: str = "your-super-secret-key-change-in-production-2024"
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 480
+    # Cache verified token payloads (keyed by token digest) until they expire
+    JWT_CACHE_ENABLED: bool = True
+    JWT_CACHE_SIZE: int = 1024
     
     # ============================================
     # ADMIN USER CONFIGURATION
     # ============================================
     ADMIN_USERNAME: str = "Admin"
     ADMIN_PASSWORD: str = "Abc@12345"
+    # Threads used for bcrypt hashing; caps concurrent hashes per worker
+    PASSWORD_HASH_WORKERS: int = 4
+    
+    # ============================================
+    # BULK MARKS CONFIGURATION
+    # ============================================
+    MARKS_BULK_MAX_ROWS: int = 100000
+    MARKS_BULK_CHUNK_SIZE: int = 1000
+    
+    # ============================================
+    # SPREADSHEET IMPORT CONFIGURATION
+    # ============================================
+    # Rows written (and checkpointed) per batch while streaming an import
+    IMPORT_BATCH_SIZE: int = 1000
+    # Row errors kept on an import job document
+    IMPORT_MAX_STORED_ERRORS: int = 100
+    
+    # ============================================
+    # STUDENT SUGGEST CONFIGURATION
+    # ============================================
+    # Reload the in-memory suggest index after this many seconds, so writes
+    # handled by other workers show up (0 = never reload)
+    SUGGEST_MAX_AGE_SECONDS: int = 300
+    
+    # ============================================
+    # STUDENT ID CONFIGURATION
+    # ============================================
+    # Student IDs reserved per worker in one round trip (1 = no reservation)
+    STUDENT_ID_BLOCK_SIZE: int = 1
+    
+    @property
+    def mongo_compressors(self) -> List[str]:
+        """Parse MONGO_COMPRESSORS into a list of compressor names."""
+        return [c.strip().lower() for c in self.MONGO_COMPRESSORS.split(",") if c.strip()]
     
     @property
     def cors_origins(self) -> List[str]:
@@ -54,13 +170,15 @@ class Settings(BaseSettings):
 settings = Settings()
 
 
-# Print configuration info on import (helpful for debugging)
+# Print configuration info (called at startup, never on import)
 def print_config_info():
     """Print current configuration (without sensitive data)."""
     print("\n" + "="*50)
     print("[CONFIG] CONFIGURATION LOADED")
     print("="*50)
     print(f"[DB] Database: {settings.DATABASE_NAME}")
+    print(f"[DB] Pool: max={settings.MONGO_MAX_POOL_SIZE}, min={settings.MONGO_MIN_POOL_SIZE}, "
+          f"read preference={settings.MONGO_READ_PREFERENCE}, compressors={settings.mongo_compressors or 'none'}")
     print(f"[CORS] Origins: {settings.cors_origins}")
     print(f"[AUTH] Admin User: {settings.ADMIN_USERNAME}")
     print("="*50 + "\n")
@@ -8,6 +8,7 @@ SETUP INSTRUCTIONS:
 3. Run: python main.py
 """
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import logging
@@ -15,10 +16,18 @@ import os
 
 from config import settings, print_config_info
 from database import connect_to_mongo, close_mongo_connection
-from services.seed_service import SeedService
+from services.suggest_service import student_suggest_index
 from routes.auth import router as auth_router
 from routes.students import router as students_router
 from routes.marks import router as marks_router
+from routes.imports import router as imports_router
+from routes.admin import router as admin_router
+from utils.compression import CompressionMiddleware
+from utils.fast_json import FastJSONResponse
+from utils.pagination import NEXT_CURSOR_HEADER
+from utils.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, metrics
+from utils.pool_metrics import pool_metrics
+from utils.slow_queries import RequestScopeMiddleware
 
 # Configure logging
 logging.basicConfig(
@@ -34,7 +43,11 @@ async def lifespan(app: FastAPI):
     Application lifespan manager.
     Handles startup and shutdown events.
     """
-    # Startup
+    # Startup (setup-only services are imported here, not at module import)
+    from services.seed_service import SeedService
+    from services.stats_service import StatsService
+    from services.student_service import StudentService
+    
     logger.info("[STARTUP] Starting Student Academic Management System...")
     
     # Print configuration info
@@ -47,6 +60,16 @@ async def lifespan(app: FastAPI):
     seed_service = SeedService()
     await seed_service.run_all_seeds()
     
+    # Build the marks statistics rollup on first start
+    await StatsService().ensure_initialized()
+    
+    # Add search fields and student numbers to students created before they existed
+    await StudentService().backfill_search_fields()
+    await StudentService().backfill_student_numbers()
+    
+    # Load the in-memory student autocomplete index
+    await student_suggest_index.load()
+    
     logger.info("[OK] Application startup complete!")
     
     yield
@@ -62,6 +85,7 @@ app = FastAPI(
     description="A comprehensive system for managing students and their academic marks",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc"
 )
@@ -83,12 +107,27 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
+# Compress text/JSON responses, including streamed exports
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Route of the current request for the slow query log
+if settings.SLOW_QUERY_THRESHOLD_MS > 0:
+    app.add_middleware(RequestScopeMiddleware)
+
+# Request metrics for GET /metrics (outermost, so CORS handling is timed too)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(auth_router)
 app.include_router(students_router)
 app.include_router(marks_router)
+app.include_router(imports_router)
+app.include_router(admin_router)
 
 
 @app.get("/", tags=["Root"])
@@ -111,6 +150,21 @@ async def health_check():
     }
 
 
+@app.get("/health/pool", tags=["Health"])
+async def pool_health():
+    """MongoDB connection pool metrics for this worker."""
+    return {
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        **pool_metrics.stats()
+    }
+
+
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Prometheus metrics for this worker (text exposition format)."""
+    return PlainTextResponse(metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     import uvicorn
     import os
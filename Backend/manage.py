@@ -0,0 +1,105 @@
+"""
+Maintenance commands for the Student Academic Management System.
+
+USAGE:
+    python manage.py migrate         # Create indexes and initialize derived data
+    python manage.py seed            # Create the admin user and sample data
+    python manage.py rebuild-stats   # Recompute the marks_stats rollup from raw marks
+    python manage.py check-stats     # Report drift between the rollup and raw marks
+    python manage.py backfill-search # Add search fields to students that lack them
+"""
+import argparse
+import asyncio
+import json
+import logging
+
+from database import connect_to_mongo, close_mongo_connection, get_collection
+from services.counter_service import ensure_student_sequence
+from services.seed_service import SeedService
+from services.stats_service import StatsService
+from services.student_service import StudentService
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+async def migrate():
+    """
+    Prepare the database for the current code.
+    
+    Indexes are created on connect; this also initializes the student ID
+    sequence, the marks statistics rollup, the student search fields and
+    the student numbers used for ordering.
+    Safe to run repeatedly (e.g. on every deploy).
+    """
+    await ensure_student_sequence()
+    await StatsService().ensure_initialized()
+    await StudentService().backfill_search_fields()
+    await StudentService().backfill_student_numbers()
+    logger.info("[OK] Database migrated")
+
+
+async def seed():
+    """Create the admin user and sample data if they do not exist yet."""
+    marks = get_collection("marks")
+    marks_before = await marks.estimated_document_count()
+    
+    await SeedService().run_all_seeds()
+    
+    # Seeded marks bypass the rollup, so rebuild it if any were added
+    if await marks.estimated_document_count() != marks_before:
+        await StatsService().rebuild()
+    else:
+        await StatsService().ensure_initialized()
+
+
+async def rebuild_stats():
+    """Recompute the marks statistics rollup."""
+    count = await StatsService().rebuild()
+    logger.info(f"[OK] marks_stats rebuilt ({count} buckets)")
+
+
+async def check_stats():
+    """Compare the rollup with statistics computed from raw marks."""
+    drift = await StatsService().check_drift()
+    if drift:
+        logger.warning(f"[WARN] marks_stats has drifted: {json.dumps(drift, default=str)}")
+        logger.warning("[WARN] Run 'python manage.py rebuild-stats' to fix it")
+        return 1
+    logger.info("[OK] marks_stats matches the marks collection")
+    return 0
+
+
+async def backfill_search():
+    """Add nameLower/nameWords to students created before search fields existed."""
+    count = await StudentService().backfill_search_fields()
+    logger.info(f"[OK] Search fields added to {count} students")
+
+
+COMMANDS = {
+    "migrate": migrate,
+    "seed": seed,
+    "rebuild-stats": rebuild_stats,
+    "check-stats": check_stats,
+    "backfill-search": backfill_search,
+}
+
+
+async def run(command: str) -> int:
+    """Connect to MongoDB, run a command and disconnect."""
+    await connect_to_mongo()
+    try:
+        return await COMMANDS[command]() or 0
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backend maintenance commands")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    args = parser.parse_args()
+    
+    raise SystemExit(asyncio.run(run(args.command)))
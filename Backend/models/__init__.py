@@ -1,6 +1,7 @@
 """Models package initialization."""
 from models.user import UserModel, UserCreate, UserLogin, UserResponse, Token
-from models.student import StudentModel, StudentCreate, StudentUpdate, StudentResponse
-from models.marks import MarksModel, MarksCreate, MarksUpdate, SubjectMark, MarksResponse
+from models.student import StudentModel, StudentCreate, StudentUpdate, StudentResponse, StudentSuggestion
+from models.marks import MarksModel, MarksCreate, MarksUpdate, SubjectMark, MarksResponse, MarksBulkResponse
+from models.common import BulkRowResult, ImportJobResponse
 
 
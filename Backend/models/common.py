@@ -0,0 +1,29 @@
+"""
+Model definitions shared by several resources.
+"""
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+
+class BulkRowResult(BaseModel):
+    """Outcome of a single row in a bulk write."""
+    index: int
+    status: str  # "inserted" or "error"
+    id: Optional[str] = None
+    error: Optional[str] = None
+    code: Optional[str] = None  # "duplicate" when the row already exists
+
+
+class ImportJobResponse(BaseModel):
+    """Schema for spreadsheet import job progress."""
+    id: str
+    kind: str  # "students" or "marks"
+    status: str  # "running", "completed", "interrupted" or "failed"
+    rowsRead: int
+    rowsCommitted: int
+    inserted: int
+    failed: int
+    errors: List[BulkRowResult]
+    createdAt: datetime
+    updatedAt: datetime
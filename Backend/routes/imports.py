@@ -0,0 +1,86 @@
+"""
+Spreadsheet import routes.
+"""
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request
+from typing import Optional
+from models.common import ImportJobResponse
+from services.import_service import (
+    ImportService, iter_csv_records, iter_xlsx_records, job_doc_to_response
+)
+from utils.jwt import get_current_user
+
+router = APIRouter(prefix="/imports", tags=["Imports"])
+
+PARSERS = {
+    "csv": iter_csv_records,
+    "xlsx": iter_xlsx_records
+}
+
+
+async def run_import(kind: str, request: Request, file_format: str, job_id: Optional[str]) -> dict:
+    """Stream the request body into an import job of the given kind."""
+    parser = PARSERS.get(file_format)
+    if parser is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported format: {file_format} (expected csv or xlsx)"
+        )
+    
+    service = ImportService()
+    job = await service.start_job(kind, job_id)
+    result = await service.run(job, parser(request.stream()))
+    return job_doc_to_response(result)
+
+
+@router.post("/students", response_model=ImportJobResponse)
+async def import_students(
+    request: Request,
+    current_user: dict = Depends(get_current_user),
+    file_format: str = Query("csv", alias="format", description="csv or xlsx"),
+    job_id: Optional[str] = Query(None, description="Resume an interrupted import job")
+):
+    """
+    Import students from a spreadsheet sent as the raw request body.
+    
+    Columns: `name`, `grade`, `mobileNumbers` (separate numbers with `;`).
+    Rows are written in batches as the upload streams in; to resume an
+    interrupted upload, send the same file again with its `job_id`.
+    """
+    return await run_import("students", request, file_format, job_id)
+
+
+@router.post("/marks", response_model=ImportJobResponse)
+async def import_marks(
+    request: Request,
+    current_user: dict = Depends(get_current_user),
+    file_format: str = Query("csv", alias="format", description="csv or xlsx"),
+    job_id: Optional[str] = Query(None, description="Resume an interrupted import job")
+):
+    """
+    Import marks from a spreadsheet sent as the raw request body.
+    
+    Columns: `studentId`, `term`, `year`, then one column per subject holding
+    the mark (empty cells are skipped). Rows are written in batches as the
+    upload streams in; to resume an interrupted upload, send the same file
+    again with its `job_id`.
+    """
+    return await run_import("marks", request, file_format, job_id)
+
+
+@router.get("/{job_id}", response_model=ImportJobResponse)
+async def get_import_job(
+    job_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get the progress of an import job.
+    """
+    job = await ImportService().get_job(job_id)
+    
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Import job not found: {job_id}"
+        )
+    
+    return job_doc_to_response(job)
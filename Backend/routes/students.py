@@ -1,47 +1,52 @@
 """
 Student management routes.
 """
-from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 from datetime import datetime
 from bson import ObjectId
-from database import get_collection
-from models.student import StudentCreate, StudentUpdate, StudentResponse
+from pymongo import ReturnDocument
+from database import READ_ANALYTICS, READ_PRIMARY, get_collection
+from models.student import StudentCreate, StudentUpdate, StudentResponse, StudentSuggestion
+from services.counter_service import bump_versions, get_versions, student_id_allocator
+from services.export_service import (
+    DEFAULT_EXPORT_BATCH_SIZE, EXPORT_MEDIA_TYPES, MAX_EXPORT_BATCH_SIZE,
+    STUDENT_EXPORT_COLUMNS, student_export_row, stream_export
+)
+from services.stats_service import StatsService
+from services.student_service import StudentService, student_create_to_doc
+from services.suggest_service import student_suggest_index
+from utils.etag import conditional_get, tagged_read_policy
+from utils.fast_json import list_response
 from utils.jwt import get_current_user
+from utils.read_cache import SUMMARY_TAG, cache_key, read_cache, student_tag
+from utils.single_flight import single_flight
+from utils.search import name_search_fields
+from utils.pagination import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, STUDENT_SORT, student_cursor, student_cursor_filter, set_next_cursor
+)
 
 router = APIRouter(prefix="/students", tags=["Students"])
 
 
-def student_doc_to_response(doc: dict) -> StudentResponse:
-    """Convert MongoDB document to StudentResponse."""
-    return StudentResponse(
-        id=str(doc["_id"]),
-        studentId=doc["studentId"],
-        name=doc["name"],
-        grade=doc["grade"],
-        mobileNumbers=doc.get("mobileNumbers", []),
-        isActive=doc.get("isActive", True),
-        createdAt=doc.get("createdAt", datetime.utcnow()),
-        updatedAt=doc.get("updatedAt", datetime.utcnow())
-    )
+def student_doc_to_dict(doc: dict) -> dict:
+    """Convert MongoDB document to the StudentResponse schema as a plain dict."""
+    return {
+        "id": str(doc["_id"]),
+        "studentId": doc["studentId"],
+        "name": doc["name"],
+        "grade": doc["grade"],
+        "mobileNumbers": doc.get("mobileNumbers", []),
+        "isActive": doc.get("isActive", True),
+        "createdAt": doc.get("createdAt") or datetime.utcnow(),
+        "updatedAt": doc.get("updatedAt") or datetime.utcnow()
+    }
 
 
-async def generate_student_id() -> str:
-    """Generate the next student ID."""
-    collection = get_collection("students")
-    
-    # Find the highest student ID
-    last_student = await collection.find_one(
-        {},
-        sort=[("studentId", -1)]
-    )
-    
-    if last_student:
-        # Extract number from STU-XXX
-        last_num = int(last_student["studentId"].split("-")[1])
-        return f"STU-{last_num + 1:03d}"
-    
-    return "STU-001"
+def student_doc_to_response(doc: dict) -> StudentResponse:
+    """Convert MongoDB document to StudentResponse."""
+    return StudentResponse(**student_doc_to_dict(doc))
 
 
 @router.post("/", response_model=StudentResponse, status_code=status.HTTP_201_CREATED)
@@ -58,40 +63,52 @@ async def create_student(
     """
     collection = get_collection("students")
     
-    # Generate student ID
-    student_id = await generate_student_id()
+    # Allocate student ID from the atomic sequence
+    student_id = await student_id_allocator.next_id()
     
-    student_doc = {
-        "studentId": student_id,
-        "name": student_data.name,
-        "grade": student_data.grade,
-        "mobileNumbers": student_data.mobileNumbers,
-        "isActive": True,
-        "createdAt": datetime.utcnow(),
-        "updatedAt": datetime.utcnow()
-    }
+    student_doc = student_create_to_doc(student_data, student_id, datetime.utcnow())
     
     result = await collection.insert_one(student_doc)
     student_doc["_id"] = result.inserted_id
+    await bump_versions("students")
+    await read_cache.invalidate(SUMMARY_TAG)
+    student_suggest_index.upsert(student_doc)
     
     return student_doc_to_response(student_doc)
 
 
 @router.get("/", response_model=List[StudentResponse])
 async def get_students(
+    request: Request,
+    response: Response,
     current_user: dict = Depends(get_current_user),
     search: Optional[str] = Query(None, description="Search by studentId or name"),
     grade: Optional[str] = Query(None, description="Filter by grade"),
-    active_only: bool = Query(True, description="Show only active students")
+    active_only: bool = Query(True, description="Show only active students"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header")
 ):
     """
-    Get all students with optional filtering.
+    Get students with optional filtering, one page at a time.
     
-    - **search**: Search by student ID or name (partial match)
+    - **search**: Search by student ID or name prefix, best matches first
+      (returns at most `limit` students, without a next-page cursor)
     - **grade**: Filter by specific grade
     - **active_only**: Show only active students (default: true)
+    - **limit**: Maximum number of students to return
+    - **cursor**: Continue after the previous page
+    
+    When more students are available, the `X-Next-Cursor` response header
+    holds the cursor for the next page. Send the `ETag` of an earlier
+    response in `If-None-Match` to get 304 Not Modified while no student
+    has changed.
     """
-    collection = get_collection("students")
+    not_modified = await conditional_get(request, response, ["students"])
+    if not_modified is not None:
+        return not_modified
+    
+    read_policy = tagged_read_policy()
+    collection = get_collection("students", read_policy)
     
     # Build query
     query = {}
@@ -102,16 +119,85 @@ async def get_students(
     if grade:
         query["grade"] = grade
     
-    if search:
-        query["$or"] = [
-            {"studentId": {"$regex": search, "$options": "i"}},
-            {"name": {"$regex": search, "$options": "i"}}
-        ]
+    # Identical concurrent requests share one query
+    flight_key = cache_key(
+        "students", search=search, grade=grade, active_only=active_only, limit=limit, cursor=cursor
+    )
+    versions = request.state.collection_versions
+    
+    if search and search.strip():
+        # Ranked top matches; search results are not paginated
+        return list_response(
+            await single_flight.do(
+                flight_key, lambda: StudentService(read_policy).search(search, query, limit), versions
+            ),
+            student_doc_to_dict, student_doc_to_response, response
+        )
+    
+    if cursor:
+        query = {"$and": [query, student_cursor_filter(cursor)]}
     
-    cursor = collection.find(query).sort("studentId", 1)
-    students = await cursor.to_list(length=1000)
+    # Fetch one extra row to find out whether another page exists
+    cursor_query = collection.find(query).sort(STUDENT_SORT).limit(limit + 1)
+    students = await single_flight.do(flight_key, lambda: cursor_query.to_list(length=limit + 1), versions)
     
-    return [student_doc_to_response(s) for s in students]
+    if len(students) > limit:
+        students = students[:limit]
+        set_next_cursor(response, student_cursor(students[-1]))
+    
+    return list_response(students, student_doc_to_dict, student_doc_to_response, response)
+
+
+@router.get("/suggest", response_model=List[StudentSuggestion])
+async def suggest_students(
+    current_user: dict = Depends(get_current_user),
+    q: str = Query(..., min_length=1, max_length=100, description="Name, name word or student ID prefix"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of suggestions")
+):
+    """
+    Autocomplete active students for the student picker.
+    
+    Served from an in-memory index, so it is cheap enough to call on every
+    keystroke. Matches name prefixes, name word prefixes and student IDs.
+    """
+    await student_suggest_index.ensure_loaded()
+    return student_suggest_index.suggest(q, limit)
+
+
+@router.get("/export")
+async def export_students(
+    current_user: dict = Depends(get_current_user),
+    grade: Optional[str] = Query(None, description="Filter by grade"),
+    active_only: bool = Query(True, description="Export only active students"),
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+    batch_size: int = Query(
+        DEFAULT_EXPORT_BATCH_SIZE, ge=1, le=MAX_EXPORT_BATCH_SIZE,
+        description="Students fetched per database round trip"
+    )
+):
+    """
+    Export all matching students as NDJSON or CSV.
+    
+    Rows are streamed straight from the database cursor, ordered by
+    student ID, so the export is not limited to one page.
+    """
+    collection = get_collection("students", READ_ANALYTICS)
+    
+    query = {}
+    
+    if active_only:
+        query["isActive"] = True
+    
+    if grade:
+        query["grade"] = grade
+    
+    cursor_query = collection.find(query).sort(STUDENT_SORT)
+    
+    return StreamingResponse(
+        stream_export(cursor_query, student_export_row, STUDENT_EXPORT_COLUMNS, export_format, batch_size),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="students.{export_format}"'}
+    )
 
 
 @router.get("/{student_id}", response_model=StudentResponse)
@@ -124,7 +210,16 @@ async def get_student(
     
     - **student_id**: Student ID (e.g., STU-001) or MongoDB ObjectId
     """
-    collection = get_collection("students")
+    key = cache_key("student", student_id)
+    # Checked against the students version, so a write handled by another
+    # worker or instance is never answered from this worker's cache
+    versions = await get_versions(["students"]) if read_cache.enabled else None
+    student = await read_cache.get(key, versions)
+    if student is not None:
+        return student_doc_to_response(student)
+    
+    generation = read_cache.generation
+    collection = get_collection("students", READ_PRIMARY)
     
     # Try to find by studentId first, then by ObjectId
     student = await collection.find_one({"studentId": student_id})
@@ -141,6 +236,9 @@ async def get_student(
             detail=f"Student not found: {student_id}"
         )
     
+    # Tagged by studentId, so lookups by ObjectId are invalidated as well
+    await read_cache.set(key, student, [student_tag(student["studentId"])], versions, generation)
+    
     return student_doc_to_response(student)
 
 
@@ -162,6 +260,7 @@ async def update_student(
     
     if update_data.name is not None:
         update_doc["name"] = update_data.name
+        update_doc.update(name_search_fields(update_data.name))
     if update_data.grade is not None:
         update_doc["grade"] = update_data.grade
     if update_data.mobileNumbers is not None:
@@ -170,28 +269,40 @@ async def update_student(
         update_doc["isActive"] = update_data.isActive
     
     # Try to find by studentId first, then by ObjectId
-    result = await collection.find_one_and_update(
+    before = await collection.find_one_and_update(
         {"studentId": student_id},
         {"$set": update_doc},
-        return_document=True
+        return_document=ReturnDocument.BEFORE
     )
     
-    if not result:
+    if not before:
         try:
-            result = await collection.find_one_and_update(
+            before = await collection.find_one_and_update(
                 {"_id": ObjectId(student_id)},
                 {"$set": update_doc},
-                return_document=True
+                return_document=ReturnDocument.BEFORE
             )
         except:
             pass
     
-    if not result:
+    if not before:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Student not found: {student_id}"
         )
     
+    result = {**before, **update_doc}
+    
+    # Grade statistics are keyed by the student's current grade
+    if before.get("grade") != result["grade"]:
+        await StatsService().move_student_grade(
+            result["studentId"], before.get("grade"), result["grade"]
+        )
+    
+    await bump_versions("students")
+    await read_cache.invalidate(student_tag(result["studentId"]), SUMMARY_TAG)
+    student_suggest_index.upsert(result)
+    
     return student_doc_to_response(result)
 
 
@@ -235,6 +346,10 @@ async def delete_student(
             detail=f"Student not found: {student_id}"
         )
     
+    await bump_versions("students")
+    await read_cache.invalidate(student_tag(result["studentId"]), SUMMARY_TAG)
+    student_suggest_index.remove(result["studentId"])
+    
     return student_doc_to_response(result)
 
 
@@ -248,11 +363,8 @@ async def get_student_profile(
     
     Returns student info with all marks and calculated averages.
     """
-    students_collection = get_collection("students")
-    marks_collection = get_collection("marks")
-    
-    # Get student
-    student = await students_collection.find_one({"studentId": student_id})
+    # Student, active marks and statistics in a single aggregation
+    student = await StudentService(READ_PRIMARY).get_profile(student_id)
     
     if not student:
         raise HTTPException(
@@ -260,16 +372,9 @@ async def get_student_profile(
             detail=f"Student not found: {student_id}"
         )
     
-    # Get marks
-    marks_cursor = marks_collection.find({
-        "studentId": student_id,
-        "isActive": True
-    })
-    marks_docs = await marks_cursor.to_list(length=100)
-    
     # Convert marks to serializable format
     marks = []
-    for mark in marks_docs:
+    for mark in student["marks"]:
         marks.append({
             "id": str(mark["_id"]),
             "studentId": mark["studentId"],
@@ -281,25 +386,9 @@ async def get_student_profile(
             "updatedAt": mark.get("updatedAt")
         })
     
-    # Calculate statistics
-    total_marks = 0
-    subject_count = 0
-    
-    for mark in marks_docs:
-        for subject in mark.get("subjects", []):
-            if subject.get("isActive", True):
-                total_marks += subject["mark"]
-                subject_count += 1
-    
-    average_mark = round(total_marks / subject_count, 2) if subject_count > 0 else 0
-    
     return {
         "student": student_doc_to_response(student),
         "marks": marks,
-        "statistics": {
-            "totalSubjects": subject_count,
-            "averageMark": average_mark,
-            "totalTerms": len(marks)
-        }
+        "statistics": student["statistics"]
     }
 
@@ -0,0 +1,68 @@
+"""
+Generate a large synthetic dataset for load testing.
+
+USAGE:
+    python -m seed --students 1000000 --terms 6
+    python -m seed --students 50000 --terms 3 --seed 7 --chunk-size 2000
+
+Creates the admin user, then students STU-001 ... STU-<students> with
+<terms> marks records each. Data is deterministic for a given --seed and
+re-running only inserts what is missing, so an interrupted run can simply
+be started again. Afterwards the student ID sequence is moved past the
+generated IDs and the marks statistics rollup is rebuilt.
+
+Point MONGODB_URI / DATABASE_NAME at a test database: this is meant for
+reproducing production-scale performance locally, not for live data.
+"""
+import argparse
+import asyncio
+import json
+import logging
+
+from database import connect_to_mongo, close_mongo_connection
+from services.seed_service import DEFAULT_SEED, SeedService
+from services.stats_service import StatsService
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    """Connect to MongoDB, generate the dataset and rebuild derived data."""
+    await connect_to_mongo()
+    try:
+        seed_service = SeedService(seed=args.seed)
+        await seed_service.seed_admin_user()
+        summary = await seed_service.seed_synthetic(
+            args.students,
+            terms=args.terms,
+            chunk_size=args.chunk_size,
+            concurrency=args.concurrency,
+            last_year=args.year
+        )
+        
+        if not args.skip_stats:
+            summary["stats_buckets"] = await StatsService().rebuild()
+        return summary
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic students and marks")
+    parser.add_argument("--students", type=int, required=True, help="Number of students")
+    parser.add_argument("--terms", type=int, default=3, help="Marks records per student")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Random seed")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Documents per insert_many")
+    parser.add_argument("--concurrency", type=int, default=4, help="Chunks written concurrently")
+    parser.add_argument("--year", type=int, help="Year of the most recent term (default: current year)")
+    parser.add_argument("--skip-stats", action="store_true", help="Do not rebuild marks_stats")
+    args = parser.parse_args()
+    
+    if args.students < 0 or args.terms < 0 or args.chunk_size < 1 or args.concurrency < 1:
+        parser.error("--students/--terms must be >= 0, --chunk-size/--concurrency >= 1")
+    
+    print(json.dumps(asyncio.run(run(args)), indent=2))
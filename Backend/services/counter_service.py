@@ -0,0 +1,199 @@
+"""
+Counter service for allocating sequential student IDs and tracking
+collection versions.
+
+IDs are handed out from a sequence document in the `counters` collection
+with an atomic find_one_and_update/$inc, so concurrent requests (and
+concurrent workers) can never receive the same number.
+
+The same collection holds one version document per versioned collection
+("version:students", ...), advanced after every write; conditional GETs
+(utils/etag.py) compare these instead of re-running their queries.
+"""
+import asyncio
+import re
+import uuid
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from pymongo import ReturnDocument
+from database import READ_PRIMARY, get_collection
+from config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+COUNTERS_COLLECTION = "counters"
+STUDENT_ID_SEQUENCE = "studentId"
+VERSION_PREFIX = "version:"
+
+
+def format_student_id(number: int) -> str:
+    """
+    Format a sequence number as a student ID (STU-001 ... STU-999, STU-1000 ...).
+    
+    IDs of different widths do not sort numerically as strings (STU-1000
+    sorts before STU-101), so students are ordered by the numeric
+    `studentNumber` stored with each of them (see student_number).
+    """
+    return f"STU-{number:03d}"
+
+
+def student_number(student_id: str) -> Optional[int]:
+    """Sequence number of a student ID ("STU-1000" -> 1000), None for other formats."""
+    match = re.fullmatch(r"STU-(\d+)", student_id)
+    return int(match.group(1)) if match else None
+
+
+async def reserve_sequence(name: str, count: int = 1) -> int:
+    """
+    Atomically reserve `count` consecutive numbers from a named sequence.
+    
+    Args:
+        name: Sequence name (the counter document _id)
+        count: How many numbers to reserve
+        
+    Returns:
+        The first reserved number
+    """
+    counter = await get_collection(COUNTERS_COLLECTION).find_one_and_update(
+        {"_id": name},
+        {"$inc": {"seq": count}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return counter["seq"] - count + 1
+
+
+class StudentIdAllocator:
+    """
+    Hands out student IDs from the studentId sequence.
+    
+    With a block size above 1, each worker reserves a block of numbers in
+    one round trip and serves IDs from it in memory. IDs stay unique across
+    workers, but are no longer strictly in creation order and numbers left
+    in a block are skipped when the worker restarts.
+    """
+    
+    def __init__(self, block_size: int = 1):
+        self.block_size = max(1, block_size)
+        self._next = 0
+        self._end = 0
+        self._lock = asyncio.Lock()
+    
+    async def next_id(self) -> str:
+        """
+        Allocate the next student ID.
+        
+        Returns:
+            Student ID string
+        """
+        if self.block_size == 1:
+            return format_student_id(await reserve_sequence(STUDENT_ID_SEQUENCE))
+        
+        async with self._lock:
+            if self._next >= self._end:
+                self._next = await reserve_sequence(STUDENT_ID_SEQUENCE, self.block_size)
+                self._end = self._next + self.block_size
+            number = self._next
+            self._next += 1
+        
+        return format_student_id(number)
+    
+    async def next_ids(self, count: int) -> List[str]:
+        """
+        Allocate `count` student IDs in a single round trip (for bulk inserts).
+        
+        Args:
+            count: Number of IDs needed
+            
+        Returns:
+            List of consecutive student ID strings
+        """
+        if count <= 0:
+            return []
+        first = await reserve_sequence(STUDENT_ID_SEQUENCE, count)
+        return [format_student_id(first + i) for i in range(count)]
+
+
+student_id_allocator = StudentIdAllocator(settings.STUDENT_ID_BLOCK_SIZE)
+
+
+async def bump_student_sequence(number: int):
+    """Make sure the studentId sequence is at least `number` (e.g. after inserting fixed IDs)."""
+    await get_collection(COUNTERS_COLLECTION).update_one(
+        {"_id": STUDENT_ID_SEQUENCE},
+        {"$max": {"seq": number}},
+        upsert=True
+    )
+
+
+async def ensure_student_sequence():
+    """
+    Initialize the studentId sequence from existing students.
+    
+    Only runs when the sequence document does not exist yet, so databases
+    created before the counters collection continue after their highest ID.
+    """
+    counters = get_collection(COUNTERS_COLLECTION)
+    if await counters.find_one({"_id": STUDENT_ID_SEQUENCE}) is not None:
+        return
+    
+    # IDs of different widths do not sort numerically as strings, so compare numbers
+    number = {"$toInt": {"$arrayElemAt": [{"$split": ["$studentId", "-"]}, 1]}}
+    result = await get_collection("students").aggregate([
+        {"$match": {"studentId": {"$regex": r"^STU-\d+$"}}},
+        {"$group": {"_id": None, "max": {"$max": number}}}
+    ]).to_list(length=1)
+    
+    highest = result[0]["max"] if result and result[0]["max"] is not None else 0
+    await bump_student_sequence(highest)
+    logger.info(f"[OK] Student ID sequence initialized at {highest}")
+
+
+async def bump_versions(*collections: str):
+    """
+    Advance the version of collections after a write to them.
+    
+    Must be called once the write has completed: a reader that sees the new
+    version is then guaranteed to read the new data from the primary.
+    
+    Args:
+        collections: Names of the written collections
+    """
+    counters = get_collection(COUNTERS_COLLECTION)
+    now = datetime.utcnow()
+    await asyncio.gather(*(
+        counters.update_one(
+            {"_id": VERSION_PREFIX + name},
+            {
+                "$inc": {"seq": 1},
+                "$set": {"updatedAt": now},
+                # A recreated counter never repeats the versions of an earlier one
+                "$setOnInsert": {"epoch": uuid.uuid4().hex[:8]}
+            },
+            upsert=True
+        )
+        for name in collections
+    ))
+
+
+async def get_versions(collections: Iterable[str]) -> Dict[str, str]:
+    """
+    Read the current version of collections in one round trip.
+    
+    Args:
+        collections: Collection names
+        
+    Returns:
+        Dict of collection name to an opaque version string
+        ("0" for collections that were never bumped)
+    """
+    names = list(collections)
+    docs = await get_collection(COUNTERS_COLLECTION, READ_PRIMARY).find(
+        {"_id": {"$in": [VERSION_PREFIX + name for name in names]}}
+    ).to_list(length=len(names))
+    
+    versions = {name: "0" for name in names}
+    for doc in docs:
+        versions[doc["_id"][len(VERSION_PREFIX):]] = f"{doc.get('epoch', '')}.{doc['seq']}"
+    return versions
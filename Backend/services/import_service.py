@@ -0,0 +1,360 @@
+"""
+Import service for streaming CSV/XLSX spreadsheet uploads.
+
+Uploads are parsed incrementally from the request stream and written in
+bounded batches, so memory use does not grow with the file size. Every
+import is tracked as a job in the `import_jobs` collection; the job records
+how many rows have been committed, so an interrupted upload can be resumed
+by sending the same file again with the job ID.
+
+Rows of a batch written before a crash but after the last checkpoint are
+sent again on resume. The range of every batch (and, for students, the
+block of IDs reserved for it) is saved on the job as `batchInFlight` before
+the batch is written. A resumed batch reuses the same student IDs, so rows
+that were already written hit the unique studentId or (studentId, term,
+year) index; inside the saved range those hits are counted as inserted
+rather than reported as errors.
+
+Spreadsheet layouts (first row is the header):
+    students:  name, grade, mobileNumbers (numbers separated by ";")
+    marks:     studentId, term, year, <subject name>, <subject name>, ...
+               (one column per subject; empty cells are skipped)
+"""
+import asyncio
+import codecs
+import csv
+import tempfile
+import uuid
+from datetime import datetime
+from itertools import islice
+from typing import AsyncIterator, List, Optional
+from fastapi import HTTPException, status
+from database import get_collection
+from models.common import BulkRowResult
+from services.counter_service import STUDENT_ID_SEQUENCE, format_student_id, reserve_sequence
+from services.marks_service import MarksService
+from services.student_service import StudentService
+from config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+IMPORT_JOBS_COLLECTION = "import_jobs"
+
+# Columns of the marks layout that are not subject names
+MARKS_KEY_COLUMNS = ("studentId", "term", "year")
+
+# Uploads larger than this are spooled to disk while buffering XLSX files
+XLSX_SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+
+
+async def iter_csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[List[str]]:
+    """
+    Parse CSV records incrementally from a stream of byte chunks.
+    
+    Lines are decoded as they arrive and a record is emitted once its quotes
+    are balanced, so quoted fields containing newlines are supported while
+    only the current record is held in memory.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    record = ""
+    
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        lines = buffer.split("\n")
+        
+        # Keep the trailing partial line for the next chunk
+        buffer = lines.pop()
+        
+        for line in lines:
+            record += line + "\n"
+            if record.count('"') % 2 == 0:
+                if record.strip():
+                    yield next(csv.reader([record]))
+                record = ""
+    
+    record += buffer + decoder.decode(b"", final=True)
+    if record.strip():
+        yield next(csv.reader([record]))
+
+
+async def iter_xlsx_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[List[str]]:
+    """
+    Parse rows of the first worksheet of an XLSX upload.
+    
+    XLSX is a zip archive and needs random access, so the upload is spooled
+    to a temporary file first; rows are then read with openpyxl in read-only
+    mode, a batch at a time, off the event loop.
+    """
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="XLSX import requires the openpyxl package; upload CSV instead"
+        )
+    
+    loop = asyncio.get_running_loop()
+    
+    with tempfile.SpooledTemporaryFile(max_size=XLSX_SPOOL_MAX_MEMORY) as spool:
+        async for chunk in chunks:
+            spool.write(chunk)
+        spool.seek(0)
+        
+        try:
+            workbook = await loop.run_in_executor(
+                None, lambda: load_workbook(spool, read_only=True, data_only=True)
+            )
+        except Exception:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid XLSX file"
+            )
+        
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            while True:
+                batch = await loop.run_in_executor(None, lambda: list(islice(rows, 500)))
+                if not batch:
+                    break
+                for row in batch:
+                    yield ["" if value is None else str(value) for value in row]
+        finally:
+            workbook.close()
+
+
+def student_row(record: dict) -> dict:
+    """Map a students spreadsheet row to StudentCreate fields."""
+    numbers = record.get("mobileNumbers") or ""
+    return {
+        "name": (record.get("name") or "").strip(),
+        "grade": (record.get("grade") or "").strip(),
+        "mobileNumbers": [n.strip() for n in numbers.split(";") if n.strip()]
+    }
+
+
+def marks_row(record: dict) -> dict:
+    """Map a marks spreadsheet row (one column per subject) to MarksCreate fields."""
+    return {
+        "studentId": (record.get("studentId") or "").strip(),
+        "term": (record.get("term") or "").strip(),
+        "year": (record.get("year") or "").strip(),
+        "subjects": [
+            {"subjectName": column, "mark": value.strip()}
+            for column, value in record.items()
+            if column not in MARKS_KEY_COLUMNS and column and value and value.strip()
+        ]
+    }
+
+
+def job_doc_to_response(doc: dict) -> dict:
+    """Convert an import job document to its API representation."""
+    return {
+        "id": doc["_id"],
+        "kind": doc["kind"],
+        "status": doc["status"],
+        "rowsRead": doc.get("rowsRead", 0),
+        "rowsCommitted": doc.get("rowsCommitted", 0),
+        "inserted": doc.get("inserted", 0),
+        "failed": doc.get("failed", 0),
+        "errors": doc.get("errors", []),
+        "createdAt": doc["createdAt"],
+        "updatedAt": doc["updatedAt"]
+    }
+
+
+class ImportService:
+    """Service class for spreadsheet import jobs."""
+    
+    def __init__(self):
+        self.collection = get_collection(IMPORT_JOBS_COLLECTION)
+    
+    async def get_job(self, job_id: str) -> Optional[dict]:
+        """Get an import job document by ID."""
+        return await self.collection.find_one({"_id": job_id})
+    
+    async def start_job(self, kind: str, job_id: Optional[str] = None) -> dict:
+        """
+        Create a new import job, or reopen an existing one to resume it.
+        
+        Raises:
+            HTTPException: If the job to resume does not exist or is of another kind
+        """
+        now = datetime.utcnow()
+        
+        if job_id:
+            job = await self.get_job(job_id)
+            if not job:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Import job not found: {job_id}"
+                )
+            if job["kind"] != kind:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Import job {job_id} imports {job['kind']}, not {kind}"
+                )
+            await self.collection.update_one(
+                {"_id": job_id},
+                {"$set": {"status": "running", "rowsRead": 0, "updatedAt": now}}
+            )
+            job.update(status="running", rowsRead=0, updatedAt=now)
+            return job
+        
+        job = {
+            "_id": uuid.uuid4().hex,
+            "kind": kind,
+            "status": "running",
+            "rowsRead": 0,
+            "rowsCommitted": 0,
+            "inserted": 0,
+            "failed": 0,
+            "errors": [],
+            "createdAt": now,
+            "updatedAt": now
+        }
+        await self.collection.insert_one(job)
+        return job
+    
+    async def _student_ids(self, job: dict, count: int, index_offset: int) -> List[str]:
+        """
+        Student IDs of rows index_offset ... index_offset + count - 1.
+        
+        Reuses the job's saved ID block when it covers these rows (a resumed
+        batch); otherwise reserves a new block and saves it on the job before
+        anything is inserted.
+        """
+        block = job.get("batchInFlight")
+        if not (
+            block and "number" in block
+            and block["row"] <= index_offset and index_offset + count <= block["row"] + block["count"]
+        ):
+            block = {
+                "row": index_offset,
+                "count": count,
+                "number": await reserve_sequence(STUDENT_ID_SEQUENCE, count)
+            }
+            await self._save_batch_in_flight(job, block)
+        
+        first = block["number"] + index_offset - block["row"]
+        return [format_student_id(first + i) for i in range(count)]
+    
+    async def _save_batch_in_flight(self, job: dict, batch: dict):
+        """Record the batch about to be written on the job."""
+        await self.collection.update_one(
+            {"_id": job["_id"]},
+            {"$set": {"batchInFlight": batch, "updatedAt": datetime.utcnow()}}
+        )
+        job["batchInFlight"] = batch
+    
+    async def _write_batch(self, job: dict, rows: List[dict], index_offset: int) -> List[BulkRowResult]:
+        """Write one batch of rows and return the per-row results."""
+        if job["kind"] == "students":
+            student_ids = await self._student_ids(job, len(rows), index_offset)
+            _, results = await StudentService().bulk_create(
+                rows, index_offset=index_offset, student_ids=student_ids
+            )
+            return results
+        
+        await self._save_batch_in_flight(job, {"row": index_offset, "count": len(rows)})
+        report = await MarksService().bulk_create(
+            rows,
+            chunk_size=settings.MARKS_BULK_CHUNK_SIZE,
+            index_offset=index_offset
+        )
+        return report.results
+    
+    async def _checkpoint(self, job: dict, rows_read: int, committed: int, results: List[BulkRowResult],
+                          resumed_end: int = 0):
+        """
+        Record a committed batch on the job document.
+        
+        Rows below `resumed_end` that already exist were written by the
+        interrupted attempt and count as inserted.
+        """
+        inserted = 0
+        errors = []
+        for r in results:
+            if r.status == "inserted" or (r.code == "duplicate" and r.index < resumed_end):
+                inserted += 1
+            else:
+                errors.append(r.model_dump())
+        
+        update = {
+            "$set": {"rowsRead": rows_read, "rowsCommitted": committed, "updatedAt": datetime.utcnow()},
+            "$inc": {"inserted": inserted, "failed": len(results) - inserted}
+        }
+        if errors:
+            # Keep only the first errors so the job document stays small
+            update["$push"] = {"errors": {"$each": errors, "$slice": settings.IMPORT_MAX_STORED_ERRORS}}
+        
+        await self.collection.update_one({"_id": job["_id"]}, update)
+    
+    async def run(self, job: dict, records: AsyncIterator[List[str]]) -> dict:
+        """
+        Import spreadsheet records into the job's collection.
+        
+        Rows already committed by a previous attempt of the same job are
+        skipped. The job document is updated after every batch, so progress
+        can be polled while the upload is still streaming.
+        
+        Args:
+            job: Job document from start_job
+            records: Parsed spreadsheet records, header first
+            
+        Returns:
+            Final job document
+        """
+        to_row = student_row if job["kind"] == "students" else marks_row
+        batch_size = settings.IMPORT_BATCH_SIZE
+        resume_from = job.get("rowsCommitted", 0)
+        # A resumed batch must not extend past the batch saved by the attempt
+        # that was interrupted, so it can reuse its student IDs
+        in_flight = job.get("batchInFlight")
+        resumed_end = in_flight["row"] + in_flight["count"] if in_flight else 0
+        
+        header = None
+        batch: List[dict] = []
+        batch_start = resume_from
+        rows_read = 0
+        final_status = "completed"
+        
+        try:
+            async for record in records:
+                if header is None:
+                    header = [column.strip() for column in record]
+                    continue
+                
+                row_index = rows_read
+                rows_read += 1
+                if row_index < resume_from:
+                    continue
+                
+                batch.append(to_row(dict(zip(header, record))))
+                if len(batch) >= batch_size or batch_start + len(batch) == resumed_end:
+                    results = await self._write_batch(job, batch, batch_start)
+                    batch_start += len(batch)
+                    await self._checkpoint(job, rows_read, batch_start, results, resumed_end)
+                    batch = []
+            
+            if batch:
+                results = await self._write_batch(job, batch, batch_start)
+                batch_start += len(batch)
+                await self._checkpoint(job, rows_read, batch_start, results, resumed_end)
+        except HTTPException:
+            final_status = "failed"
+            raise
+        except Exception as e:
+            # Typically the client went away mid-upload; the job can be resumed
+            final_status = "interrupted"
+            logger.warning(f"[IMPORT] Job {job['_id']} interrupted after {batch_start} rows: {e}")
+            raise
+        finally:
+            await self.collection.update_one(
+                {"_id": job["_id"]},
+                {"$set": {"status": final_status, "rowsRead": rows_read, "updatedAt": datetime.utcnow()}}
+            )
+        
+        logger.info(f"[IMPORT] Job {job['_id']} completed ({batch_start} rows)")
+        return await self.get_job(job["_id"])
@@ -0,0 +1,145 @@
+"""
+Marks service for bulk marks ingestion.
+"""
+from datetime import datetime
+from typing import List
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+from database import READ_PRIMARY, get_collection
+from models.common import BulkRowResult
+from models.marks import MarksCreate, MarksBulkResponse
+from services.counter_service import bump_versions
+from services.stats_service import StatsService
+from utils.read_cache import SUMMARY_TAG, read_cache, student_marks_tag
+import logging
+
+logger = logging.getLogger(__name__)
+
+# MongoDB duplicate key error code
+DUPLICATE_KEY_ERROR = 11000
+
+
+def format_validation_error(error: ValidationError) -> str:
+    """Flatten a pydantic ValidationError into a single readable message."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}"
+        for err in error.errors()
+    )
+
+
+def marks_create_to_doc(marks_data: MarksCreate, now: datetime) -> dict:
+    """Build a new marks document from validated input."""
+    return {
+        "studentId": marks_data.studentId,
+        "term": marks_data.term,
+        "year": marks_data.year,
+        "subjects": [s.model_dump() for s in marks_data.subjects],
+        "isActive": True,
+        "createdAt": now,
+        "updatedAt": now
+    }
+
+
+class MarksService:
+    """Service class for bulk marks operations."""
+    
+    def __init__(self):
+        self.collection = get_collection("marks")
+        self.students_collection = get_collection("students", READ_PRIMARY)
+    
+    async def bulk_create(
+        self,
+        rows: List[dict],
+        chunk_size: int = 1000,
+        index_offset: int = 0
+    ) -> MarksBulkResponse:
+        """
+        Validate and insert many marks rows.
+        
+        Student existence is checked with one $in query, uniqueness of
+        (studentId, term, year) is enforced by the unique index, and rows are
+        written with unordered insert_many in chunks, so one bad row never
+        blocks the others.
+        
+        Args:
+            rows: Raw marks rows (validated against MarksCreate)
+            chunk_size: Documents per insert_many call
+            index_offset: Added to row indexes in the report (for batched callers)
+            
+        Returns:
+            Per-row success/error report
+        """
+        results: List[BulkRowResult] = []
+        valid = []
+        
+        for index, row in enumerate(rows, start=index_offset):
+            try:
+                valid.append((index, MarksCreate.model_validate(row)))
+            except ValidationError as e:
+                results.append(BulkRowResult(
+                    index=index, status="error", error=format_validation_error(e)
+                ))
+        
+        # Verify all referenced students exist in one round trip
+        student_ids = list({marks_data.studentId for _, marks_data in valid})
+        existing_students = set()
+        if student_ids:
+            cursor = self.students_collection.find(
+                {"studentId": {"$in": student_ids}},
+                {"studentId": 1, "_id": 0}
+            )
+            existing_students = {s["studentId"] async for s in cursor}
+        
+        now = datetime.utcnow()
+        pending = []
+        for index, marks_data in valid:
+            if marks_data.studentId not in existing_students:
+                results.append(BulkRowResult(
+                    index=index, status="error",
+                    error=f"Student not found: {marks_data.studentId}"
+                ))
+            else:
+                pending.append((index, marks_create_to_doc(marks_data, now)))
+        
+        inserted_docs = []
+        for start in range(0, len(pending), chunk_size):
+            chunk = pending[start:start + chunk_size]
+            docs = [doc for _, doc in chunk]
+            failed = {}
+            
+            try:
+                await self.collection.insert_many(docs, ordered=False)
+            except BulkWriteError as e:
+                for write_error in e.details.get("writeErrors", []):
+                    failed[write_error["index"]] = write_error
+            
+            for position, (index, doc) in enumerate(chunk):
+                write_error = failed.get(position)
+                if write_error is None:
+                    inserted_docs.append(doc)
+                    results.append(BulkRowResult(index=index, status="inserted", id=str(doc["_id"])))
+                elif write_error.get("code") == DUPLICATE_KEY_ERROR:
+                    results.append(BulkRowResult(
+                        index=index, status="error", code="duplicate",
+                        error=f"Marks already exist for {doc['studentId']} - {doc['term']} {doc['year']}"
+                    ))
+                else:
+                    results.append(BulkRowResult(
+                        index=index, status="error", error=write_error.get("errmsg", "Write failed")
+                    ))
+        
+        if inserted_docs:
+            await StatsService().apply_changes([(None, doc) for doc in inserted_docs])
+            await bump_versions("marks")
+            await read_cache.invalidate(
+                SUMMARY_TAG, *{student_marks_tag(doc["studentId"]) for doc in inserted_docs}
+            )
+        
+        results.sort(key=lambda r: r.index)
+        logger.info(f"[BULK] Inserted {len(inserted_docs)} of {len(rows)} marks rows")
+        
+        return MarksBulkResponse(
+            inserted=len(inserted_docs),
+            failed=len(rows) - len(inserted_docs),
+            results=results
+        )
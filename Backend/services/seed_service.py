@@ -1,20 +1,67 @@
 """
 Seed service for initializing database with sample data.
+
+Besides the small sample dataset created on first start, seed_synthetic
+generates large deterministic datasets for load testing (see seed.py).
+All writes use insert_many; documents that already exist are skipped.
 """
+import asyncio
 import random
+import time
 from datetime import datetime
-from typing import List
+from typing import List, Optional
+from pymongo.errors import BulkWriteError
 from database import get_collection
-from utils.password import hash_password
+from services.counter_service import (
+    bump_student_sequence, bump_versions, ensure_student_sequence, format_student_id
+)
+from services.marks_service import DUPLICATE_KEY_ERROR
+from services.synthetic_data import SyntheticDataGenerator
+from utils.password import hash_password_async
+from utils.read_cache import read_cache
+from utils.search import name_search_fields
 from config import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Default random seed, so seeded data is the same on every run
+DEFAULT_SEED = 42
+
+
+async def insert_many_new(collection, docs: List[dict]) -> int:
+    """
+    Insert documents, skipping those a unique index reports as existing.
+    
+    Args:
+        collection: Target collection
+        docs: Documents to insert
+        
+    Returns:
+        Number of documents inserted
+        
+    Raises:
+        BulkWriteError: If a write failed for another reason than a duplicate key
+    """
+    if not docs:
+        return 0
+    try:
+        result = await collection.insert_many(docs, ordered=False)
+        return len(result.inserted_ids)
+    except BulkWriteError as e:
+        write_errors = e.details.get("writeErrors", [])
+        if any(error.get("code") != DUPLICATE_KEY_ERROR for error in write_errors):
+            raise
+        return e.details.get("nInserted", len(docs) - len(write_errors))
+
 
 class SeedService:
     """Service class for seeding initial data."""
     
+    def __init__(self, seed: int = DEFAULT_SEED):
+        self.seed = seed
+        self.rng = random.Random(seed)
+    
     # Sample Sri Lankan names for students
     STUDENT_NAMES = [
         "Kamal Perera",
@@ -61,7 +108,7 @@ class SeedService:
         # Create admin user with hashed password
         admin_doc = {
             "username": settings.ADMIN_USERNAME,
-            "password": hash_password(settings.ADMIN_PASSWORD),
+            "password": await hash_password_async(settings.ADMIN_PASSWORD),
             "role": "ADMIN",
             "isActive": True,
             "createdAt": datetime.utcnow()
@@ -88,30 +135,36 @@ class SeedService:
             existing = await students_collection.find({}).to_list(length=100)
             return [s["studentId"] for s in existing]
         
-        student_ids = []
+        student_docs = []
+        now = datetime.utcnow()
         
         for i, name in enumerate(self.STUDENT_NAMES, start=1):
-            student_id = f"STU-{i:03d}"
-            
             # Generate random mobile numbers
             mobile_numbers = [
-                f"07{random.randint(10000000, 99999999)}",
-                f"07{random.randint(10000000, 99999999)}"
+                f"07{self.rng.randint(10000000, 99999999)}",
+                f"07{self.rng.randint(10000000, 99999999)}"
             ]
             
-            student_doc = {
-                "studentId": student_id,
+            student_docs.append({
+                "studentId": format_student_id(i),
+                "studentNumber": i,
                 "name": name,
-                "grade": random.choice(self.GRADES),
+                "grade": self.rng.choice(self.GRADES),
                 "mobileNumbers": mobile_numbers,
+                **name_search_fields(name),
                 "isActive": True,
-                "createdAt": datetime.utcnow(),
-                "updatedAt": datetime.utcnow()
-            }
-            
-            await students_collection.insert_one(student_doc)
-            student_ids.append(student_id)
-            logger.info(f"[OK] Created student: {student_id} - {name}")
+                "createdAt": now,
+                "updatedAt": now
+            })
+        
+        await insert_many_new(students_collection, student_docs)
+        await bump_versions("students")
+        await read_cache.clear()
+        student_ids = [doc["studentId"] for doc in student_docs]
+        logger.info(f"[OK] Created {len(student_ids)} students")
+        
+        # Continue the student ID sequence after the seeded IDs
+        await bump_student_sequence(len(self.STUDENT_NAMES))
         
         return student_ids
     
@@ -133,39 +186,122 @@ class SeedService:
             logger.info(f"[OK] Marks already exist ({count} records)")
             return count
         
-        marks_count = 0
+        marks_docs = []
         current_year = datetime.now().year
+        now = datetime.utcnow()
         
         for student_id in student_ids:
             for term in self.TERMS:
                 # Select 3-4 random subjects
-                num_subjects = random.randint(3, 4)
-                selected_subjects = random.sample(self.SUBJECTS, num_subjects)
+                num_subjects = self.rng.randint(3, 4)
+                selected_subjects = self.rng.sample(self.SUBJECTS, num_subjects)
                 
                 subjects = []
                 for subject_name in selected_subjects:
                     subjects.append({
                         "subjectName": subject_name,
-                        "mark": round(random.uniform(45, 100), 1),
+                        "mark": round(self.rng.uniform(45, 100), 1),
                         "isActive": True
                     })
                 
-                marks_doc = {
+                marks_docs.append({
                     "studentId": student_id,
                     "term": term,
                     "year": current_year,
                     "subjects": subjects,
                     "isActive": True,
-                    "createdAt": datetime.utcnow(),
-                    "updatedAt": datetime.utcnow()
-                }
-                
-                await marks_collection.insert_one(marks_doc)
-                marks_count += 1
+                    "createdAt": now,
+                    "updatedAt": now
+                })
+        
+        marks_count = await insert_many_new(marks_collection, marks_docs)
+        if marks_count:
+            await bump_versions("marks")
+            await read_cache.clear()
         
         logger.info(f"[OK] Created {marks_count} marks records")
         return marks_count
     
+    async def seed_synthetic(
+        self,
+        students: int,
+        terms: int = 3,
+        chunk_size: int = 1000,
+        concurrency: int = 4,
+        last_year: Optional[int] = None
+    ) -> dict:
+        """
+        Generate a large synthetic dataset (students STU-001 ... STU-<students>).
+        
+        Students are generated a chunk at a time and written with insert_many
+        while the next chunk is generated, with at most `concurrency` chunks
+        in flight. Documents are deterministic for a given seed, so re-running
+        (or resuming after an interruption) only inserts what is missing.
+        Marks bypass the statistics rollup; rebuild it afterwards.
+        
+        Args:
+            students: Number of students
+            terms: Marks records (terms) per student
+            chunk_size: Documents per insert_many
+            concurrency: Chunks written concurrently
+            last_year: Year of the most recent term (default: current year)
+            
+        Returns:
+            Inserted and skipped counts per collection and elapsed seconds
+        """
+        students_collection = get_collection("students")
+        marks_collection = get_collection("marks")
+        generator = SyntheticDataGenerator(self.seed, terms, last_year)
+        
+        totals = {"students": 0, "marks": 0}
+        slots = asyncio.Semaphore(concurrency)
+        tasks = []
+        start = time.perf_counter()
+        progress_step = max(chunk_size, students // 10)
+        
+        async def write(student_docs: List[dict], marks_docs: List[dict]):
+            try:
+                totals["students"] += await insert_many_new(students_collection, student_docs)
+                for offset in range(0, len(marks_docs), chunk_size):
+                    totals["marks"] += await insert_many_new(
+                        marks_collection, marks_docs[offset:offset + chunk_size]
+                    )
+            finally:
+                slots.release()
+        
+        logger.info(f"[SEED] Generating {students} students x {terms} terms (seed {self.seed})...")
+        
+        for first in range(1, students + 1, chunk_size):
+            await slots.acquire()
+            now = datetime.utcnow()
+            student_docs = []
+            marks_docs = []
+            for number in range(first, min(first + chunk_size, students + 1)):
+                student, marks = generator.student_with_marks(number, now)
+                student_docs.append(student)
+                marks_docs.extend(marks)
+            tasks.append(asyncio.create_task(write(student_docs, marks_docs)))
+            
+            if (first - 1) // progress_step != (first - 1 + len(student_docs)) // progress_step:
+                logger.info(f"[SEED] {first - 1 + len(student_docs)}/{students} students generated")
+        
+        await asyncio.gather(*tasks)
+        
+        # Continue the student ID sequence after the generated IDs
+        await bump_student_sequence(students)
+        await bump_versions("students", "marks")
+        await read_cache.clear()
+        
+        summary = {
+            "students_inserted": totals["students"],
+            "students_skipped": students - totals["students"],
+            "marks_inserted": totals["marks"],
+            "marks_skipped": students * terms - totals["marks"],
+            "seconds": round(time.perf_counter() - start, 1)
+        }
+        logger.info(f"[SEED] Synthetic seeding complete: {summary}")
+        return summary
+    
     async def run_all_seeds(self) -> dict:
         """
         Run all seed operations.
@@ -181,6 +317,9 @@ class SeedService:
         # Seed students
         student_ids = await self.seed_students()
         
+        # Initialize the student ID sequence for existing databases
+        await ensure_student_sequence()
+        
         # Seed marks
         marks_count = await self.seed_marks(student_ids)
         
@@ -0,0 +1,192 @@
+"""
+In-process autocomplete index for the student picker.
+
+Keeps a sorted array of (search key, studentId) entries for every active
+student, where the keys are the normalized full name, each name word, the lowercase
+student ID and its number. A completion is a binary search for the prefix followed
+by a short forward scan, so suggestions never touch the database.
+
+The index is loaded once per worker (at startup, or on first use in
+serverless deployments) and kept current by the student write routes of the
+same worker. Writes handled by other workers are picked up when the index
+is reloaded after SUGGEST_MAX_AGE_SECONDS. Only the first load blocks
+requests; a stale index keeps answering while the reload runs in a
+background task, and the new array is swapped in when it is complete.
+Writes made by this worker while a reload is reading are applied to the
+new array before the swap.
+"""
+import asyncio
+import time
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+from database import READ_ANALYTICS, get_collection
+from utils.search import name_search_fields, normalize_text
+from config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def suggestion_keys(doc: dict) -> Tuple[str, ...]:
+    """Search keys a student is found under: name, name words, ID and ID number."""
+    fields = doc if "nameWords" in doc else name_search_fields(doc["name"])
+    student_id = doc["studentId"].lower()
+    keys = {fields["nameLower"], student_id, student_id.rsplit("-", 1)[-1], *fields["nameWords"]}
+    return tuple(sorted(keys))
+
+
+class StudentSuggestIndex:
+    """Sorted-array prefix index of active students."""
+    
+    def __init__(self):
+        self._entries: List[Tuple[str, str]] = []
+        self._students: Dict[str, dict] = {}
+        self._keys: Dict[str, Tuple[str, ...]] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._reload_task: Optional[asyncio.Task] = None
+        # Writes seen while a load is reading: studentId -> doc (None when removed)
+        self._pending: Optional[Dict[str, Optional[dict]]] = None
+    
+    @property
+    def size(self) -> int:
+        """Number of indexed students."""
+        return len(self._students)
+    
+    def _is_fresh(self) -> bool:
+        if self._loaded_at is None:
+            return False
+        max_age = settings.SUGGEST_MAX_AGE_SECONDS
+        return max_age <= 0 or time.monotonic() - self._loaded_at < max_age
+    
+    def build(self, docs: Iterable[dict]):
+        """Replace the index contents with the given active students."""
+        students = {}
+        keys = {}
+        entries = []
+        
+        for doc in docs:
+            student_keys = suggestion_keys(doc)
+            students[doc["studentId"]] = {
+                "studentId": doc["studentId"], "name": doc["name"], "grade": doc["grade"]
+            }
+            keys[doc["studentId"]] = student_keys
+            entries.extend((key, doc["studentId"]) for key in student_keys)
+        
+        entries.sort()
+        self._entries, self._students, self._keys = entries, students, keys
+        self._loaded_at = time.monotonic()
+    
+    async def load(self):
+        """(Re)build the index from all active students."""
+        start = time.perf_counter()
+        if self._pending is None:
+            self._pending = {}
+        try:
+            docs = await get_collection("students", READ_ANALYTICS).find(
+                {"isActive": True},
+                {"_id": 0, "studentId": 1, "name": 1, "grade": 1, "nameLower": 1, "nameWords": 1}
+            ).batch_size(5000).to_list(length=None)
+        finally:
+            pending, self._pending = self._pending, None
+        
+        self.build(docs)
+        for student_id, doc in pending.items():
+            if doc is None:
+                self._drop(student_id)
+            else:
+                self._add(doc)
+        logger.info(
+            f"[OK] Student suggest index loaded ({len(docs)} students) "
+            f"in {(time.perf_counter() - start) * 1000:.0f} ms"
+        )
+    
+    async def _reload(self):
+        try:
+            await self.load()
+        except Exception as e:
+            # Keep serving the current index; the next request retries
+            logger.warning(f"[SUGGEST] Background reload failed: {e}")
+    
+    async def ensure_loaded(self):
+        """
+        Load the index if it is missing, or start a background reload if it
+        is older than SUGGEST_MAX_AGE_SECONDS.
+        """
+        if self._is_fresh():
+            return
+        if self._loaded_at is not None:
+            if self._reload_task is None or self._reload_task.done():
+                # Record writes from now on, before the task gets to run
+                self._pending = {}
+                self._reload_task = asyncio.ensure_future(self._reload())
+            return
+        async with self._lock:
+            if self._loaded_at is None:
+                await self.load()
+    
+    def remove(self, student_id: str):
+        """Drop a student from the index."""
+        if self._pending is not None:
+            self._pending[student_id] = None
+        self._drop(student_id)
+    
+    def _drop(self, student_id: str):
+        student_keys = self._keys.pop(student_id, ())
+        self._students.pop(student_id, None)
+        for key in student_keys:
+            position = bisect_left(self._entries, (key, student_id))
+            if position < len(self._entries) and self._entries[position] == (key, student_id):
+                del self._entries[position]
+    
+    def upsert(self, doc: dict):
+        """
+        Add or refresh a student after a create or update.
+        
+        Inactive (soft deleted) students are removed.
+        """
+        if self._pending is not None:
+            self._pending[doc["studentId"]] = doc if doc.get("isActive", True) else None
+        if self._loaded_at is None:
+            return
+        self._add(doc)
+    
+    def _add(self, doc: dict):
+        self._drop(doc["studentId"])
+        if not doc.get("isActive", True):
+            return
+        
+        student_keys = suggestion_keys(doc)
+        self._students[doc["studentId"]] = {
+            "studentId": doc["studentId"], "name": doc["name"], "grade": doc["grade"]
+        }
+        self._keys[doc["studentId"]] = student_keys
+        for key in student_keys:
+            insort(self._entries, (key, doc["studentId"]))
+    
+    def suggest(self, prefix: str, limit: int) -> List[dict]:
+        """
+        Return up to `limit` students with a key starting with `prefix`.
+        
+        Completions come in key order, so an exact match of a name or ID
+        ranks before longer completions.
+        """
+        normalized = normalize_text(prefix)
+        if not normalized:
+            return []
+        
+        results = []
+        seen = set()
+        position = bisect_left(self._entries, (normalized, ""))
+        while position < len(self._entries) and len(results) < limit:
+            key, student_id = self._entries[position]
+            if not key.startswith(normalized):
+                break
+            if student_id not in seen:
+                seen.add(student_id)
+                results.append(self._students[student_id])
+            position += 1
+        return results
+
+
+student_suggest_index = StudentSuggestIndex()
@@ -1,5 +1,29 @@
-"""Utils package initialization."""
-from utils.password import hash_password, verify_password
-from utils.jwt import create_access_token, verify_token, get_current_user
+"""
+Utils package initialization.
 
+Re-exports are resolved on first access, so importing one utility module
+(e.g. utils.search) does not load passlib or python-jose.
+"""
+import importlib
 
+_EXPORTS = {
+    "hash_password": "utils.password",
+    "verify_password": "utils.password",
+    "hash_password_async": "utils.password",
+    "verify_password_async": "utils.password",
+    "create_access_token": "utils.jwt",
+    "verify_token": "utils.jwt",
+    "get_current_user": "utils.jwt",
+    "encode_cursor": "utils.pagination",
+    "decode_cursor": "utils.pagination",
+    "normalize_text": "utils.search",
+    "name_search_fields": "utils.search",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_EXPORTS[name]), name)
@@ -0,0 +1,258 @@
+"""
+Prometheus metrics for requests, MongoDB commands and password hashing.
+
+Metrics are kept in plain counters and fixed-bucket histograms and rendered
+in the Prometheus text format by GET /metrics:
+    
+    http_requests_total                 requests per method, route and status
+    http_request_duration_seconds       latency histogram per method and route
+    http_requests_in_flight             requests currently being handled
+    mongodb_command_duration_seconds    driver command latency per command name
+    mongodb_command_failures_total      failed commands per command name
+    password_hash_duration_seconds      bcrypt time per operation (hash/verify)
+    jwt_cache_*                         verified-token cache hits, misses, size
+    read_cache_*                        read cache hits, misses, hit ratio per cache
+    singleflight_*                      queries executed and collapsed per group
+    mongodb_pool_*                      connection pool gauges (see pool_metrics)
+
+Routes are labelled with their path template (/students/{student_id}), never
+the raw path, so label cardinality stays bounded; requests that match no
+route are labelled "unmatched".
+"""
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+from pymongo import monitoring
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Prometheus text format (the response class adds "; charset=utf-8")
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+class Histogram:
+    """Fixed-bucket histogram (bucket counts are not cumulative until rendered)."""
+    
+    __slots__ = ("counts", "total", "count")
+    
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+    
+    def observe(self, value: float):
+        self.counts[bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+def _labels(names: Tuple[str, ...], values: Tuple) -> str:
+    pairs = []
+    for name, value in zip(names, values):
+        value = str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return ",".join(pairs)
+
+
+def _series(name: str, labels: str) -> str:
+    return f"{name}{{{labels}}}" if labels else name
+
+
+def _render_counter(lines: List[str], name: str, help_text: str, label_names: Tuple[str, ...], values: Dict):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} counter")
+    for key, value in sorted(values.items()):
+        lines.append(f"{_series(name, _labels(label_names, key))} {value}")
+
+
+def _render_gauge(lines: List[str], name: str, help_text: str, value):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} gauge")
+    lines.append(f"{name} {value}")
+
+
+def _render_gauges(lines: List[str], name: str, help_text: str, label_names: Tuple[str, ...], values: Dict):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} gauge")
+    for key, value in sorted(values.items()):
+        lines.append(f"{_series(name, _labels(label_names, key))} {value}")
+
+
+def _render_histogram(lines: List[str], name: str, help_text: str, label_names: Tuple[str, ...],
+                      histograms: Dict[Tuple, Histogram]):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for key, histogram in sorted(histograms.items()):
+        labels = _labels(label_names, key)
+        prefix = f"{labels}," if labels else ""
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, histogram.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {histogram.count}')
+        lines.append(f"{_series(name + '_sum', labels)} {histogram.total:.6f}")
+        lines.append(f"{_series(name + '_count', labels)} {histogram.count}")
+
+
+class Metrics:
+    """
+    In-process metrics registry.
+    
+    Request metrics are only updated on the event loop thread; command and
+    hashing metrics come from driver and executor threads and are guarded
+    by a lock.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        """Clear all metrics."""
+        with self._lock:
+            self.requests: Dict[Tuple[str, str, int], int] = {}
+            self.request_latency: Dict[Tuple[str, str], Histogram] = {}
+            self.in_flight = 0
+            self.commands: Dict[Tuple[str], Histogram] = {}
+            self.command_failures: Dict[Tuple[str], int] = {}
+            self.password_hashing: Dict[Tuple[str], Histogram] = {}
+    
+    def observe_request(self, method: str, route: str, status_code: int, seconds: float):
+        """Record a finished HTTP request."""
+        key = (method, route, status_code)
+        self.requests[key] = self.requests.get(key, 0) + 1
+        histogram = self.request_latency.get((method, route))
+        if histogram is None:
+            histogram = self.request_latency[(method, route)] = Histogram()
+        histogram.observe(seconds)
+    
+    def observe_command(self, command_name: str, seconds: float, failed: bool = False):
+        """Record a MongoDB command (called from driver threads)."""
+        with self._lock:
+            histogram = self.commands.get((command_name,))
+            if histogram is None:
+                histogram = self.commands[(command_name,)] = Histogram()
+            histogram.observe(seconds)
+            if failed:
+                self.command_failures[(command_name,)] = self.command_failures.get((command_name,), 0) + 1
+    
+    def observe_password_hashing(self, operation: str, seconds: float):
+        """Record one bcrypt hash or verify (called from the hashing threads)."""
+        with self._lock:
+            histogram = self.password_hashing.get((operation,))
+            if histogram is None:
+                histogram = self.password_hashing[(operation,)] = Histogram()
+            histogram.observe(seconds)
+    
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        from utils.jwt import token_cache
+        from utils.pool_metrics import pool_metrics
+        from utils.read_cache import read_cache
+        from utils.single_flight import single_flight
+        
+        lines: List[str] = []
+        _render_counter(lines, "http_requests_total", "HTTP requests handled.",
+                        ("method", "route", "status"), dict(self.requests))
+        _render_histogram(lines, "http_request_duration_seconds", "HTTP request latency.",
+                          ("method", "route"), dict(self.request_latency))
+        _render_gauge(lines, "http_requests_in_flight", "HTTP requests being handled.", self.in_flight)
+        
+        with self._lock:
+            commands = dict(self.commands)
+            command_failures = dict(self.command_failures)
+            password_hashing = dict(self.password_hashing)
+        _render_histogram(lines, "mongodb_command_duration_seconds", "MongoDB command latency.",
+                          ("command",), commands)
+        _render_counter(lines, "mongodb_command_failures_total", "Failed MongoDB commands.",
+                        ("command",), command_failures)
+        _render_histogram(lines, "password_hash_duration_seconds", "bcrypt hashing time.",
+                          ("operation",), password_hashing)
+        
+        cache = token_cache.stats()
+        _render_counter(lines, "jwt_cache_hits_total", "Verified-token cache hits.", (), {(): cache["hits"]})
+        _render_counter(lines, "jwt_cache_misses_total", "Verified-token cache misses.", (), {(): cache["misses"]})
+        _render_gauge(lines, "jwt_cache_hit_ratio", "Verified-token cache hit ratio.", cache["hitRate"])
+        _render_gauge(lines, "jwt_cache_size", "Tokens in the verified-token cache.", cache["size"])
+        
+        reads = read_cache.stats()["namespaces"]
+        _render_counter(lines, "read_cache_hits_total", "Read cache hits.",
+                        ("cache",), {(name,): entry["hits"] for name, entry in reads.items()})
+        _render_counter(lines, "read_cache_misses_total", "Read cache misses.",
+                        ("cache",), {(name,): entry["misses"] for name, entry in reads.items()})
+        _render_gauges(lines, "read_cache_hit_ratio", "Read cache hit ratio.",
+                       ("cache",), {(name,): entry["hitRate"] for name, entry in reads.items()})
+        
+        flights = single_flight.stats()["groups"]
+        _render_counter(lines, "singleflight_executed_total", "Coalesced queries executed.",
+                        ("group",), {(name,): entry["executed"] for name, entry in flights.items()})
+        _render_counter(lines, "singleflight_collapsed_total", "Queries served by an identical in-flight query.",
+                        ("group",), {(name,): entry["collapsed"] for name, entry in flights.items()})
+        
+        pool = pool_metrics.stats()
+        _render_gauge(lines, "mongodb_pool_open_connections", "Open pooled connections.", pool["openConnections"])
+        _render_gauge(lines, "mongodb_pool_checked_out", "Connections checked out.", pool["checkedOut"])
+        _render_counter(lines, "mongodb_pool_checkouts_total", "Connection checkouts.", (), {(): pool["checkouts"]})
+        
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """Command listener feeding driver-reported command durations to `metrics`."""
+    
+    def started(self, event):
+        pass
+    
+    def succeeded(self, event):
+        metrics.observe_command(event.command_name, event.duration_micros / 1e6)
+    
+    def failed(self, event):
+        metrics.observe_command(event.command_name, event.duration_micros / 1e6, failed=True)
+
+
+command_metrics = CommandMetrics()
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request counts, latency and in-flight requests.
+    
+    Implemented at the ASGI level (not with @app.middleware) so it adds no
+    extra task or response wrapping, and streaming responses are timed until
+    their last chunk is sent.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        status_code = 500
+        
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        metrics.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            metrics.in_flight -= 1
+            route = scope.get("route")
+            metrics.observe_request(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                status_code,
+                time.perf_counter() - start
+            )
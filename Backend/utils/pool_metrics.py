@@ -0,0 +1,105 @@
+"""
+Connection pool metrics collected from the driver's CMAP events.
+
+Motor runs each operation's connection checkout on a driver thread, so the
+time between "checkout started" and "checked out" (or "checkout failed") is
+measured per thread. Counters are aggregated across all server pools.
+"""
+import threading
+import time
+from pymongo import monitoring
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Connection pool listener that keeps running totals."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+    
+    def reset(self):
+        """Clear all counters."""
+        with self._lock:
+            self.open_connections = 0
+            self.checked_out = 0
+            self.peak_checked_out = 0
+            self.checkouts = 0
+            self.checkout_failures = {}
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+            self.waits_over_1ms = 0
+    
+    def _record_wait(self) -> float:
+        started = getattr(self._local, "checkout_started", None)
+        self._local.checkout_started = None
+        return time.perf_counter() - started if started is not None else 0.0
+    
+    def connection_check_out_started(self, event):
+        self._local.checkout_started = time.perf_counter()
+    
+    def connection_checked_out(self, event):
+        wait = self._record_wait()
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+            if wait > 0.001:
+                self.waits_over_1ms += 1
+    
+    def connection_check_out_failed(self, event):
+        wait = self._record_wait()
+        with self._lock:
+            self.checkout_failures[event.reason] = self.checkout_failures.get(event.reason, 0) + 1
+            self.wait_max = max(self.wait_max, wait)
+    
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out = max(0, self.checked_out - 1)
+    
+    def connection_created(self, event):
+        with self._lock:
+            self.open_connections += 1
+    
+    def connection_closed(self, event):
+        with self._lock:
+            self.open_connections = max(0, self.open_connections - 1)
+    
+    def pool_created(self, event):
+        pass
+    
+    def pool_ready(self, event):
+        pass
+    
+    def pool_cleared(self, event):
+        pass
+    
+    def pool_closed(self, event):
+        pass
+    
+    def connection_ready(self, event):
+        pass
+    
+    def stats(self) -> dict:
+        """
+        Snapshot of the pool counters.
+        
+        Returns:
+            Dict with connection counts and checkout wait times in milliseconds
+        """
+        with self._lock:
+            return {
+                "openConnections": self.open_connections,
+                "checkedOut": self.checked_out,
+                "peakCheckedOut": self.peak_checked_out,
+                "checkouts": self.checkouts,
+                "checkoutFailures": dict(self.checkout_failures),
+                "waitsOver1ms": self.waits_over_1ms,
+                "avgWaitMs": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0,
+                "maxWaitMs": round(self.wait_max * 1000, 3)
+            }
+
+
+pool_metrics = PoolMetrics()
@@ -0,0 +1,421 @@
+"""
+Read cache for hot single-entity reads.
+
+Routes cache the MongoDB results of their hot reads (a student, a student's
+marks, the marks summary) under keys built from the route and its
+parameters, and tag every entry with the entities it depends on
+("student:STU-001", "student_marks:STU-001", "summary"). Write routes
+invalidate exactly those tags once their write has completed.
+
+Backends (READ_CACHE_BACKEND):
+
+    memory          in-process LRU with TTL (default); invalidation is exact
+                    within a worker, other workers may serve an entry until
+                    its TTL expires
+    redis           shared by all workers (optional `redis` package,
+                    READ_CACHE_REDIS_URL); values are stored as BSON
+    local-shared    in-process stand-in for the shared backend: same BSON
+                    round trip and tag bookkeeping, no server needed (tests,
+                    benchmarks)
+
+Entries of the student lookup, and of routes that also send ETags, store
+the collection versions they were loaded at (see utils/etag.py) and only
+count as hits while those versions are current, so they are exact on every
+backend and worker.
+"""
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set
+from urllib.parse import urlencode
+import bson
+from config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Tag of the summary entry (dropped by every student and marks write)
+SUMMARY_TAG = "summary"
+
+
+def student_tag(student_id: str) -> str:
+    """Tag of the cached lookups of a student (by studentId or ObjectId)."""
+    return f"student:{student_id}"
+
+
+def student_marks_tag(student_id: str) -> str:
+    """Tag of the cached marks lists of a student (any term/year filter)."""
+    return f"student_marks:{student_id}"
+
+
+def cache_key(namespace: str, *parts: Any, **params: Any) -> str:
+    """
+    Build a cache key from a route namespace, path parts and query parameters.
+    
+    Args:
+        namespace: Route name, e.g. "student_marks"
+        parts: Path parameters
+        params: Query parameters (None values are left out)
+        
+    Returns:
+        Key such as "student_marks:STU-001?term=Term+1"
+    """
+    key = ":".join([namespace, *(str(part) for part in parts)])
+    query = urlencode(sorted((name, value) for name, value in params.items() if value is not None))
+    return f"{key}?{query}" if query else key
+
+
+class CacheBackend(ABC):
+    """Interface of read cache stores. Values must be treated as read-only."""
+    
+    name = "none"
+    
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        """Stored value of `key`, or None if missing or expired."""
+    
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float, tags: Iterable[str]):
+        """Store a value for `ttl` seconds under the given tags."""
+    
+    @abstractmethod
+    async def invalidate(self, tags: Iterable[str]):
+        """Drop every entry carrying any of the tags."""
+    
+    @abstractmethod
+    async def clear(self):
+        """Drop every entry."""
+    
+    def size(self) -> Optional[int]:
+        """Number of entries, if the backend can tell cheaply."""
+        return None
+
+
+class _TagIndex:
+    """Entries per tag, for the in-process backends."""
+    
+    def __init__(self):
+        self.keys: Dict[str, Set[str]] = {}
+    
+    def add(self, key: str, tags: Iterable[str]):
+        for tag in tags:
+            self.keys.setdefault(tag, set()).add(key)
+    
+    def discard(self, key: str, tags: Iterable[str]):
+        for tag in tags:
+            keys = self.keys.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.keys[tag]
+    
+    def pop(self, tag: str) -> Set[str]:
+        return self.keys.pop(tag, set())
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Bounded in-process LRU; values are kept as the same Python objects."""
+    
+    name = "memory"
+    
+    def __init__(self, maxsize: int = 2048):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._tags = _TagIndex()
+    
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._tags.discard(key, entry[2])
+    
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+    
+    async def set(self, key: str, value: Any, ttl: float, tags: Iterable[str]):
+        if self.maxsize <= 0:
+            return
+        tags = tuple(tags)
+        self._remove(key)
+        self._entries[key] = (value, time.monotonic() + ttl, tags)
+        self._tags.add(key, tags)
+        while len(self._entries) > self.maxsize:
+            self._remove(next(iter(self._entries)))
+    
+    async def invalidate(self, tags: Iterable[str]):
+        for tag in tags:
+            for key in self._tags.pop(tag):
+                self._remove(key)
+    
+    async def clear(self):
+        self._entries.clear()
+        self._tags = _TagIndex()
+    
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class SharedCacheBackend(CacheBackend):
+    """
+    Base of backends shared between workers.
+    
+    Values cross a process boundary, so they are encoded as BSON, which
+    keeps ObjectIds and datetimes as they come from the driver.
+    """
+    
+    @staticmethod
+    def encode(value: Any) -> bytes:
+        return bson.encode({"v": value})
+    
+    @staticmethod
+    def decode(data: bytes) -> Any:
+        return bson.decode(data)["v"]
+
+
+class LocalSharedCacheBackend(SharedCacheBackend):
+    """In-process stand-in for a shared backend (BSON round trip, TTL, tags)."""
+    
+    name = "local-shared"
+    
+    def __init__(self):
+        self._entries: Dict[str, tuple] = {}
+        self._tags = _TagIndex()
+    
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            return None
+        return self.decode(entry[0])
+    
+    async def set(self, key: str, value: Any, ttl: float, tags: Iterable[str]):
+        tags = tuple(tags)
+        self._entries[key] = (self.encode(value), time.monotonic() + ttl, tags)
+        self._tags.add(key, tags)
+    
+    async def invalidate(self, tags: Iterable[str]):
+        for tag in tags:
+            for key in self._tags.pop(tag):
+                entry = self._entries.pop(key, None)
+                if entry is not None:
+                    self._tags.discard(key, entry[2])
+    
+    async def clear(self):
+        self._entries.clear()
+        self._tags = _TagIndex()
+    
+    def size(self) -> int:
+        now = time.monotonic()
+        return sum(1 for entry in self._entries.values() if entry[1] > now)
+
+
+class RedisCacheBackend(SharedCacheBackend):
+    """
+    Redis backend: one string per entry, one set of keys per tag.
+    
+    All entries share the cache TTL, so a tag set expiring with its newest
+    entry outlives every entry it lists.
+    """
+    
+    name = "redis"
+    PREFIX = "read_cache:"
+    
+    def __init__(self, url: str):
+        self.url = url
+        self._client = None
+    
+    @property
+    def client(self):
+        if self._client is None:
+            import redis.asyncio as redis
+            self._client = redis.Redis.from_url(self.url)
+        return self._client
+    
+    async def get(self, key: str) -> Optional[Any]:
+        data = await self.client.get(self.PREFIX + key)
+        return None if data is None else self.decode(data)
+    
+    async def set(self, key: str, value: Any, ttl: float, tags: Iterable[str]):
+        ttl_ms = max(1, int(ttl * 1000))
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.set(self.PREFIX + key, self.encode(value), px=ttl_ms)
+            for tag in tags:
+                pipe.sadd(self.PREFIX + "tag:" + tag, self.PREFIX + key)
+                pipe.pexpire(self.PREFIX + "tag:" + tag, ttl_ms)
+            await pipe.execute()
+    
+    async def invalidate(self, tags: Iterable[str]):
+        tag_keys = [self.PREFIX + "tag:" + tag for tag in tags]
+        if not tag_keys:
+            return
+        async with self.client.pipeline(transaction=False) as pipe:
+            for tag_key in tag_keys:
+                pipe.smembers(tag_key)
+            members = await pipe.execute()
+        keys = set().union(*members)
+        await self.client.delete(*keys, *tag_keys)
+    
+    async def clear(self):
+        async for key in self.client.scan_iter(match=self.PREFIX + "*", count=1000):
+            await self.client.delete(key)
+
+
+def create_backend() -> CacheBackend:
+    """Backend selected by READ_CACHE_BACKEND."""
+    if settings.READ_CACHE_BACKEND == "redis":
+        return RedisCacheBackend(settings.READ_CACHE_REDIS_URL)
+    if settings.READ_CACHE_BACKEND == "local-shared":
+        return LocalSharedCacheBackend()
+    return MemoryCacheBackend(settings.READ_CACHE_SIZE)
+
+
+class ReadCache:
+    """
+    Cache front end with per-namespace hit ratios.
+    
+    Backend failures never fail a request: reads fall back to the loader
+    and are logged ("[CACHE] ...").
+    """
+    
+    def __init__(self, backend: CacheBackend, ttl: float = 30.0, enabled: bool = True):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+        # Advanced by every invalidation; a load that overlapped one is not stored
+        self._generation = 0
+        self.reset_stats()
+    
+    def reset_stats(self):
+        """Reset the hit and miss counters."""
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+    
+    def _count(self, counters: Dict[str, int], key: str):
+        namespace = key.split(":", 1)[0].split("?", 1)[0]
+        counters[namespace] = counters.get(namespace, 0) + 1
+    
+    async def get(self, key: str, versions: Optional[dict] = None) -> Optional[Any]:
+        """
+        Look up a cached value.
+        
+        Args:
+            key: Cache key (see cache_key)
+            versions: Current collection versions; an entry stored at other
+                versions is a miss
+                
+        Returns:
+            The cached value, or None on a miss
+        """
+        if not self.enabled:
+            return None
+        try:
+            entry = await self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"[CACHE] get failed for {key}: {e}")
+            entry = None
+        
+        if entry is None or (versions is not None and entry.get("versions") != versions):
+            self._count(self.misses, key)
+            return None
+        self._count(self.hits, key)
+        return entry["value"]
+    
+    async def set(self, key: str, value: Any, tags: Iterable[str], versions: Optional[dict] = None,
+                  generation: Optional[int] = None):
+        """
+        Store a value under `key`, tagged for invalidation.
+        
+        Args:
+            key: Cache key
+            value: Value to cache (None is never cached)
+            tags: Entities the value depends on
+            versions: Collection versions the value was loaded at
+            generation: `generation` read before the value was loaded; the
+                value is dropped if an invalidation happened since
+        """
+        if not self.enabled or value is None:
+            return
+        if generation is not None and generation != self._generation:
+            return
+        try:
+            await self.backend.set(key, {"value": value, "versions": versions}, self.ttl, tags)
+        except Exception as e:
+            logger.warning(f"[CACHE] set failed for {key}: {e}")
+    
+    @property
+    def generation(self) -> int:
+        return self._generation
+    
+    async def get_or_load(self, key: str, load: Callable[[], Awaitable[Any]], tags: Iterable[str],
+                          versions: Optional[dict] = None) -> Any:
+        """
+        Return the cached value of `key`, loading and caching it on a miss.
+        
+        Args:
+            key: Cache key
+            load: Coroutine function producing the value
+            tags: Entities the value depends on
+            versions: Current collection versions (see get)
+        """
+        value = await self.get(key, versions)
+        if value is not None:
+            return value
+        generation = self._generation
+        value = await load()
+        await self.set(key, value, tags, versions, generation)
+        return value
+    
+    async def invalidate(self, *tags: str):
+        """Drop the entries of the given tags (call after the write completed)."""
+        if not self.enabled or not tags:
+            return
+        self._generation += 1
+        try:
+            await self.backend.invalidate(tags)
+        except Exception as e:
+            logger.warning(f"[CACHE] invalidate failed for {tags}: {e}")
+    
+    async def clear(self):
+        """Drop every entry (e.g. after seeding or rebuilding data)."""
+        self._generation += 1
+        try:
+            await self.backend.clear()
+        except Exception as e:
+            logger.warning(f"[CACHE] clear failed: {e}")
+    
+    def stats(self) -> dict:
+        """Backend, size and hits/misses/hit rate per namespace."""
+        namespaces = {}
+        for namespace in sorted(set(self.hits) | set(self.misses)):
+            hits = self.hits.get(namespace, 0)
+            misses = self.misses.get(namespace, 0)
+            namespaces[namespace] = {
+                "hits": hits,
+                "misses": misses,
+                "hitRate": round(hits / (hits + misses), 4) if hits + misses else 0
+            }
+        hits = sum(self.hits.values())
+        lookups = hits + sum(self.misses.values())
+        return {
+            "enabled": self.enabled,
+            "backend": self.backend.name,
+            "ttlSeconds": self.ttl,
+            "size": self.backend.size(),
+            "hits": hits,
+            "misses": lookups - hits,
+            "hitRate": round(hits / lookups, 4) if lookups else 0,
+            "namespaces": namespaces
+        }
+
+
+read_cache = ReadCache(
+    create_backend(),
+    ttl=settings.READ_CACHE_TTL_SECONDS,
+    enabled=settings.READ_CACHE_ENABLED
+)
@@ -0,0 +1,64 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Benchmarks run against a real MongoDB server (local mongod recommended) and
+write into a dedicated database so they never touch application data.
+"""
+import os
+import sys
+import json
+import time
+import statistics
+from pathlib import Path
+from typing import List
+
+# Make the Backend package importable when running `python benchmarks/xxx.py`
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+BENCH_MONGODB_URI = os.getenv("BENCH_MONGODB_URI", "mongodb://localhost:27017")
+BENCH_DATABASE_NAME = os.getenv("BENCH_DATABASE_NAME", "student_academic_bench")
+
+
+def get_bench_database():
+    """Return a Motor database handle for benchmark data."""
+    client = AsyncIOMotorClient(BENCH_MONGODB_URI)
+    return client[BENCH_DATABASE_NAME]
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Return the given percentile (0-100) of a list of samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples: List[float]) -> dict:
+    """Summarize latency samples (seconds) in milliseconds."""
+    return {
+        "runs": len(samples),
+        "mean_ms": round(statistics.mean(samples) * 1000, 3) if samples else 0,
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+    }
+
+
+async def time_async(func, runs: int) -> List[float]:
+    """Await `func()` `runs` times and return the elapsed seconds of each call."""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def print_report(report: dict):
+    """Print a benchmark report as JSON so runs can be diffed across commits."""
+    print(json.dumps(report, indent=2, default=str))
@@ -0,0 +1,138 @@
+"""
+Benchmark cold start and warm requests of the serverless entry point.
+
+Usage:
+    python benchmarks/bench_cold_start.py --samples 5 --concurrency 20
+
+Every sample starts a fresh Python process (a new serverless instance),
+imports api/index.py, then sends `--concurrency` simultaneous first
+requests to GET /students followed by sequential warm requests. This is
+measured with SERVERLESS_AUTO_SETUP off (connect only, the default) and on
+(indexes and seeding on the first request). The benchmark database is
+migrated and seeded beforehand, like a deploy would.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from _common import BACKEND_DIR, BENCH_DATABASE_NAME, BENCH_MONGODB_URI, summarize, print_report
+
+API_INDEX = BACKEND_DIR.parent / "api" / "index.py"
+
+
+async def child(concurrency: int, warm_requests: int):
+    """Run inside a fresh process: import the entry point and time requests."""
+    start = time.perf_counter()
+    import importlib.util
+    spec = importlib.util.spec_from_file_location("serverless_index", API_INDEX)
+    index = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(index)
+    import_seconds = time.perf_counter() - start
+    
+    import httpx
+    import database
+    from utils.jwt import create_access_token
+    
+    # Count how often the instance connects, to confirm single-flight init
+    connects = {"count": 0}
+    for name in ("connect_client", "connect_to_mongo"):
+        original = getattr(index, name)
+        
+        def counted(*args, _original=original, **kwargs):
+            connects["count"] += 1
+            return _original(*args, **kwargs)
+        
+        setattr(index, name, counted)
+    
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'bench', 'role': 'ADMIN'})}"}
+    transport = httpx.ASGITransport(app=index.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def timed_get():
+            begin = time.perf_counter()
+            response = await client.get("/students/?limit=20", headers=headers)
+            response.raise_for_status()
+            return time.perf_counter() - begin
+        
+        cold = await asyncio.gather(*(timed_get() for _ in range(concurrency)))
+        warm = [await timed_get() for _ in range(warm_requests)]
+    
+    database.db_instance.client.close()
+    print(json.dumps({
+        "import_seconds": import_seconds,
+        "cold": cold,
+        "warm": warm,
+        "initializations": connects["count"]
+    }))
+
+
+def run_sample(auto_setup: bool, concurrency: int, warm_requests: int) -> dict:
+    """Start a fresh interpreter for one cold start."""
+    env = dict(
+        os.environ,
+        MONGODB_URI=BENCH_MONGODB_URI,
+        DATABASE_NAME=BENCH_DATABASE_NAME,
+        SERVERLESS_AUTO_SETUP=str(auto_setup).lower()
+    )
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, __file__, "--child", "--concurrency", str(concurrency), "--warm", str(warm_requests)],
+        env=env, capture_output=True, text=True, check=True
+    ).stdout
+    process_seconds = time.perf_counter() - start
+    result = json.loads(output.strip().splitlines()[-1])
+    result["process_seconds"] = process_seconds
+    return result
+
+
+async def prepare_database():
+    """Migrate and seed the benchmark database, as done on deploy."""
+    os.environ["MONGODB_URI"] = BENCH_MONGODB_URI
+    os.environ["DATABASE_NAME"] = BENCH_DATABASE_NAME
+    import manage
+    from config import settings
+    settings.MONGODB_URI = BENCH_MONGODB_URI
+    settings.DATABASE_NAME = BENCH_DATABASE_NAME
+    await manage.run("migrate")
+    await manage.run("seed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--warm", type=int, default=50)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.child:
+        asyncio.run(child(args.concurrency, args.warm))
+        return
+    
+    asyncio.run(prepare_database())
+    
+    results = {}
+    for auto_setup in (False, True):
+        samples = [run_sample(auto_setup, args.concurrency, args.warm) for _ in range(args.samples)]
+        results["auto_setup" if auto_setup else "connect_only"] = {
+            "import": summarize([s["import_seconds"] for s in samples]),
+            "first_requests": summarize([t for s in samples for t in s["cold"]]),
+            "warm_requests": summarize([t for s in samples for t in s["warm"]]),
+            "process_total": summarize([s["process_seconds"] for s in samples]),
+            "initializations_per_instance": sorted({s["initializations"] for s in samples})
+        }
+    
+    print_report({
+        "benchmark": "cold_start",
+        "samples": args.samples,
+        "concurrency": args.concurrency,
+        "results": results
+    })
+
+
+if __name__ == "__main__":
+    main()
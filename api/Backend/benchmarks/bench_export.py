@@ -0,0 +1,139 @@
+"""
+Benchmark streaming exports: peak memory and throughput of GET /marks/export.
+
+Usage:
+    python benchmarks/bench_export.py --sizes 10000 100000 1000000
+
+For each collection size the marks export is downloaded in-process in
+NDJSON and CSV by calling the ASGI app directly and discarding every body
+chunk as it is sent (httpx's ASGI transport would buffer the whole body). Peak Python heap (tracemalloc) should stay flat as the size
+grows; for comparison the same rows are also loaded with to_list(), the way
+a list endpoint would build them.
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+from datetime import datetime
+
+from _common import get_bench_database, print_report
+import database
+from main import app
+from utils.jwt import create_access_token
+
+SUBJECTS = ["Mathematics", "Science", "English", "Sinhala"]
+INSERT_CHUNK = 10000
+
+
+async def fill(db, size: int):
+    """Recreate the marks collection with `size` documents."""
+    await db["marks"].drop()
+    await database.create_indexes()
+    now = datetime.utcnow()
+    for start in range(0, size, INSERT_CHUNK):
+        await db["marks"].insert_many([
+            {
+                "studentId": f"STU-{i:07d}",
+                "term": "Term 1",
+                "year": 2024,
+                "subjects": [{"subjectName": s, "mark": 50.0 + j} for j, s in enumerate(SUBJECTS)],
+                "isActive": True,
+                "createdAt": now,
+                "updatedAt": now
+            }
+            for i in range(start, min(size, start + INSERT_CHUNK))
+        ])
+
+
+async def stream_request(path: str, query: str, token: str) -> dict:
+    """Send a GET through the ASGI app, counting body bytes without keeping them."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query.encode(),
+        "headers": [(b"host", b"bench"), (b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 0),
+        "server": ("bench", 80),
+    }
+    result = {"status": None, "bytes": 0}
+    request_sent = False
+    
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # The client never disconnects; StreamingResponse cancels this wait when done
+        await asyncio.Event().wait()
+    
+    async def send(message):
+        if message["type"] == "http.response.start":
+            result["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            result["bytes"] += len(message.get("body", b""))
+    
+    await app(scope, receive, send)
+    if result["status"] != 200:
+        raise RuntimeError(f"GET {path} returned {result['status']}")
+    return {"bytes": result["bytes"]}
+
+
+async def measure(coro_factory) -> dict:
+    """Run a coroutine and report its duration and peak traced memory."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = await coro_factory()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": round(seconds, 2), "peak_mb": round(peak / 1024 / 1024, 1), **result}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--skip-to-list", action="store_true", help="Skip the to_list() comparison")
+    args = parser.parse_args()
+    
+    db = get_bench_database()
+    database.db_instance.db = db
+    token = create_access_token({"sub": "bench", "role": "ADMIN"})
+    results = []
+    
+    for size in args.sizes:
+        await fill(db, size)
+        entry = {"size": size}
+        
+        for export_format in ("ndjson", "csv"):
+            query = f"format={export_format}&batch_size={args.batch_size}"
+            
+            async def download():
+                return await stream_request("/marks/export", query, token)
+            
+            report = await measure(download)
+            report["rows_per_second"] = round(size / report["seconds"], 1) if report["seconds"] else None
+            entry[export_format] = report
+        
+        if not args.skip_to_list:
+            async def load_all():
+                docs = await db["marks"].find({"isActive": True}).to_list(length=None)
+                return {"rows": len(docs)}
+            
+            entry["to_list"] = await measure(load_all)
+        
+        results.append(entry)
+    
+    await db["marks"].drop()
+    
+    print_report({"benchmark": "export", "batch_size": args.batch_size, "results": results})
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
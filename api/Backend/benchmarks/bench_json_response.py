@@ -0,0 +1,130 @@
+"""
+CPU cost of serializing list endpoint responses: validated models through
+`response_model` vs plain dicts in a FastJSONResponse (orjson).
+
+Usage:
+    python benchmarks/bench_json_response.py --rows 1000 --runs 50
+
+For GET /students/ and GET /marks/ rows from the synthetic generator are
+serialized the way FastAPI serves them:
+
+    models     one validated model per row, then FastAPI's serialize_response
+               for the route's response_model and JSONResponse (json.dumps)
+    fast       list_response(): plain dicts encoded with orjson
+
+CPU time (process time) is reported per 1,000 rows. Both bodies are decoded
+and compared first, so the benchmark fails if the schemas differ. No
+database is needed.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime
+
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+
+from _common import print_report
+from config import settings
+from main import app
+from routes.marks import marks_doc_to_dict, marks_doc_to_response
+from routes.students import student_doc_to_dict, student_doc_to_response
+from services.synthetic_data import SyntheticDataGenerator
+from utils.fast_json import list_response
+
+ENDPOINTS = {
+    "students": ("/students/", student_doc_to_dict, student_doc_to_response),
+    "marks": ("/marks/", marks_doc_to_dict, marks_doc_to_response),
+}
+
+
+def build_docs(rows: int) -> dict:
+    """Student and marks documents as Motor returns them."""
+    generator = SyntheticDataGenerator(terms=1)
+    now = datetime.utcnow().replace(microsecond=123000)
+    docs = {"students": [], "marks": []}
+    for number in range(1, rows + 1):
+        student, marks = generator.student_with_marks(number, now)
+        for doc in [student] + marks:
+            doc["_id"] = ObjectId()
+        # Marks entered as whole numbers are stored as ints
+        if number % 10 == 0:
+            for subject in marks[0]["subjects"]:
+                subject["mark"] = int(subject["mark"])
+        docs["students"].append(student)
+        docs["marks"].extend(marks)
+    return docs
+
+
+def route_field(path: str):
+    """response_model field of the GET route at `path`."""
+    for route in app.routes:
+        if getattr(route, "path", None) == path and "GET" in route.methods:
+            return route.response_field
+    raise LookupError(path)
+
+
+async def models_body(docs: list, to_model, field) -> bytes:
+    content = await serialize_response(field=field, response_content=[to_model(doc) for doc in docs])
+    return JSONResponse(content).body
+
+
+def fast_body(docs: list, to_dict, to_model) -> bytes:
+    return list_response(docs, to_dict, to_model).body
+
+
+async def measure(func, runs: int, rows: int) -> dict:
+    """CPU time of `func()` per 1,000 rows over `runs` runs."""
+    samples = []
+    for _ in range(runs):
+        start = time.process_time()
+        result = func()
+        if asyncio.iscoroutine(result):
+            result = await result
+        samples.append((time.process_time() - start) / rows * 1000)
+    return {
+        "cpu_ms_per_1000_rows": round(statistics.median(samples) * 1000, 2),
+        "bytes_per_1000_rows": round(len(result) / rows * 1000)
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000, help="Rows per response")
+    parser.add_argument("--runs", type=int, default=50, help="Measured runs per path")
+    args = parser.parse_args()
+    
+    settings.FAST_JSON_RESPONSES = True
+    docs = build_docs(args.rows)
+    results = []
+    
+    for name, (path, to_dict, to_model) in ENDPOINTS.items():
+        rows = docs[name][:args.rows]
+        field = route_field(path)
+        
+        legacy = await models_body(rows, to_model, field)
+        fast = fast_body(rows, to_dict, to_model)
+        if json.loads(legacy) != json.loads(fast):
+            raise SystemExit(f"{name}: fast response differs from the response_model output")
+        
+        models = await measure(lambda: models_body(rows, to_model, field), args.runs, args.rows)
+        plain = await measure(lambda: fast_body(rows, to_dict, to_model), args.runs, args.rows)
+        saved = models["cpu_ms_per_1000_rows"] - plain["cpu_ms_per_1000_rows"]
+        results.append({
+            "endpoint": f"GET {path}",
+            "rows": args.rows,
+            "models": models,
+            "fast": plain,
+            "cpu_ms_saved_per_1000_rows": round(saved, 2),
+            "speedup": round(models["cpu_ms_per_1000_rows"] / plain["cpu_ms_per_1000_rows"], 1)
+            if plain["cpu_ms_per_1000_rows"] else None
+        })
+    
+    print_report({"benchmark": "json_response", "results": results})
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,96 @@
+"""
+Benchmark /students latency during a login storm.
+
+Usage:
+    python benchmarks/bench_login_storm.py --logins 50 --interval 0.01
+
+Runs the FastAPI app in-process (httpx ASGI transport) against the
+benchmark database. While `--logins` concurrent /auth/login requests are in
+flight, a probe loop calls GET /students every `--interval` seconds and
+records its latency. The run
+is repeated with bcrypt executed inline on the event loop (the old
+behaviour) and on the bcrypt thread pool, so the p99 of the probes shows
+how much logins stall unrelated requests.
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from _common import get_bench_database, summarize, print_report
+import database
+import services.auth_service as auth_service
+from config import settings
+from main import app
+from services.seed_service import SeedService
+from utils.jwt import create_access_token
+from utils.password import verify_password
+
+
+async def blocking_verify(plain_password: str, hashed_password: str) -> bool:
+    """The pre-offload behaviour: bcrypt runs on the event loop."""
+    return verify_password(plain_password, hashed_password)
+
+
+async def run_storm(client: httpx.AsyncClient, logins: int, interval: float) -> dict:
+    """Fire concurrent logins and probe /students until they all finish."""
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': settings.ADMIN_USERNAME, 'role': 'ADMIN'})}"}
+    credentials = {"username": settings.ADMIN_USERNAME, "password": settings.ADMIN_PASSWORD}
+    
+    async def login():
+        response = await client.post("/auth/login", json=credentials)
+        response.raise_for_status()
+    
+    # Baseline latency of the probe endpoint with no logins in flight
+    for _ in range(10):
+        await client.get("/students/", headers=headers)
+    
+    start = time.perf_counter()
+    storm = asyncio.gather(*(login() for _ in range(logins)))
+    samples = []
+    
+    # Probe at a steady pace for as long as any login is in flight. Latency is
+    # measured from when the probe was due, so time spent waiting for a
+    # blocked event loop counts, as it would for a real client.
+    while not storm.done():
+        due = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        response = await client.get("/students/", headers=headers)
+        response.raise_for_status()
+        samples.append(time.perf_counter() - due)
+    
+    await storm
+    return {
+        "logins": logins,
+        "storm_seconds": round(time.perf_counter() - start, 3),
+        "students_latency": summarize(samples)
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--interval", type=float, default=0.01, help="Seconds between probes")
+    args = parser.parse_args()
+    
+    database.db_instance.db = get_bench_database()
+    await SeedService().run_all_seeds()
+    
+    transport = httpx.ASGITransport(app=app)
+    report = {"benchmark": "login_storm", "results": {}}
+    
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        offloaded_verify = auth_service.verify_password_async
+        
+        auth_service.verify_password_async = blocking_verify
+        report["results"]["bcrypt_on_event_loop"] = await run_storm(client, args.logins, args.interval)
+        
+        auth_service.verify_password_async = offloaded_verify
+        report["results"]["bcrypt_thread_pool"] = await run_storm(client, args.logins, args.interval)
+    
+    print_report(report)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
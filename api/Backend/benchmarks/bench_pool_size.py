@@ -0,0 +1,102 @@
+"""
+Benchmark request throughput against MongoDB connection pool size.
+
+Usage:
+    python benchmarks/bench_pool_size.py --pool-sizes 1 5 10 25 50 100 --concurrency 200
+
+Runs the FastAPI app in-process (httpx ASGI transport) against the
+benchmark database. For each pool size a fresh Motor client is created with
+the same options the app uses (plus maxPoolSize), then `--concurrency`
+clients call GET /students and GET /marks/student/{id} for `--duration`
+seconds. The report shows throughput, latency and the pool metrics
+collected by the CMAP listener (connection wait times, peak checked out).
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from _common import BENCH_DATABASE_NAME, BENCH_MONGODB_URI, summarize, print_report
+import database
+from config import settings
+from main import app
+from services.seed_service import SeedService
+from utils.jwt import create_access_token
+from utils.pool_metrics import pool_metrics
+
+
+async def run_load(client: httpx.AsyncClient, concurrency: int, duration: float, student_ids) -> dict:
+    """Drive the read endpoints from `concurrency` clients for `duration` seconds."""
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'bench', 'role': 'ADMIN'})}"}
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    rng = random.Random(concurrency)
+    
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            if rng.random() < 0.5:
+                url = "/students/?limit=50"
+            else:
+                url = f"/marks/student/{rng.choice(student_ids)}"
+            start = time.perf_counter()
+            response = await client.get(url, headers=headers)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                errors += 1
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "latency": summarize(latencies)
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[1, 5, 10, 25, 50, 100])
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+    
+    results = []
+    for pool_size in args.pool_sizes:
+        options = {**database.mongo_client_options(), "maxPoolSize": pool_size}
+        options["event_listeners"] = [pool_metrics]
+        mongo = AsyncIOMotorClient(BENCH_MONGODB_URI, **options)
+        database.db_instance.client = mongo
+        database.db_instance.db = mongo[BENCH_DATABASE_NAME]
+        
+        if not results:
+            await database.create_indexes()
+            await SeedService().run_all_seeds()
+        student_ids = await database.db_instance.db["students"].distinct("studentId")
+        
+        pool_metrics.reset()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            load = await run_load(client, args.concurrency, args.duration, student_ids)
+        
+        results.append({"maxPoolSize": pool_size, **load, "pool": pool_metrics.stats()})
+        mongo.close()
+    
+    print_report({
+        "benchmark": "pool_size",
+        "concurrency": args.concurrency,
+        "duration_seconds": args.duration,
+        "compressors": settings.mongo_compressors,
+        "results": results
+    })
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
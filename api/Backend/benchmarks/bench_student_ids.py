@@ -0,0 +1,92 @@
+"""
+Concurrency check and benchmark for student ID allocation.
+
+Usage:
+    python benchmarks/bench_student_ids.py --creates 5000 --block-sizes 1 50
+
+Fires thousands of concurrent create-student operations (allocate an ID from
+the counters collection, then insert) and verifies that every ID is unique
+and that no insert hit a duplicate key error, i.e. nothing needed a retry.
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime
+
+from pymongo.errors import DuplicateKeyError
+
+from _common import get_bench_database, print_report
+import database
+from services.counter_service import COUNTERS_COLLECTION, StudentIdAllocator
+
+
+async def run_creates(db, creates: int, block_size: int, concurrency: int) -> dict:
+    """Create `creates` students concurrently and report uniqueness and timing."""
+    await db["students"].drop()
+    await db[COUNTERS_COLLECTION].drop()
+    await db["students"].create_index("studentId", unique=True)
+    
+    # Several allocators simulate several workers sharing one sequence
+    workers = [StudentIdAllocator(block_size) for _ in range(4)]
+    semaphore = asyncio.Semaphore(concurrency)
+    duplicate_errors = 0
+    
+    async def create(i: int):
+        nonlocal duplicate_errors
+        async with semaphore:
+            student_id = await workers[i % len(workers)].next_id()
+            try:
+                await db["students"].insert_one({
+                    "studentId": student_id,
+                    "name": f"Bench Student {i}",
+                    "grade": "10",
+                    "mobileNumbers": [],
+                    "isActive": True,
+                    "createdAt": datetime.utcnow(),
+                    "updatedAt": datetime.utcnow()
+                })
+            except DuplicateKeyError:
+                duplicate_errors += 1
+            return student_id
+    
+    start = time.perf_counter()
+    ids = await asyncio.gather(*(create(i) for i in range(creates)))
+    elapsed = time.perf_counter() - start
+    
+    stored = await db["students"].count_documents({})
+    return {
+        "block_size": block_size,
+        "creates": creates,
+        "unique_ids": len(set(ids)),
+        "stored_documents": stored,
+        "duplicate_key_errors": duplicate_errors,
+        "ok": len(set(ids)) == creates == stored and duplicate_errors == 0,
+        "seconds": round(elapsed, 3),
+        "creates_per_second": round(creates / elapsed, 1) if elapsed else None
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--creates", type=int, default=5000)
+    parser.add_argument("--block-sizes", type=int, nargs="+", default=[1, 50])
+    parser.add_argument("--concurrency", type=int, default=500)
+    args = parser.parse_args()
+    
+    db = get_bench_database()
+    database.db_instance.db = db
+    
+    results = []
+    for block_size in args.block_sizes:
+        results.append(await run_creates(db, args.creates, block_size, args.concurrency))
+    
+    await db["students"].drop()
+    await db[COUNTERS_COLLECTION].drop()
+    print_report({"benchmark": "student_ids", "results": results})
+    
+    if not all(r["ok"] for r in results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,114 @@
+"""
+Benchmark GET /students?search=: unanchored case-insensitive regex vs the
+indexed prefix search on normalized name fields.
+
+Usage:
+    python benchmarks/bench_student_search.py --sizes 10000 100000 1000000
+
+Each size is seeded into a fresh `students` collection with the production
+indexes. Queries are a mix of name prefixes, full surnames and student IDs,
+as typed into the student picker.
+"""
+import argparse
+import asyncio
+import random
+from datetime import datetime
+
+from _common import get_bench_database, summarize, time_async, print_report
+import database
+from services.student_service import StudentService
+from utils.search import name_search_fields
+
+FIRST_NAMES = ["Kamal", "Nimali", "Sahan", "Dilini", "Ruwan", "Tharushi", "Kasun", "Ishara", "Chamara", "Sanduni"]
+SYLLABLES = ["pe", "ra", "fer", "nan", "do", "sil", "va", "ja", "ya", "war", "de", "na", "gu", "ne", "ti", "la", "ka"]
+LIMIT = 50
+
+
+def random_surname(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+
+
+async def seed_students(collection, size: int, chunk_size: int = 10000):
+    """Insert `size` synthetic students with search fields."""
+    await collection.drop()
+    await database.create_indexes()
+    rng = random.Random(size)
+    now = datetime.utcnow()
+    
+    for start in range(0, size, chunk_size):
+        docs = []
+        for i in range(start, min(start + chunk_size, size)):
+            name = f"{rng.choice(FIRST_NAMES)} {random_surname(rng)}"
+            docs.append({
+                "studentId": f"STU-{i + 1:03d}",
+                "name": name,
+                **name_search_fields(name),
+                "grade": str(1 + i % 13),
+                "mobileNumbers": [],
+                "isActive": True,
+                "createdAt": now,
+                "updatedAt": now
+            })
+        await collection.insert_many(docs)
+
+
+def sample_queries(size: int, count: int):
+    """Search strings: name prefixes, surnames and student IDs."""
+    rng = random.Random(size + 1)
+    queries = []
+    for i in range(count):
+        kind = i % 3
+        if kind == 0:
+            queries.append(rng.choice(FIRST_NAMES)[:rng.randint(2, 4)].lower())
+        elif kind == 1:
+            queries.append(random_surname(rng))
+        else:
+            queries.append(f"STU-{rng.randint(1, size):03d}")
+    return queries
+
+
+async def legacy_search(collection, search: str):
+    """The previous implementation: unanchored case-insensitive regex on two fields."""
+    query = {
+        "isActive": True,
+        "$or": [
+            {"studentId": {"$regex": search, "$options": "i"}},
+            {"name": {"$regex": search, "$options": "i"}}
+        ]
+    }
+    return await collection.find(query).sort("studentId", 1).limit(LIMIT).to_list(length=LIMIT)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--queries", type=int, default=60)
+    args = parser.parse_args()
+    
+    db = get_bench_database()
+    database.db_instance.db = db
+    collection = db["students"]
+    service = StudentService()
+    results = []
+    
+    for size in args.sizes:
+        await seed_students(collection, size)
+        queries = iter(sample_queries(size, args.queries * 2))
+        
+        legacy = await time_async(lambda: legacy_search(collection, next(queries)), args.queries)
+        indexed = await time_async(
+            lambda: service.search(next(queries), {"isActive": True}, LIMIT), args.queries
+        )
+        results.append({
+            "size": size,
+            "legacy_regex": summarize(legacy),
+            "prefix_index": summarize(indexed)
+        })
+    
+    await collection.drop()
+    
+    print_report({"benchmark": "student_search", "limit": LIMIT, "results": results})
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -2,9 +2,16 @@
 MongoDB database connection and initialization.
 Handles automatic collection creation and connection management.
 """
-from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo.errors import ConnectionFailure
+import importlib.util
+from typing import List, Optional
+from pymongo.errors import ConnectionFailure, OperationFailure
+from pymongo.read_preferences import (
+    Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
+)
 from config import settings
+from utils.metrics import command_metrics
+from utils.pool_metrics import pool_metrics
+from utils.slow_queries import slow_query_log
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -12,23 +19,103 @@ logger = logging.getLogger(__name__)
 
 
 class Database:
-    client: AsyncIOMotorClient = None
+    client: "AsyncIOMotorClient" = None
     db = None
 
 
 db_instance = Database()
 
+# Server error codes for conflicting index definitions
+INDEX_OPTIONS_CONFLICT = 85
+INDEX_KEY_SPECS_CONFLICT = 86
+
+# Read policies for get_collection
+READ_PRIMARY = "primary"        # read-after-write: always the primary
+READ_ANALYTICS = "analytics"    # heavy reads that tolerate replication lag
+
+READ_PREFERENCE_MODES = {
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest
+}
+
+# Python package each wire compressor needs (zlib is part of the standard library)
+COMPRESSOR_PACKAGES = {
+    "zstd": "zstandard",
+    "snappy": "snappy",
+    "zlib": "zlib"
+}
+
+
+def available_compressors(names: List[str]) -> List[str]:
+    """Keep the configured compressors whose Python package is installed."""
+    available = []
+    for name in names:
+        package = COMPRESSOR_PACKAGES.get(name)
+        if package is None:
+            logger.warning(f"[WARN] Unknown MongoDB compressor ignored: {name}")
+        elif importlib.util.find_spec(package) is None:
+            logger.warning(f"[WARN] MongoDB compressor {name} needs the '{package}' package; ignored")
+        else:
+            available.append(name)
+    return available
+
+
+def mongo_client_options() -> dict:
+    """Build AsyncIOMotorClient keyword arguments from settings."""
+    options = {
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "readPreference": settings.MONGO_READ_PREFERENCE
+    }
+    
+    if settings.MONGO_MAX_IDLE_TIME_MS > 0:
+        options["maxIdleTimeMS"] = settings.MONGO_MAX_IDLE_TIME_MS
+    if settings.MONGO_WAIT_QUEUE_TIMEOUT_MS > 0:
+        options["waitQueueTimeoutMS"] = settings.MONGO_WAIT_QUEUE_TIMEOUT_MS
+    
+    compressors = available_compressors(settings.mongo_compressors)
+    if compressors:
+        options["compressors"] = ",".join(compressors)
+    
+    event_listeners = []
+    if settings.MONGO_POOL_METRICS_ENABLED:
+        event_listeners.append(pool_metrics)
+    if settings.METRICS_ENABLED:
+        event_listeners.append(command_metrics)
+    if settings.SLOW_QUERY_THRESHOLD_MS > 0:
+        event_listeners.append(slow_query_log)
+    if event_listeners:
+        options["event_listeners"] = event_listeners
+    
+    return options
+
+
+def connect_client():
+    """
+    Create the MongoDB client without any network round trip.
+    
+    The driver connects in the background and on the first operation, so
+    serverless instances use this to keep setup off the request path.
+    Motor is imported here, when the first client is created.
+    """
+    from motor.motor_asyncio import AsyncIOMotorClient
+    
+    # Connect to MongoDB Atlas (pymongo 4.x handles SSL automatically)
+    db_instance.client = AsyncIOMotorClient(settings.MONGODB_URI, **mongo_client_options())
+    db_instance.db = db_instance.client[settings.DATABASE_NAME]
+    # Synchronous client for the slow query log's explain thread
+    slow_query_log.client = db_instance.client.delegate
+
 
 async def connect_to_mongo():
     """Connect to MongoDB and initialize database."""
     try:
-        uri = settings.MONGODB_URI
-        
         logger.info("[DB] Connecting to MongoDB...")
         
-        # Connect to MongoDB Atlas (pymongo 4.x handles SSL automatically)
-        db_instance.client = AsyncIOMotorClient(uri)
-        db_instance.db = db_instance.client[settings.DATABASE_NAME]
+        connect_client()
         
         # Verify connection
         await db_instance.client.admin.command('ping')
@@ -46,23 +133,92 @@ async def connect_to_mongo():
 
 
 async def create_indexes():
-    """Create database indexes for optimized queries."""
+    """
+    Create database indexes for optimized queries.
+    
+    Failures of ordinary indexes are logged. The unique marks index is
+    required (marks writes rely on it to reject duplicates), so failing to
+    build it raises and stops startup.
+    """
     try:
         # Users collection indexes
         await db_instance.db.users.create_index("username", unique=True)
         
         # Students collection indexes
         await db_instance.db.students.create_index("studentId", unique=True)
+        # Listing and export order (numeric, see counter_service.format_student_id)
+        await db_instance.db.students.create_index([("studentNumber", 1), ("studentId", 1)])
         await db_instance.db.students.create_index("name")
+        # Normalized name fields for prefix search
+        await db_instance.db.students.create_index("nameLower")
+        await db_instance.db.students.create_index("nameWords")
         await db_instance.db.students.create_index("grade")
         
         # Marks collection indexes
         await db_instance.db.marks.create_index("studentId")
-        await db_instance.db.marks.create_index([("studentId", 1), ("term", 1), ("year", 1)])
+        await db_instance.db.marks.create_index([("isActive", 1), ("year", -1), ("term", 1), ("_id", 1)])
+        
+        # Marks statistics rollup indexes
+        await db_instance.db.marks_stats.create_index("scope")
         
         logger.info("[OK] Database indexes created successfully")
     except Exception as e:
         logger.warning(f"[WARN] Index creation warning: {e}")
+    
+    # One marks entry per student, term and year
+    await ensure_unique_index(
+        db_instance.db.marks, [("studentId", 1), ("term", 1), ("year", 1)]
+    )
+
+
+async def find_duplicate_keys(collection, keys: list) -> Optional[dict]:
+    """Return one set of key values shared by several documents, or None."""
+    fields = [field for field, _ in keys]
+    duplicates = await collection.aggregate([
+        {"$group": {"_id": {field: f"${field}" for field in fields}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+        {"$limit": 1}
+    ], allowDiskUse=True).to_list(length=1)
+    return duplicates[0] if duplicates else None
+
+
+async def ensure_unique_index(collection, keys: list):
+    """
+    Create a unique index, replacing a non-unique index on the same keys.
+    
+    Older databases have the marks (studentId, term, year) index without the
+    unique option; MongoDB refuses to create a second index on the same keys,
+    so the old index has to be dropped first. It is only dropped when the
+    existing data has no duplicates, and restored if the unique build still
+    fails, so the collection is never left without an index on these keys.
+    
+    Raises:
+        RuntimeError: If the data has duplicate keys or the unique index
+            cannot be built
+    """
+    index_name = "_".join(f"{field}_{direction}" for field, direction in keys)
+    try:
+        await collection.create_index(keys, unique=True)
+        return
+    except OperationFailure as e:
+        if e.code not in (INDEX_OPTIONS_CONFLICT, INDEX_KEY_SPECS_CONFLICT):
+            raise RuntimeError(f"Cannot create unique index {index_name}: {e}") from e
+    
+    duplicate = await find_duplicate_keys(collection, keys)
+    if duplicate:
+        raise RuntimeError(
+            f"Cannot make index {index_name} unique: {duplicate['count']} documents "
+            f"share {duplicate['_id']}; remove the duplicates and restart"
+        )
+    
+    logger.info(f"[DB] Replacing non-unique index {index_name} with a unique one")
+    await collection.drop_index(index_name)
+    try:
+        await collection.create_index(keys, unique=True)
+    except OperationFailure as e:
+        # A duplicate written since the check; put the old index back
+        await collection.create_index(keys)
+        raise RuntimeError(f"Cannot create unique index {index_name}: {e}") from e
 
 
 async def close_mongo_connection():
@@ -77,7 +233,27 @@ def get_database():
     return db_instance.db
 
 
-def get_collection(collection_name: str):
-    """Get a specific collection from the database."""
-    return db_instance.db[collection_name]
+def analytics_read_preference():
+    """Read preference for READ_ANALYTICS reads, built from settings."""
+    mode = READ_PREFERENCE_MODES.get(settings.ANALYTICS_READ_PREFERENCE)
+    if mode is None:
+        return Primary()
+    return mode(max_staleness=settings.ANALYTICS_MAX_STALENESS_SECONDS)
+
+
+def get_collection(collection_name: str, read_policy: Optional[str] = None):
+    """
+    Get a specific collection from the database.
+    
+    Args:
+        collection_name: Collection name
+        read_policy: READ_PRIMARY or READ_ANALYTICS; None keeps the client's
+            default read preference (MONGO_READ_PREFERENCE)
+    """
+    collection = db_instance.db[collection_name]
+    if read_policy == READ_PRIMARY:
+        return collection.with_options(read_preference=Primary())
+    if read_policy == READ_ANALYTICS:
+        return collection.with_options(read_preference=analytics_read_preference())
+    return collection
 
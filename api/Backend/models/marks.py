@@ -4,6 +4,8 @@ Marks model definitions.
 from pydantic import BaseModel, Field, field_validator
 from typing import List, Optional
 from datetime import datetime
+from models.common import BulkRowResult
+from models.student import STUDENT_ID_PATTERN
 
 
 class SubjectMark(BaseModel):
@@ -15,7 +17,7 @@ class SubjectMark(BaseModel):
 
 class MarksModel(BaseModel):
     """MongoDB Marks document model."""
-    studentId: str = Field(..., pattern=r'^STU-\d{3}$')
+    studentId: str = Field(..., pattern=STUDENT_ID_PATTERN)
     term: str = Field(..., min_length=1, max_length=20)
     year: int = Field(..., ge=2000, le=2100)
     subjects: List[SubjectMark] = Field(default_factory=list)
@@ -26,7 +28,7 @@ class MarksModel(BaseModel):
 
 class MarksCreate(BaseModel):
     """Schema for creating marks."""
-    studentId: str = Field(..., pattern=r'^STU-\d{3}$')
+    studentId: str = Field(..., pattern=STUDENT_ID_PATTERN)
     term: str = Field(..., min_length=1, max_length=20)
     year: int = Field(..., ge=2000, le=2100)
     subjects: List[SubjectMark] = Field(default_factory=list)
@@ -55,3 +57,9 @@ class MarksResponse(BaseModel):
         from_attributes = True
 
 
+class MarksBulkResponse(BaseModel):
+    """Schema for bulk marks creation response."""
+    inserted: int
+    failed: int
+    results: List[BulkRowResult]
+
@@ -5,10 +5,13 @@ from pydantic import BaseModel, Field, field_validator
 from typing import List, Optional
 from datetime import datetime
 
+# STU- followed by at least three digits (STU-001 ... STU-999, STU-1000 ...)
+STUDENT_ID_PATTERN = r'^STU-\d{3,}$'
+
 
 class StudentModel(BaseModel):
     """MongoDB Student document model."""
-    studentId: str = Field(..., pattern=r'^STU-\d{3}$')
+    studentId: str = Field(..., pattern=STUDENT_ID_PATTERN)
     name: str = Field(..., min_length=2, max_length=100)
     grade: str = Field(..., min_length=1, max_length=10)
     mobileNumbers: List[str] = Field(default_factory=list)
@@ -41,6 +44,13 @@ class StudentUpdate(BaseModel):
     isActive: Optional[bool] = None
 
 
+class StudentSuggestion(BaseModel):
+    """Schema for a student autocomplete suggestion."""
+    studentId: str
+    name: str
+    grade: str
+
+
 class StudentResponse(BaseModel):
     """Schema for student response."""
     id: str
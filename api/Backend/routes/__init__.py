@@ -1,6 +1,23 @@
-"""Routes package initialization."""
-from routes.auth import router as auth_router
-from routes.students import router as students_router
-from routes.marks import router as marks_router
+"""
+Routes package initialization.
 
+Re-exports are resolved on first access, so importing one router does not
+load the others.
+"""
+import importlib
 
+_EXPORTS = {
+    "auth_router": "routes.auth",
+    "students_router": "routes.students",
+    "marks_router": "routes.marks",
+    "imports_router": "routes.imports",
+    "admin_router": "routes.admin",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_EXPORTS[name]), "router")
@@ -0,0 +1,48 @@
+"""
+Administration routes for diagnostics.
+"""
+from fastapi import APIRouter, Depends, Query, status
+from utils.jwt import require_admin
+from utils.read_cache import read_cache
+from utils.slow_queries import slow_query_log
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+@router.get("/slow-queries")
+async def get_slow_queries(
+    current_user: dict = Depends(require_admin),
+    limit: int = Query(50, ge=0, le=1000, description="Number of recent entries")
+):
+    """
+    Get MongoDB commands slower than SLOW_QUERY_THRESHOLD_MS on this worker.
+    
+    Returns the most recent entries (route, command, collection, filter shape,
+    duration and, in explain mode, the winning plan) and totals per query
+    pattern, slowest first. Patterns with `"collscan": true` miss an index.
+    """
+    return slow_query_log.report(limit)
+
+
+@router.delete("/slow-queries", status_code=status.HTTP_204_NO_CONTENT)
+async def clear_slow_queries(current_user: dict = Depends(require_admin)):
+    """Clear the slow query log of this worker."""
+    slow_query_log.reset()
+
+
+@router.get("/cache")
+async def get_read_cache_stats(current_user: dict = Depends(require_admin)):
+    """
+    Get read cache statistics of this worker.
+    
+    Returns the backend, entry count and hits, misses and hit rate overall
+    and per cached read (student, student_marks, summary).
+    """
+    return read_cache.stats()
+
+
+@router.delete("/cache", status_code=status.HTTP_204_NO_CONTENT)
+async def clear_read_cache(current_user: dict = Depends(require_admin)):
+    """Drop every read cache entry (all workers with a shared backend) and reset the counters."""
+    await read_cache.clear()
+    read_cache.reset_stats()
@@ -1,38 +1,61 @@
 """
 Marks management routes.
 """
-from fastapi import APIRouter, HTTPException, status, Depends, Query
-from typing import List, Optional
+import asyncio
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 from bson import ObjectId
-from database import get_collection
-from models.marks import MarksCreate, MarksUpdate, MarksResponse, SubjectMark
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from config import settings
+from database import READ_ANALYTICS, READ_PRIMARY, get_collection
+from models.marks import MarksCreate, MarksUpdate, MarksResponse, MarksBulkResponse
+from services.counter_service import bump_versions
+from services.export_service import (
+    DEFAULT_EXPORT_BATCH_SIZE, EXPORT_MEDIA_TYPES, MAX_EXPORT_BATCH_SIZE,
+    MARKS_EXPORT_COLUMNS, marks_export_row, stream_export
+)
+from services.marks_service import MarksService, marks_create_to_doc
+from services.stats_service import STATS_COLLECTION, StatsService
+from utils.etag import conditional_get, tagged_read_policy
+from utils.fast_json import list_response
 from utils.jwt import get_current_user
+from utils.read_cache import SUMMARY_TAG, cache_key, read_cache, student_marks_tag
+from utils.single_flight import single_flight
+from utils.pagination import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, marks_cursor, marks_cursor_filter, set_next_cursor
+)
 
 router = APIRouter(prefix="/marks", tags=["Marks"])
 
 
+def marks_doc_to_dict(doc: dict) -> dict:
+    """Convert MongoDB document to the MarksResponse schema as a plain dict."""
+    return {
+        "id": str(doc["_id"]),
+        "studentId": doc["studentId"],
+        "term": doc["term"],
+        "year": doc["year"],
+        "subjects": [
+            {
+                "subjectName": s["subjectName"],
+                # SubjectMark.mark is a float; integral marks must still render as 85.0
+                "mark": float(s["mark"]),
+                "isActive": s.get("isActive", True)
+            }
+            for s in doc.get("subjects", [])
+        ],
+        "isActive": doc.get("isActive", True),
+        "createdAt": doc.get("createdAt") or datetime.utcnow(),
+        "updatedAt": doc.get("updatedAt") or datetime.utcnow()
+    }
+
+
 def marks_doc_to_response(doc: dict) -> MarksResponse:
     """Convert MongoDB document to MarksResponse."""
-    subjects = [
-        SubjectMark(
-            subjectName=s["subjectName"],
-            mark=s["mark"],
-            isActive=s.get("isActive", True)
-        )
-        for s in doc.get("subjects", [])
-    ]
-    
-    return MarksResponse(
-        id=str(doc["_id"]),
-        studentId=doc["studentId"],
-        term=doc["term"],
-        year=doc["year"],
-        subjects=subjects,
-        isActive=doc.get("isActive", True),
-        createdAt=doc.get("createdAt", datetime.utcnow()),
-        updatedAt=doc.get("updatedAt", datetime.utcnow())
-    )
+    return MarksResponse(**marks_doc_to_dict(doc))
 
 
 @router.post("/", response_model=MarksResponse, status_code=status.HTTP_201_CREATED)
@@ -48,7 +71,7 @@ async def create_marks(
     - **year**: Academic year
     - **subjects**: List of subject marks
     """
-    students_collection = get_collection("students")
+    students_collection = get_collection("students", READ_PRIMARY)
     marks_collection = get_collection("marks")
     
     # Verify student exists
@@ -59,50 +82,69 @@ async def create_marks(
             detail=f"Student not found: {marks_data.studentId}"
         )
     
-    # Check if marks already exist for this term/year
-    existing = await marks_collection.find_one({
-        "studentId": marks_data.studentId,
-        "term": marks_data.term,
-        "year": marks_data.year
-    })
+    marks_doc = marks_create_to_doc(marks_data, datetime.utcnow())
     
-    if existing:
+    # The unique (studentId, term, year) index rejects duplicates
+    try:
+        result = await marks_collection.insert_one(marks_doc)
+    except DuplicateKeyError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Marks already exist for {marks_data.studentId} - {marks_data.term} {marks_data.year}"
         )
-    
-    marks_doc = {
-        "studentId": marks_data.studentId,
-        "term": marks_data.term,
-        "year": marks_data.year,
-        "subjects": [s.model_dump() for s in marks_data.subjects],
-        "isActive": True,
-        "createdAt": datetime.utcnow(),
-        "updatedAt": datetime.utcnow()
-    }
-    
-    result = await marks_collection.insert_one(marks_doc)
     marks_doc["_id"] = result.inserted_id
     
+    await StatsService().apply_change(None, marks_doc)
+    await bump_versions("marks")
+    await read_cache.invalidate(student_marks_tag(marks_doc["studentId"]), SUMMARY_TAG)
+    
     return marks_doc_to_response(marks_doc)
 
 
+@router.post("/bulk", response_model=MarksBulkResponse)
+async def create_marks_bulk(
+    rows: List[Dict[str, Any]],
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Create many marks entries in one request.
+    
+    Accepts a JSON array of marks entries (same fields as `POST /marks/`).
+    Each row is validated and inserted independently; the response reports
+    the outcome of every row by its index in the request.
+    """
+    if len(rows) > settings.MARKS_BULK_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Too many rows: {len(rows)} (maximum {settings.MARKS_BULK_MAX_ROWS})"
+        )
+    
+    return await MarksService().bulk_create(rows, chunk_size=settings.MARKS_BULK_CHUNK_SIZE)
+
+
 @router.get("/", response_model=List[MarksResponse])
 async def get_all_marks(
+    response: Response,
     current_user: dict = Depends(get_current_user),
     term: Optional[str] = Query(None, description="Filter by term"),
     year: Optional[int] = Query(None, description="Filter by year"),
-    active_only: bool = Query(True, description="Show only active marks")
+    active_only: bool = Query(True, description="Show only active marks"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header")
 ):
     """
-    Get all marks with optional filtering.
+    Get marks with optional filtering, one page at a time.
     
     - **term**: Filter by term name
     - **year**: Filter by academic year
     - **active_only**: Show only active marks (default: true)
+    - **limit**: Maximum number of marks entries to return
+    - **cursor**: Continue after the previous page
+    
+    When more entries are available, the `X-Next-Cursor` response header
+    holds the cursor for the next page.
     """
-    collection = get_collection("marks")
+    collection = get_collection("marks", READ_ANALYTICS)
     
     query = {}
     
@@ -115,32 +157,49 @@ async def get_all_marks(
     if year:
         query["year"] = year
     
-    cursor = collection.find(query).sort([("year", -1), ("term", 1)])
-    marks = await cursor.to_list(length=1000)
+    if cursor:
+        query.update(marks_cursor_filter(cursor))
+    
+    # Fetch one extra row to find out whether another page exists
+    cursor_query = (
+        collection.find(query)
+        .sort([("year", -1), ("term", 1), ("_id", 1)])
+        .limit(limit + 1)
+    )
+    marks = await cursor_query.to_list(length=limit + 1)
+    
+    if len(marks) > limit:
+        marks = marks[:limit]
+        set_next_cursor(response, marks_cursor(marks[-1]))
     
-    return [marks_doc_to_response(m) for m in marks]
+    return list_response(marks, marks_doc_to_dict, marks_doc_to_response, response)
 
 
-@router.get("/student/{student_id}", response_model=List[MarksResponse])
-async def get_student_marks(
-    student_id: str,
+@router.get("/export")
+async def export_marks(
     current_user: dict = Depends(get_current_user),
     term: Optional[str] = Query(None, description="Filter by term"),
-    year: Optional[int] = Query(None, description="Filter by year")
+    year: Optional[int] = Query(None, description="Filter by year"),
+    active_only: bool = Query(True, description="Export only active marks"),
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+    batch_size: int = Query(
+        DEFAULT_EXPORT_BATCH_SIZE, ge=1, le=MAX_EXPORT_BATCH_SIZE,
+        description="Marks entries fetched per database round trip"
+    )
 ):
     """
-    Get all marks for a specific student.
+    Export all matching marks entries as NDJSON or CSV.
     
-    - **student_id**: Student ID (e.g., STU-001)
-    - **term**: Optional term filter
-    - **year**: Optional year filter
+    Rows are streamed straight from the database cursor in the same order
+    as `GET /marks/`. Both formats contain active subjects only; in CSV
+    they are written as `Subject:mark` pairs separated by `;`.
     """
-    collection = get_collection("marks")
+    collection = get_collection("marks", READ_ANALYTICS)
     
-    query = {
-        "studentId": student_id,
-        "isActive": True
-    }
+    query = {}
+    
+    if active_only:
+        query["isActive"] = True
     
     if term:
         query["term"] = term
@@ -148,10 +207,63 @@ async def get_student_marks(
     if year:
         query["year"] = year
     
-    cursor = collection.find(query).sort([("year", -1), ("term", 1)])
-    marks = await cursor.to_list(length=100)
+    cursor_query = collection.find(query).sort([("year", -1), ("term", 1), ("_id", 1)])
+    
+    return StreamingResponse(
+        stream_export(cursor_query, marks_export_row, MARKS_EXPORT_COLUMNS, export_format, batch_size),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="marks.{export_format}"'}
+    )
+
+
+@router.get("/student/{student_id}", response_model=List[MarksResponse])
+async def get_student_marks(
+    request: Request,
+    response: Response,
+    student_id: str,
+    current_user: dict = Depends(get_current_user),
+    term: Optional[str] = Query(None, description="Filter by term"),
+    year: Optional[int] = Query(None, description="Filter by year")
+):
+    """
+    Get all marks for a specific student.
+    
+    - **student_id**: Student ID (e.g., STU-001)
+    - **term**: Optional term filter
+    - **year**: Optional year filter
+    
+    Supports `If-None-Match` with the `ETag` of an earlier response
+    (304 Not Modified while no marks have changed).
+    """
+    not_modified = await conditional_get(request, response, ["marks"])
+    if not_modified is not None:
+        return not_modified
+    
+    async def load_marks():
+        collection = get_collection("marks", READ_PRIMARY)
+        
+        query = {
+            "studentId": student_id,
+            "isActive": True
+        }
+        
+        if term:
+            query["term"] = term
+        
+        if year:
+            query["year"] = year
+        
+        cursor = collection.find(query).sort([("year", -1), ("term", 1)])
+        return await cursor.to_list(length=100)
+    
+    marks = await read_cache.get_or_load(
+        cache_key("student_marks", student_id, term=term or None, year=year or None),
+        load_marks,
+        [student_marks_tag(student_id)],
+        request.state.collection_versions
+    )
     
-    return [marks_doc_to_response(m) for m in marks]
+    return list_response(marks, marks_doc_to_dict, marks_doc_to_response, response)
 
 
 @router.get("/{marks_id}", response_model=MarksResponse)
@@ -162,7 +274,7 @@ async def get_marks(
     """
     Get specific marks entry by ID.
     """
-    collection = get_collection("marks")
+    collection = get_collection("marks", READ_PRIMARY)
     
     try:
         marks = await collection.find_one({"_id": ObjectId(marks_id)})
@@ -206,10 +318,15 @@ async def update_marks(
         update_doc["isActive"] = update_data.isActive
     
     try:
-        result = await collection.find_one_and_update(
+        before = await collection.find_one_and_update(
             {"_id": ObjectId(marks_id)},
             {"$set": update_doc},
-            return_document=True
+            return_document=ReturnDocument.BEFORE
+        )
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Marks already exist for this student, term and year"
         )
     except:
         raise HTTPException(
@@ -217,12 +334,18 @@ async def update_marks(
             detail="Invalid marks ID format"
         )
     
-    if not result:
+    if not before:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Marks not found: {marks_id}"
         )
     
+    # Only top-level fields are $set, so the new document is the old one plus update_doc
+    result = {**before, **update_doc}
+    await StatsService().apply_change(before, result)
+    await bump_versions("marks")
+    await read_cache.invalidate(student_marks_tag(result["studentId"]), SUMMARY_TAG)
+    
     return marks_doc_to_response(result)
 
 
@@ -242,10 +365,10 @@ async def delete_marks(
     }
     
     try:
-        result = await collection.find_one_and_update(
+        before = await collection.find_one_and_update(
             {"_id": ObjectId(marks_id)},
             {"$set": update_doc},
-            return_document=True
+            return_document=ReturnDocument.BEFORE
         )
     except:
         raise HTTPException(
@@ -253,12 +376,18 @@ async def delete_marks(
             detail="Invalid marks ID format"
         )
     
-    if not result:
+    if not before:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Marks not found: {marks_id}"
         )
     
+    # Only top-level fields are $set, so the new document is the old one plus update_doc
+    result = {**before, **update_doc}
+    await StatsService().apply_change(before, result)
+    await bump_versions("marks")
+    await read_cache.invalidate(student_marks_tag(result["studentId"]), SUMMARY_TAG)
+    
     return marks_doc_to_response(result)
 
 
@@ -289,8 +418,8 @@ async def delete_subject_mark(
             detail=f"Marks not found: {marks_id}"
         )
     
-    # Find and update the subject
-    subjects = marks.get("subjects", [])
+    # Find and update the subject (on copies, so `marks` keeps the old state)
+    subjects = [dict(s) for s in marks.get("subjects", [])]
     subject_found = False
     
     for subject in subjects:
@@ -316,52 +445,45 @@ async def delete_subject_mark(
         return_document=True
     )
     
+    await StatsService().apply_change(marks, result)
+    await bump_versions("marks")
+    await read_cache.invalidate(student_marks_tag(result["studentId"]), SUMMARY_TAG)
+    
     return marks_doc_to_response(result)
 
 
 @router.get("/stats/summary")
 async def get_marks_summary(
+    request: Request,
+    response: Response,
     current_user: dict = Depends(get_current_user)
 ):
     """
     Get aggregated marks statistics.
     
     Returns summary including total students, average marks, etc.
+    Supports `If-None-Match` with the `ETag` of an earlier response.
     """
-    students_collection = get_collection("students")
-    marks_collection = get_collection("marks")
-    
-    # Get active students count
-    total_students = await students_collection.count_documents({"isActive": True})
-    
-    # Get all active marks
-    marks_cursor = marks_collection.find({"isActive": True})
-    marks = await marks_cursor.to_list(length=10000)
-    
-    # Calculate statistics
-    total_marks = 0
-    subject_count = 0
-    grade_stats = {}
-    
-    for mark in marks:
-        for subject in mark.get("subjects", []):
-            if subject.get("isActive", True):
-                total_marks += subject["mark"]
-                subject_count += 1
-    
-    average_mark = round(total_marks / subject_count, 2) if subject_count > 0 else 0
-    
-    # Get unique terms and years
-    terms = await marks_collection.distinct("term")
-    years = await marks_collection.distinct("year")
-    
-    return {
-        "totalStudents": total_students,
-        "totalMarksRecords": len(marks),
-        "averageMark": average_mark,
-        "totalSubjectEntries": subject_count,
-        "availableTerms": terms,
-        "availableYears": sorted(years, reverse=True) if years else []
-    }
-
-
+    not_modified = await conditional_get(request, response, ["students", "marks", STATS_COLLECTION])
+    if not_modified is not None:
+        return not_modified
+    
+    async def load_summary():
+        read_policy = tagged_read_policy()
+        students_collection = get_collection("students", read_policy)
+        
+        # Marks statistics come from the incrementally maintained rollup
+        total_students, summary = await asyncio.gather(
+            students_collection.count_documents({"isActive": True}),
+            StatsService().get_summary(read_policy)
+        )
+        return {"totalStudents": total_students, **summary}
+    
+    # Concurrent misses (a class opening the dashboard) share one computation
+    versions = request.state.collection_versions
+    return await read_cache.get_or_load(
+        cache_key("summary"),
+        lambda: single_flight.do(cache_key("summary"), load_summary, versions),
+        [SUMMARY_TAG],
+        versions
+    )
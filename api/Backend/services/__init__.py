@@ -1,5 +1,21 @@
-"""Services package initialization."""
-from services.auth_service import AuthService
-from services.seed_service import SeedService
+"""
+Services package initialization.
 
+Re-exports are resolved on first access, so importing one service module
+does not load the others (and their dependencies).
+"""
+import importlib
 
+_EXPORTS = {
+    "AuthService": "services.auth_service",
+    "SeedService": "services.seed_service",
+    "StatsService": "services.stats_service",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_EXPORTS[name]), name)
@@ -5,7 +5,7 @@ from datetime import datetime
 from typing import Optional
 from bson import ObjectId
 from database import get_collection
-from utils.password import hash_password, verify_password
+from utils.password import hash_password_async, verify_password_async
 from utils.jwt import create_access_token
 from models.user import UserModel, UserCreate, UserLogin, UserResponse, Token
 
@@ -27,7 +27,7 @@ class AuthService:
             Created user response
         """
         # Hash the password
-        hashed_password = hash_password(user_data.password)
+        hashed_password = await hash_password_async(user_data.password)
         
         user_doc = {
             "username": user_data.username,
@@ -65,7 +65,7 @@ class AuthService:
         if not user:
             return None
         
-        if not verify_password(login_data.password, user["password"]):
+        if not await verify_password_async(login_data.password, user["password"]):
             return None
         
         # Create JWT token
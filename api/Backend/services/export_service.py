@@ -0,0 +1,140 @@
+"""
+Export service for streaming students and marks out of the database.
+
+Rows are read from a Motor cursor in batches of `batch_size` and each batch
+is encoded and yielded as one chunk of the HTTP response, so memory use is
+bounded by a single batch no matter how large the collection is.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Callable, List
+
+DEFAULT_EXPORT_BATCH_SIZE = 1000
+MAX_EXPORT_BATCH_SIZE = 10000
+
+# Supported export formats and their media types
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+STUDENT_EXPORT_COLUMNS = [
+    "id", "studentId", "name", "grade", "mobileNumbers", "isActive", "createdAt", "updatedAt"
+]
+
+MARKS_EXPORT_COLUMNS = [
+    "id", "studentId", "term", "year", "subjects", "isActive", "createdAt", "updatedAt"
+]
+
+
+def _timestamp(value) -> str:
+    """Format a stored datetime for export."""
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def student_export_row(doc: dict) -> dict:
+    """Convert a student document to an export row."""
+    return {
+        "id": str(doc["_id"]),
+        "studentId": doc["studentId"],
+        "name": doc["name"],
+        "grade": doc["grade"],
+        "mobileNumbers": doc.get("mobileNumbers", []),
+        "isActive": doc.get("isActive", True),
+        "createdAt": _timestamp(doc.get("createdAt")),
+        "updatedAt": _timestamp(doc.get("updatedAt"))
+    }
+
+
+def marks_export_row(doc: dict) -> dict:
+    """Convert a marks document to an export row (active subjects only)."""
+    return {
+        "id": str(doc["_id"]),
+        "studentId": doc["studentId"],
+        "term": doc["term"],
+        "year": doc["year"],
+        "subjects": [
+            {
+                "subjectName": s["subjectName"],
+                "mark": s["mark"],
+                "isActive": s.get("isActive", True)
+            }
+            for s in doc.get("subjects", [])
+            if s.get("isActive", True)
+        ],
+        "isActive": doc.get("isActive", True),
+        "createdAt": _timestamp(doc.get("createdAt")),
+        "updatedAt": _timestamp(doc.get("updatedAt"))
+    }
+
+
+def _csv_value(value):
+    """Flatten list values into a single CSV cell."""
+    if isinstance(value, list):
+        # Mobile numbers are plain strings; subjects become "Name:mark" pairs
+        return ";".join(
+            f"{item['subjectName']}:{item['mark']}" if isinstance(item, dict) else str(item)
+            for item in value
+        )
+    return value
+
+
+def _encode_ndjson(rows: List[dict], columns: List[str]) -> bytes:
+    """Encode rows as newline-delimited JSON."""
+    return "".join(json.dumps(row, separators=(",", ":")) + "\n" for row in rows).encode()
+
+
+def _encode_csv(rows: List[dict], columns: List[str]) -> bytes:
+    """Encode rows as CSV lines (without header)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([_csv_value(row[column]) for column in columns])
+    return buffer.getvalue().encode()
+
+
+ENCODERS = {
+    "ndjson": _encode_ndjson,
+    "csv": _encode_csv
+}
+
+
+async def stream_export(
+    cursor,
+    to_row: Callable[[dict], dict],
+    columns: List[str],
+    export_format: str,
+    batch_size: int
+) -> AsyncIterator[bytes]:
+    """
+    Stream a Motor cursor as NDJSON or CSV.
+    
+    Args:
+        cursor: Motor cursor over the documents to export
+        to_row: Converts a document to an export row
+        columns: Export column names (CSV header and column order)
+        export_format: "ndjson" or "csv"
+        batch_size: Documents fetched per round trip and encoded per chunk
+        
+    Yields:
+        Encoded chunks of the export
+    """
+    encode = ENCODERS[export_format]
+    cursor.batch_size(batch_size)
+    
+    if export_format == "csv":
+        header = io.StringIO()
+        csv.writer(header).writerow(columns)
+        yield header.getvalue().encode()
+    
+    batch = []
+    async for doc in cursor:
+        batch.append(to_row(doc))
+        if len(batch) >= batch_size:
+            yield encode(batch, columns)
+            batch = []
+    
+    if batch:
+        yield encode(batch, columns)
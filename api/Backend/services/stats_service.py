@@ -0,0 +1,633 @@
+"""
+Marks statistics service.
+
+Maintains the `marks_stats` rollup collection so that summary statistics
+are read from a handful of small documents instead of being recomputed from
+the raw `marks` collection on every request.
+
+Rollup buckets (one document each):
+    global                  all marks
+    student:<studentId>     marks of one student (used to move grade totals)
+    grade:<grade>           marks of all students in a grade
+    term:<year>:<term>      marks of one term in one year
+
+Every bucket keeps `documents` (all marks documents, including soft deleted
+ones), `records` (active marks documents), `subjectSum` and `subjectCount`
+(active subject marks), and `minMark`/`maxMark`. Buckets without active
+subject marks have no `minMark`/`maxMark` fields at all: a stored null
+would sort below every mark and `$min` would never replace it.
+
+While a rebuild runs, writes also mark the buckets they touched as dirty
+(`marks_stats_dirty`); once the rebuilt rollup is in place those buckets
+are recomputed from the raw marks, so no write made during the rebuild is
+lost with the old collection.
+"""
+import asyncio
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from pymongo import UpdateOne
+from database import READ_ANALYTICS, READ_PRIMARY, get_collection
+from services.counter_service import COUNTERS_COLLECTION, bump_versions
+from utils.read_cache import SUMMARY_TAG, read_cache
+import logging
+
+logger = logging.getLogger(__name__)
+
+STATS_COLLECTION = "marks_stats"
+# Buckets written to while a rebuild runs
+DIRTY_COLLECTION = "marks_stats_dirty"
+# Counter document holding the number of running rebuilds
+REBUILD_COUNTER = "stats_rebuild"
+
+
+def active_subject_marks(doc: Optional[dict]) -> List[float]:
+    """Return the active subject marks a marks document contributes to statistics."""
+    if not doc or not doc.get("isActive", True):
+        return []
+    return [
+        s["mark"]
+        for s in doc.get("subjects", [])
+        if s.get("isActive", True)
+    ]
+
+
+def bucket_keys(doc: dict, grade: Optional[str]) -> List[Tuple[str, dict]]:
+    """Return (bucket id, identifying fields) for every bucket a marks document belongs to."""
+    keys = [
+        ("global", {"scope": "global"}),
+        (f"student:{doc['studentId']}", {"scope": "student", "studentId": doc["studentId"]}),
+        (
+            f"term:{doc['year']}:{doc['term']}",
+            {"scope": "term", "term": doc["term"], "year": doc["year"]}
+        ),
+    ]
+    if grade is not None:
+        keys.append((f"grade:{grade}", {"scope": "grade", "grade": grade}))
+    return keys
+
+
+# Rollup scopes and the $group key each one is built from
+REBUILD_SCOPES = {
+    "global": None,
+    "student": "$studentId",
+    "term": {"term": "$term", "year": "$year"},
+    "grade": "$grade",
+}
+
+# Active subject marks of a marks document, as an aggregation expression
+ACTIVE_MARKS_EXPR = {
+    "$map": {
+        "input": {
+            "$filter": {
+                "input": {"$ifNull": ["$subjects", []]},
+                "as": "s",
+                "cond": {"$ne": ["$$s.isActive", False]}
+            }
+        },
+        "as": "s",
+        "in": "$$s.mark"
+    }
+}
+
+
+def bucket_group_stages(group_key) -> List[dict]:
+    """Stages turning marks documents into bucket totals grouped by `group_key`."""
+    return [
+        {
+            "$project": {
+                "studentId": 1,
+                "term": 1,
+                "year": 1,
+                "grade": 1,
+                "records": {"$cond": [{"$eq": ["$isActive", False]}, 0, 1]},
+                "marks": {"$cond": [{"$eq": ["$isActive", False]}, [], ACTIVE_MARKS_EXPR]}
+            }
+        },
+        {
+            "$group": {
+                "_id": group_key,
+                "documents": {"$sum": 1},
+                "records": {"$sum": "$records"},
+                "subjectSum": {"$sum": {"$sum": "$marks"}},
+                "subjectCount": {"$sum": {"$size": "$marks"}},
+                "minMark": {"$min": {"$min": "$marks"}},
+                "maxMark": {"$max": {"$max": "$marks"}}
+            }
+        }
+    ]
+
+
+def _bucket_from_group(scope: str, group: dict, now: datetime) -> dict:
+    """Turn a $group result of a rebuild pipeline into a rollup bucket document."""
+    key = group.pop("_id")
+    if scope == "global":
+        bucket = {"_id": "global", "scope": "global"}
+    elif scope == "student":
+        bucket = {"_id": f"student:{key}", "scope": "student", "studentId": key}
+    elif scope == "term":
+        bucket = {
+            "_id": f"term:{key['year']}:{key['term']}",
+            "scope": "term",
+            "term": key["term"],
+            "year": key["year"]
+        }
+    else:
+        bucket = {"_id": f"grade:{key}", "scope": "grade", "grade": key}
+    bucket.update(group)
+    # $min/$max over no marks give null; leave the fields out instead
+    for field in ("minMark", "maxMark"):
+        if bucket.get(field) is None:
+            bucket.pop(field, None)
+    bucket["updatedAt"] = now
+    return bucket
+
+
+def _average(bucket: Optional[dict]) -> float:
+    """Average subject mark of a bucket, rounded like the API responses."""
+    if not bucket or bucket.get("subjectCount", 0) <= 0:
+        return 0
+    return round(bucket["subjectSum"] / bucket["subjectCount"], 2)
+
+
+def build_marks_summary_pipeline() -> List[dict]:
+    """
+    Build the aggregation pipeline that computes summary statistics from raw marks.
+    
+    A single $facet pass returns the active record count, the subject mark
+    totals, and the distinct terms and years in one round trip. Used to check
+    the rollup for drift.
+    """
+    return [
+        {
+            "$facet": {
+                "records": [
+                    {"$match": {"isActive": True}},
+                    {"$count": "count"}
+                ],
+                "subjects": [
+                    {"$match": {"isActive": True}},
+                    {"$unwind": "$subjects"},
+                    {"$match": {"subjects.isActive": {"$ne": False}}},
+                    {
+                        "$group": {
+                            "_id": None,
+                            "total": {"$sum": "$subjects.mark"},
+                            "count": {"$sum": 1},
+                            "min": {"$min": "$subjects.mark"},
+                            "max": {"$max": "$subjects.mark"}
+                        }
+                    }
+                ],
+                "terms": [{"$group": {"_id": "$term"}}],
+                "years": [{"$group": {"_id": "$year"}}]
+            }
+        }
+    ]
+
+
+class StatsService:
+    """Service class for the incrementally maintained marks statistics."""
+    
+    def __init__(self):
+        self.collection = get_collection(STATS_COLLECTION)
+        self.marks_collection = get_collection("marks")
+        self.students_collection = get_collection("students")
+        self.dirty_collection = get_collection(DIRTY_COLLECTION)
+    
+    async def _grades_for(self, student_ids: Iterable[str]) -> Dict[str, str]:
+        """Look up the current grade of each student in one query."""
+        ids = list(set(student_ids))
+        if not ids:
+            return {}
+        cursor = self.students_collection.find(
+            {"studentId": {"$in": ids}},
+            {"studentId": 1, "grade": 1}
+        )
+        return {s["studentId"]: s.get("grade") async for s in cursor}
+    
+    async def apply_change(self, before: Optional[dict], after: Optional[dict]):
+        """
+        Apply the delta of a single marks write to the rollup.
+        
+        Args:
+            before: Marks document before the write (None for inserts)
+            after: Marks document after the write (None for hard deletes)
+        """
+        await self.apply_changes([(before, after)])
+    
+    async def apply_changes(self, changes: List[Tuple[Optional[dict], Optional[dict]]]):
+        """
+        Apply the deltas of many marks writes to the rollup in one bulk write.
+        
+        Args:
+            changes: List of (before, after) marks documents
+        """
+        grades = await self._grades_for(
+            doc["studentId"]
+            for pair in changes
+            for doc in pair
+            if doc is not None
+        )
+        
+        deltas: Dict[str, dict] = {}
+        
+        def accumulate(doc: Optional[dict], sign: int):
+            if doc is None:
+                return
+            marks = active_subject_marks(doc)
+            records = 1 if doc.get("isActive", True) else 0
+            for bucket_id, fields in bucket_keys(doc, grades.get(doc["studentId"])):
+                delta = deltas.setdefault(bucket_id, {
+                    "fields": fields,
+                    "documents": 0,
+                    "records": 0,
+                    "subjectSum": 0,
+                    "subjectCount": 0,
+                    "added": [],
+                    "removed": []
+                })
+                delta["documents"] += sign
+                delta["records"] += sign * records
+                delta["subjectSum"] += sign * sum(marks)
+                delta["subjectCount"] += sign * len(marks)
+                delta["added" if sign > 0 else "removed"].extend(marks)
+        
+        for before, after in changes:
+            accumulate(before, -1)
+            accumulate(after, 1)
+        
+        if not deltas:
+            return
+        
+        now = datetime.utcnow()
+        operations = []
+        for bucket_id, delta in deltas.items():
+            update = {
+                "$inc": {
+                    "documents": delta["documents"],
+                    "records": delta["records"],
+                    "subjectSum": delta["subjectSum"],
+                    "subjectCount": delta["subjectCount"]
+                },
+                "$set": {"updatedAt": now},
+                "$setOnInsert": delta["fields"]
+            }
+            if delta["added"]:
+                update["$min"] = {"minMark": min(delta["added"])}
+                update["$max"] = {"maxMark": max(delta["added"])}
+            operations.append(UpdateOne({"_id": bucket_id}, update, upsert=True))
+        
+        # The rebuild check runs after the marks write, so a rebuild that is
+        # not running yet will read this write from the marks collection
+        _, rebuilding = await asyncio.gather(
+            self.collection.bulk_write(operations, ordered=False),
+            self._rebuilding()
+        )
+        if rebuilding:
+            await self._mark_dirty(deltas)
+        
+        # Removing a value can invalidate a bucket's min/max, which cannot be
+        # maintained by deltas. Values written back by the same change (a
+        # term edit, a subject rename) are not removed; only buckets whose
+        # extreme was really removed are recomputed. The additions are
+        # already applied, so a new extreme beyond the removed one counts.
+        removed = {}
+        for bucket_id, delta in deltas.items():
+            net = list((Counter(delta["removed"]) - Counter(delta["added"])).elements())
+            if net:
+                removed[bucket_id] = net
+        if removed:
+            buckets = await self.collection.find({"_id": {"$in": list(removed)}}).to_list(length=None)
+            for bucket in buckets:
+                net = removed[bucket["_id"]]
+                if bucket.get("subjectCount", 0) <= 0:
+                    if "minMark" in bucket or "maxMark" in bucket:
+                        await self.collection.update_one(
+                            {"_id": bucket["_id"]}, {"$unset": {"minMark": "", "maxMark": ""}}
+                        )
+                elif (
+                    bucket.get("minMark") is None
+                    or bucket.get("maxMark") is None
+                    or min(net) <= bucket["minMark"]
+                    or max(net) >= bucket["maxMark"]
+                ):
+                    await self._recompute_extremes(bucket)
+    
+    async def _rebuilding(self) -> bool:
+        """Whether a rebuild is running (on any worker)."""
+        counter = await get_collection(COUNTERS_COLLECTION, READ_PRIMARY).find_one({"_id": REBUILD_COUNTER})
+        return bool(counter and counter.get("running", 0) > 0)
+    
+    async def _mark_dirty(self, deltas: Dict[str, dict]):
+        """Record the buckets of a write made during a rebuild."""
+        await self.dirty_collection.bulk_write([
+            UpdateOne(
+                {"_id": bucket_id},
+                {"$inc": {"seq": 1}, "$set": {"fields": delta["fields"]}},
+                upsert=True
+            )
+            for bucket_id, delta in deltas.items()
+        ], ordered=False)
+    
+    async def _recompute_bucket(self, bucket_id: str, fields: dict, now: datetime):
+        """Replace one bucket with its totals computed from the raw marks."""
+        match = await self._bucket_filter(fields)
+        groups = await self.marks_collection.aggregate(
+            [{"$match": match}, *bucket_group_stages(None)]
+        ).to_list(length=1)
+        
+        if not groups or not groups[0].get("documents"):
+            await self.collection.delete_one({"_id": bucket_id})
+            return
+        
+        group = groups[0]
+        group.pop("_id")
+        bucket = {"_id": bucket_id, **fields, **group, "updatedAt": now}
+        for field in ("minMark", "maxMark"):
+            if bucket.get(field) is None:
+                bucket.pop(field, None)
+        await self.collection.replace_one({"_id": bucket_id}, bucket, upsert=True)
+    
+    async def _recompute_dirty(self) -> int:
+        """
+        Recompute the dirty buckets until none are left.
+        
+        An entry is only removed if it was not marked again since it was
+        read, so a write landing during the recompute is picked up by the
+        next round.
+        
+        Returns:
+            Number of buckets recomputed
+        """
+        count = 0
+        while True:
+            entries = await self.dirty_collection.find({}).to_list(length=None)
+            if not entries:
+                return count
+            now = datetime.utcnow()
+            for entry in entries:
+                await self.dirty_collection.delete_one({"_id": entry["_id"], "seq": entry["seq"]})
+                await self._recompute_bucket(entry["_id"], entry["fields"], now)
+                count += 1
+    
+    async def _bucket_filter(self, bucket: dict) -> dict:
+        """Build the raw `marks` filter matching a bucket."""
+        scope = bucket.get("scope")
+        if scope == "student":
+            return {"studentId": bucket["studentId"]}
+        if scope == "term":
+            return {"term": bucket["term"], "year": bucket["year"]}
+        if scope == "grade":
+            student_ids = await self.students_collection.distinct(
+                "studentId", {"grade": bucket["grade"]}
+            )
+            return {"studentId": {"$in": student_ids}}
+        return {}
+    
+    async def _recompute_extremes(self, bucket: dict):
+        """Recompute minMark/maxMark of a bucket from the raw marks collection."""
+        match = await self._bucket_filter(bucket)
+        match["isActive"] = True
+        
+        result = await self.marks_collection.aggregate([
+            {"$match": match},
+            {"$unwind": "$subjects"},
+            {"$match": {"subjects.isActive": {"$ne": False}}},
+            {
+                "$group": {
+                    "_id": None,
+                    "minMark": {"$min": "$subjects.mark"},
+                    "maxMark": {"$max": "$subjects.mark"}
+                }
+            }
+        ]).to_list(length=1)
+        
+        if result and result[0]["minMark"] is not None:
+            update = {"$set": {"minMark": result[0]["minMark"], "maxMark": result[0]["maxMark"]}}
+        else:
+            # No active marks left: unset, so the next $min/$max starts afresh
+            update = {"$unset": {"minMark": "", "maxMark": ""}}
+        await self.collection.update_one({"_id": bucket["_id"]}, update)
+    
+    async def move_student_grade(self, student_id: str, old_grade: Optional[str], new_grade: str):
+        """
+        Move a student's totals from one grade bucket to another.
+        
+        Called when a student's grade changes, since grade buckets are keyed
+        by the student's current grade.
+        """
+        if old_grade == new_grade:
+            return
+        
+        student_bucket = await self.collection.find_one({"_id": f"student:{student_id}"})
+        if not student_bucket or student_bucket.get("documents", 0) == 0:
+            return
+        
+        now = datetime.utcnow()
+        totals = {
+            "documents": student_bucket.get("documents", 0),
+            "records": student_bucket.get("records", 0),
+            "subjectSum": student_bucket.get("subjectSum", 0),
+            "subjectCount": student_bucket.get("subjectCount", 0)
+        }
+        
+        update = {
+            "$inc": totals,
+            "$set": {"updatedAt": now},
+            "$setOnInsert": {"scope": "grade", "grade": new_grade}
+        }
+        if student_bucket.get("minMark") is not None:
+            update["$min"] = {"minMark": student_bucket["minMark"]}
+            update["$max"] = {"maxMark": student_bucket["maxMark"]}
+        
+        operations = [UpdateOne({"_id": f"grade:{new_grade}"}, update, upsert=True)]
+        if old_grade is not None:
+            operations.append(UpdateOne(
+                {"_id": f"grade:{old_grade}"},
+                {
+                    "$inc": {field: -value for field, value in totals.items()},
+                    "$set": {"updatedAt": now}
+                }
+            ))
+        await self.collection.bulk_write(operations, ordered=False)
+        
+        if old_grade is not None:
+            old_bucket = await self.collection.find_one({"_id": f"grade:{old_grade}"})
+            if old_bucket:
+                await self._recompute_extremes(old_bucket)
+    
+    async def get_summary(self, read_policy: str = READ_ANALYTICS) -> dict:
+        """
+        Read the global and per-term buckets.
+        
+        Args:
+            read_policy: Read policy of the bucket query
+            
+        Returns:
+            Dict with record/subject totals, average, terms and years
+        """
+        buckets = await get_collection(STATS_COLLECTION, read_policy).find(
+            {"scope": {"$in": ["global", "term"]}}
+        ).to_list(length=None)
+        
+        global_bucket = next((b for b in buckets if b["scope"] == "global"), {})
+        term_buckets = [
+            b for b in buckets
+            if b["scope"] == "term" and b.get("documents", 0) > 0
+        ]
+        terms = {b["term"] for b in term_buckets}
+        years = {b["year"] for b in term_buckets}
+        
+        return {
+            "totalMarksRecords": global_bucket.get("records", 0),
+            "averageMark": _average(global_bucket),
+            "totalSubjectEntries": global_bucket.get("subjectCount", 0),
+            "availableTerms": sorted(terms),
+            "availableYears": sorted(years, reverse=True)
+        }
+    
+    async def compute_summary_from_marks(self) -> dict:
+        """
+        Compute the summary directly from the raw marks collection.
+        
+        Returns:
+            Dict in the same shape as get_summary(), plus the global
+            minMark/maxMark (None without active marks)
+        """
+        facets = await self.marks_collection.aggregate(
+            build_marks_summary_pipeline()
+        ).to_list(length=1)
+        
+        facet = facets[0] if facets else {}
+        records = facet.get("records") or [{"count": 0}]
+        subjects = facet.get("subjects") or [{"total": 0, "count": 0, "min": None, "max": None}]
+        terms = [t["_id"] for t in facet.get("terms", []) if t["_id"] is not None]
+        years = [y["_id"] for y in facet.get("years", []) if y["_id"] is not None]
+        
+        return {
+            "totalMarksRecords": records[0]["count"],
+            "averageMark": _average({"subjectSum": subjects[0]["total"], "subjectCount": subjects[0]["count"]}),
+            "totalSubjectEntries": subjects[0]["count"],
+            "availableTerms": sorted(terms),
+            "availableYears": sorted(years, reverse=True),
+            "minMark": subjects[0]["min"],
+            "maxMark": subjects[0]["max"]
+        }
+    
+    async def check_drift(self) -> dict:
+        """
+        Compare the rollup summary with one computed from raw marks.
+        
+        Besides the summary fields this compares the global minMark/maxMark
+        and counts buckets that have active subject marks but no extremes.
+        
+        Returns:
+            Dict of fields whose values differ, as {field: {"rollup", "marks"}}
+        """
+        rollup = await self.get_summary()
+        global_bucket = await self.collection.find_one({"_id": "global"}) or {}
+        rollup["minMark"] = global_bucket.get("minMark")
+        rollup["maxMark"] = global_bucket.get("maxMark")
+        actual = await self.compute_summary_from_marks()
+        
+        drift = {
+            field: {"rollup": rollup[field], "marks": actual[field]}
+            for field in actual
+            if rollup[field] != actual[field]
+        }
+        
+        missing = await self.collection.count_documents({
+            "subjectCount": {"$gt": 0},
+            "$or": [{"minMark": None}, {"maxMark": None}]
+        })
+        if missing:
+            drift["bucketsMissingExtremes"] = {"rollup": missing, "marks": 0}
+        return drift
+    
+    async def rebuild(self, batch_size: int = 1000) -> int:
+        """
+        Recompute the whole rollup from the raw marks collection.
+        
+        Each scope is grouped server-side; the resulting buckets are written
+        to a staging collection which then replaces the rollup in one rename,
+        so readers never see a partially built rollup. Buckets written to
+        while the rebuild runs are recomputed afterwards (see _recompute_dirty).
+        
+        Args:
+            batch_size: Number of buckets per insert_many
+            
+        Returns:
+            Number of buckets written
+        """
+        logger.info("[STATS] Rebuilding marks statistics...")
+        
+        counters = get_collection(COUNTERS_COLLECTION)
+        # Marks left by an earlier, interrupted rebuild are covered by this one
+        await self.dirty_collection.delete_many({})
+        await counters.update_one({"_id": REBUILD_COUNTER}, {"$inc": {"running": 1}}, upsert=True)
+        try:
+            count = await self._build_rollup(batch_size)
+            recomputed = await self._recompute_dirty()
+        finally:
+            await counters.update_one({"_id": REBUILD_COUNTER}, {"$inc": {"running": -1}})
+        # Writes that saw the rebuild running just before it ended
+        recomputed += await self._recompute_dirty()
+        
+        await bump_versions(STATS_COLLECTION)
+        await read_cache.invalidate(SUMMARY_TAG)
+        
+        logger.info(
+            f"[STATS] Rebuilt {count} statistics buckets "
+            f"({recomputed} recomputed after concurrent writes)"
+        )
+        return count
+    
+    async def _build_rollup(self, batch_size: int) -> int:
+        """Build the rollup in a staging collection and swap it in."""
+        staging = get_collection(f"{STATS_COLLECTION}_rebuild")
+        await staging.drop()
+        
+        now = datetime.utcnow()
+        count = 0
+        batch = []
+        
+        for scope, group_key in REBUILD_SCOPES.items():
+            pipeline = []
+            if scope == "grade":
+                pipeline += [
+                    {
+                        "$lookup": {
+                            "from": "students",
+                            "localField": "studentId",
+                            "foreignField": "studentId",
+                            "as": "student"
+                        }
+                    },
+                    {"$addFields": {"grade": {"$arrayElemAt": ["$student.grade", 0]}}},
+                    {"$match": {"grade": {"$ne": None}}}
+                ]
+            pipeline += bucket_group_stages(group_key)
+            
+            async for group in self.marks_collection.aggregate(pipeline):
+                batch.append(_bucket_from_group(scope, group, now))
+                if len(batch) >= batch_size:
+                    await staging.insert_many(batch, ordered=False)
+                    count += len(batch)
+                    batch = []
+        
+        if batch:
+            await staging.insert_many(batch, ordered=False)
+            count += len(batch)
+        
+        if count:
+            await staging.rename(STATS_COLLECTION, dropTarget=True)
+        else:
+            await self.collection.delete_many({})
+        await self.collection.create_index("scope")
+        return count
+    
+    async def ensure_initialized(self):
+        """Build the rollup if it has never been built (e.g. on existing data)."""
+        if await self.collection.find_one({"_id": "global"}) is None:
+            await self.rebuild()
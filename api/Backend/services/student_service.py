@@ -0,0 +1,328 @@
+"""
+Student service for bulk student creation, search and profile reads.
+"""
+import asyncio
+from datetime import datetime
+from typing import List, Optional, Tuple
+from pydantic import ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from database import get_collection
+from models.common import BulkRowResult
+from models.student import StudentCreate
+from services.counter_service import bump_versions, student_id_allocator, student_number
+from services.marks_service import DUPLICATE_KEY_ERROR, format_validation_error
+from services.suggest_service import student_suggest_index
+from utils.read_cache import SUMMARY_TAG, read_cache
+from utils.search import (
+    name_search_fields, name_words, normalize_text, prefix_regex, student_id_prefix
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of marks entries returned in a student profile
+PROFILE_MARKS_LIMIT = 100
+
+
+def student_create_to_doc(student_data: StudentCreate, student_id: str, now: datetime) -> dict:
+    """Build a new student document from validated input."""
+    return {
+        "studentId": student_id,
+        "studentNumber": student_number(student_id),
+        "name": student_data.name,
+        "grade": student_data.grade,
+        "mobileNumbers": student_data.mobileNumbers,
+        **name_search_fields(student_data.name),
+        "isActive": True,
+        "createdAt": now,
+        "updatedAt": now
+    }
+
+
+def build_student_profile_pipeline(student_id: str) -> List[dict]:
+    """
+    Build the aggregation that returns a student with their active marks and statistics.
+    
+    The marks are joined with $lookup (localField/foreignField plus an inner
+    pipeline, MongoDB 5.0+, so the studentId index is used) and the
+    statistics are computed server-side, so the whole profile is one round
+    trip. Statistics match the Python calculation they replace: active
+    subjects only, average rounded to 2 decimals (0 when there are none).
+    """
+    active_subject_marks = {
+        "$map": {
+            "input": {
+                "$filter": {
+                    "input": {"$ifNull": ["$$this.subjects", []]},
+                    "as": "s",
+                    "cond": {"$ne": ["$$s.isActive", False]}
+                }
+            },
+            "as": "s",
+            "in": "$$s.mark"
+        }
+    }
+    
+    return [
+        {"$match": {"studentId": student_id}},
+        {"$limit": 1},
+        {
+            "$lookup": {
+                "from": "marks",
+                "localField": "studentId",
+                "foreignField": "studentId",
+                "pipeline": [{"$match": {"isActive": True}}],
+                "as": "marks"
+            }
+        },
+        {
+            "$addFields": {
+                "activeMarks": {
+                    "$reduce": {
+                        "input": "$marks",
+                        "initialValue": [],
+                        "in": {"$concatArrays": ["$$value", active_subject_marks]}
+                    }
+                }
+            }
+        },
+        {
+            "$addFields": {
+                "marks": {"$slice": ["$marks", PROFILE_MARKS_LIMIT]},
+                "statistics": {
+                    "totalSubjects": {"$size": "$activeMarks"},
+                    "averageMark": {"$ifNull": [{"$round": [{"$avg": "$activeMarks"}, 2]}, 0]},
+                    "totalTerms": {"$size": "$marks"}
+                }
+            }
+        },
+        {"$project": {"activeMarks": 0}}
+    ]
+
+
+def search_rank(doc: dict, normalized: str, id_prefix: str) -> tuple:
+    """
+    Sort key for search results: exact matches first, then studentId prefix
+    matches (by ID), then name prefix matches and finally word matches
+    (alphabetically).
+    """
+    name = doc.get("nameLower") or normalize_text(doc["name"])
+    if doc["studentId"] == id_prefix or name == normalized:
+        return (0, name, doc["studentId"])
+    if id_prefix and doc["studentId"].startswith(id_prefix):
+        return (1, doc["studentId"], name)
+    if name.startswith(normalized):
+        return (2, name, doc["studentId"])
+    return (3, name, doc["studentId"])
+
+
+class StudentService:
+    """Service class for bulk student operations."""
+    
+    def __init__(self, read_policy: Optional[str] = None):
+        self.collection = get_collection("students", read_policy)
+    
+    async def bulk_create(
+        self,
+        rows: List[dict],
+        index_offset: int = 0,
+        student_ids: Optional[List[str]] = None
+    ) -> Tuple[List[dict], List[BulkRowResult]]:
+        """
+        Validate and insert many students.
+        
+        IDs for all valid rows are reserved from the student ID sequence in
+        one round trip and the documents are written with one insert_many.
+        
+        Args:
+            rows: Raw student rows (validated against StudentCreate)
+            index_offset: Added to row indexes in the report (for batched callers)
+            student_ids: IDs already reserved by the caller, one per row; a row
+                whose ID exists is reported as an error and not inserted again
+                (resumed imports)
+                
+        Returns:
+            Tuple of (inserted student documents, per-row results)
+        """
+        results: List[BulkRowResult] = []
+        valid = []
+        
+        for position, row in enumerate(rows):
+            index = index_offset + position
+            try:
+                valid.append((index, position, StudentCreate.model_validate(row)))
+            except ValidationError as e:
+                results.append(BulkRowResult(
+                    index=index, status="error", error=format_validation_error(e)
+                ))
+        
+        if not valid:
+            return [], results
+        
+        if student_ids is None:
+            allocated = await student_id_allocator.next_ids(len(valid))
+        else:
+            allocated = [student_ids[position] for _, position, _ in valid]
+        now = datetime.utcnow()
+        docs = [
+            student_create_to_doc(student_data, student_id, now)
+            for (_, _, student_data), student_id in zip(valid, allocated)
+        ]
+        
+        failed = {}
+        try:
+            await self.collection.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            for write_error in e.details.get("writeErrors", []):
+                failed[write_error["index"]] = write_error
+        
+        inserted_docs = []
+        for position, ((index, _, _), doc) in enumerate(zip(valid, docs)):
+            write_error = failed.get(position)
+            if write_error is None:
+                inserted_docs.append(doc)
+                results.append(BulkRowResult(index=index, status="inserted", id=doc["studentId"]))
+                student_suggest_index.upsert(doc)
+            elif write_error.get("code") == DUPLICATE_KEY_ERROR:
+                results.append(BulkRowResult(
+                    index=index, status="error", code="duplicate",
+                    error=f"Student already exists: {doc['studentId']}"
+                ))
+            else:
+                results.append(BulkRowResult(
+                    index=index, status="error", error=write_error.get("errmsg", "Write failed")
+                ))
+        
+        if inserted_docs:
+            await bump_versions("students")
+            await read_cache.invalidate(SUMMARY_TAG)
+        
+        results.sort(key=lambda r: r.index)
+        logger.info(f"[BULK] Inserted {len(inserted_docs)} of {len(rows)} student rows")
+        return inserted_docs, results
+    
+    async def get_profile(self, student_id: str) -> Optional[dict]:
+        """
+        Get a student document with `marks` and `statistics` in one round trip.
+        
+        Args:
+            student_id: Student ID (e.g. STU-001)
+            
+        Returns:
+            Student document with joined marks and statistics, or None if not found
+        """
+        result = await self.collection.aggregate(
+            build_student_profile_pipeline(student_id)
+        ).to_list(length=1)
+        return result[0] if result else None
+    
+    async def search(self, search: str, query: dict, limit: int) -> List[dict]:
+        """
+        Find the best `limit` students matching a search string.
+        
+        Runs up to three anchored prefix queries concurrently, each served by
+        an index and capped at `limit`: studentId (when the search looks like
+        an ID), the whole normalized name, and every search word as a prefix
+        of some word of the name. The results are merged and ranked.
+        
+        Args:
+            search: User-supplied search text (matched literally, never as a regex)
+            query: Additional filters (e.g. isActive, grade)
+            limit: Maximum number of students to return
+            
+        Returns:
+            Ranked student documents
+        """
+        normalized = normalize_text(search)
+        words = name_words(normalized)
+        id_prefix = student_id_prefix(search)
+        
+        if not words and not id_prefix:
+            return []
+        
+        lookups = []
+        if id_prefix:
+            lookups.append(
+                self.collection.find({**query, "studentId": prefix_regex(id_prefix)})
+                .sort("studentId", 1).limit(limit)
+            )
+        lookups.append(
+            self.collection.find({**query, "nameLower": prefix_regex(normalized)})
+            .sort("nameLower", 1).limit(limit)
+        )
+        if words:
+            lookups.append(
+                self.collection.find({
+                    **query,
+                    "$and": [{"nameWords": prefix_regex(word)} for word in words]
+                }).limit(limit)
+            )
+        
+        batches = await asyncio.gather(*(cursor.to_list(length=limit) for cursor in lookups))
+        
+        unique = {}
+        for batch in batches:
+            for doc in batch:
+                unique.setdefault(doc["_id"], doc)
+        
+        ranked = sorted(unique.values(), key=lambda d: search_rank(d, normalized, id_prefix))
+        return ranked[:limit]
+    
+    async def backfill_student_numbers(self, batch_size: int = 1000) -> int:
+        """
+        Add the numeric `studentNumber` to students created before it existed.
+        
+        Args:
+            batch_size: Students updated per bulk write
+            
+        Returns:
+            Number of students updated
+        """
+        updated = 0
+        while True:
+            docs = await self.collection.find(
+                {"studentNumber": {"$exists": False}},
+                {"studentId": 1}
+            ).limit(batch_size).to_list(length=batch_size)
+            if not docs:
+                break
+            
+            await self.collection.bulk_write([
+                UpdateOne({"_id": doc["_id"]}, {"$set": {"studentNumber": student_number(doc["studentId"])}})
+                for doc in docs
+            ], ordered=False)
+            updated += len(docs)
+        
+        if updated:
+            logger.info(f"[OK] Added student numbers to {updated} students")
+        return updated
+    
+    async def backfill_search_fields(self, batch_size: int = 1000) -> int:
+        """
+        Add `nameLower`/`nameWords` to students created before search fields existed.
+        
+        Args:
+            batch_size: Students updated per bulk write
+            
+        Returns:
+            Number of students updated
+        """
+        updated = 0
+        while True:
+            docs = await self.collection.find(
+                {"nameWords": {"$exists": False}},
+                {"name": 1}
+            ).limit(batch_size).to_list(length=batch_size)
+            if not docs:
+                break
+            
+            await self.collection.bulk_write([
+                UpdateOne({"_id": doc["_id"]}, {"$set": name_search_fields(doc["name"])})
+                for doc in docs
+            ], ordered=False)
+            updated += len(docs)
+        
+        if updated:
+            logger.info(f"[OK] Added search fields to {updated} students")
+        return updated
@@ -0,0 +1,147 @@
+"""
+Deterministic synthetic data for load testing.
+
+Every student is generated from its own random stream, seeded with the
+dataset seed and the student number, so student N (and its marks) is the
+same on every run regardless of chunk size or how many students are
+generated. That makes seeding idempotent: a re-run produces identical
+documents, which the unique indexes then skip.
+
+Distributions:
+    grades:  8-12, slightly fewer students in senior grades
+    ability: per student, normal around 62 (sd 12)
+    marks:   ability + subject difficulty + term trend + noise, clamped to 0-100
+    subjects: the four core subjects plus two or three electives per term
+"""
+import random
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from services.counter_service import format_student_id
+from utils.search import name_search_fields
+
+FIRST_NAMES = [
+    "Kamal", "Nimali", "Sahan", "Dilini", "Ruwan", "Tharindu", "Sanduni", "Kasun",
+    "Ishara", "Chamara", "Nadeesha", "Pasindu", "Hiruni", "Dinuka", "Sachini",
+    "Lahiru", "Oshadi", "Malith", "Imesha", "Supun", "Tharushi", "Ravindu",
+    "Anjali", "Janith", "Kavindi", "Dulaj", "Shehani", "Nuwan", "Piumi", "Yasiru",
+    "Sithmi", "Heshan", "Madushi", "Chathura", "Rashmi", "Vinura", "Amaya", "Gayan"
+]
+
+LAST_NAMES = [
+    "Perera", "Fernando", "Silva", "Jayawardena", "Gunaratne", "Bandara",
+    "Wickramasinghe", "Dissanayake", "Rajapaksa", "Herath", "Kumara", "Jayasinghe",
+    "Rathnayake", "Senanayake", "Weerasinghe", "Karunaratne", "Ranasinghe",
+    "Wijesinghe", "Samarasinghe", "Abeysekara", "Liyanage", "Ekanayake",
+    "Gamage", "Pathirana", "Amarasinghe", "Madushanka", "Mendis", "De Silva"
+]
+
+GRADES = ["8", "9", "10", "11", "12"]
+GRADE_WEIGHTS = [0.22, 0.21, 0.21, 0.19, 0.17]
+
+TERMS = ["Term 1", "Term 2", "Term 3"]
+
+CORE_SUBJECTS = ["Mathematics", "Science", "English", "Sinhala"]
+ELECTIVE_SUBJECTS = ["History", "Geography", "ICT", "Art", "Commerce", "Music"]
+
+# Average mark offset per subject relative to a student's ability
+SUBJECT_DIFFICULTY = {
+    "Mathematics": -6.0,
+    "Science": -3.0,
+    "English": -1.0,
+    "Sinhala": 4.0,
+    "History": 2.0,
+    "Geography": 1.0,
+    "ICT": 3.0,
+    "Art": 7.0,
+    "Commerce": 0.0,
+    "Music": 6.0
+}
+
+
+def term_slots(terms: int, last_year: int) -> List[Tuple[str, int]]:
+    """
+    Return the (term, year) pairs of the last `terms` terms, oldest first.
+    
+    Args:
+        terms: Number of terms per student
+        last_year: Year of the most recent term (its Term 3)
+    """
+    slots = []
+    for back in range(terms):
+        slots.append((TERMS[len(TERMS) - 1 - back % len(TERMS)], last_year - back // len(TERMS)))
+    return slots[::-1]
+
+
+class SyntheticDataGenerator:
+    """Generates reproducible student and marks documents."""
+    
+    def __init__(self, seed: int = 42, terms: int = 3, last_year: Optional[int] = None):
+        self.seed = seed
+        self.slots = term_slots(terms, last_year or datetime.now().year)
+        # Only len(FIRST_NAMES) * len(LAST_NAMES) names exist, so normalize each once
+        self._search_fields: Dict[str, dict] = {}
+    
+    def _rng(self, number: int) -> random.Random:
+        return random.Random(self.seed * 1_000_003 + number)
+    
+    def _name_fields(self, name: str) -> dict:
+        fields = self._search_fields.get(name)
+        if fields is None:
+            fields = self._search_fields[name] = name_search_fields(name)
+        return fields
+    
+    def student_with_marks(self, number: int, now: datetime) -> Tuple[dict, List[dict]]:
+        """
+        Generate student `number` and its marks records.
+        
+        Args:
+            number: Student sequence number (the student ID is STU-<number>)
+            now: createdAt/updatedAt of the documents
+            
+        Returns:
+            (student document, marks documents)
+        """
+        rng = self._rng(number)
+        student_id = format_student_id(number)
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        
+        student = {
+            "studentId": student_id,
+            "studentNumber": number,
+            "name": name,
+            "grade": rng.choices(GRADES, weights=GRADE_WEIGHTS)[0],
+            "mobileNumbers": [
+                f"07{rng.randint(10000000, 99999999)}" for _ in range(rng.randint(1, 2))
+            ],
+            **self._name_fields(name),
+            "isActive": True,
+            "createdAt": now,
+            "updatedAt": now
+        }
+        
+        ability = rng.gauss(62, 12)
+        trend = rng.gauss(0, 1.5)
+        marks = []
+        
+        for position, (term, year) in enumerate(self.slots):
+            electives = rng.sample(ELECTIVE_SUBJECTS, rng.randint(2, 3))
+            subjects = []
+            for subject_name in CORE_SUBJECTS + electives:
+                mark = ability + SUBJECT_DIFFICULTY[subject_name] + trend * position + rng.gauss(0, 9)
+                subjects.append({
+                    "subjectName": subject_name,
+                    "mark": round(min(100.0, max(0.0, mark)), 1),
+                    "isActive": True
+                })
+            
+            marks.append({
+                "studentId": student_id,
+                "term": term,
+                "year": year,
+                "subjects": subjects,
+                "isActive": True,
+                "createdAt": now,
+                "updatedAt": now
+            })
+        
+        return student, marks
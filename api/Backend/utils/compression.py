@@ -0,0 +1,208 @@
+"""
+Response compression negotiated via Accept-Encoding.
+
+List and export responses repeat the same keys, subject names, terms and
+ISO timestamps on every row, so they compress very well. CompressionMiddleware
+encodes text and JSON responses with the best encoding both sides support:
+    
+    br      brotli (optional `brotli` package)
+    zstd    Zstandard (optional `zstandard` package)
+    gzip    always available
+
+Server preference comes from COMPRESSION_ENCODINGS; encodings whose package
+is not installed are skipped, and the client's q-values decide between the
+rest. Complete responses smaller than COMPRESSION_MINIMUM_SIZE are sent as
+is. Streaming responses (exports) are compressed chunk by chunk and flushed
+after every chunk, so rows still reach the client as they are produced.
+"""
+import importlib.util
+import zlib
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+from starlette.datastructures import Headers, MutableHeaders
+from config import settings
+
+# Media types worth compressing besides text/* and +json types
+COMPRESSIBLE_TYPES = {
+    "application/json", "application/x-ndjson", "application/javascript", "application/xml"
+}
+
+# Optional package needed per encoding
+ENCODING_PACKAGES = {"br": "brotli", "zstd": "zstandard", "gzip": None}
+
+
+class _GzipCompressor:
+    def __init__(self, level: int):
+        # wbits=31 writes a gzip header and trailer
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    
+    def compress(self, data: bytes, final: bool) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(
+            zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH
+        )
+
+
+class _BrotliCompressor:
+    def __init__(self, quality: int):
+        import brotli
+        self._compressor = brotli.Compressor(quality=quality)
+    
+    def compress(self, data: bytes, final: bool) -> bytes:
+        output = self._compressor.process(data)
+        return output + (self._compressor.finish() if final else self._compressor.flush())
+
+
+class _ZstdCompressor:
+    def __init__(self, level: int):
+        import zstandard
+        self._flush_block = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+    
+    def compress(self, data: bytes, final: bool) -> bytes:
+        output = self._compressor.compress(data)
+        return output + (self._compressor.flush() if final else self._compressor.flush(self._flush_block))
+
+
+def new_compressor(encoding: str):
+    """Return a compressor for `encoding` at the configured level."""
+    if encoding == "br":
+        return _BrotliCompressor(settings.COMPRESSION_BROTLI_QUALITY)
+    if encoding == "zstd":
+        return _ZstdCompressor(settings.COMPRESSION_ZSTD_LEVEL)
+    return _GzipCompressor(settings.COMPRESSION_GZIP_LEVEL)
+
+
+@lru_cache(maxsize=1)
+def available_encodings() -> Tuple[str, ...]:
+    """Configured encodings whose packages are installed, in server preference order."""
+    encodings = []
+    for encoding in settings.COMPRESSION_ENCODINGS.split(","):
+        encoding = encoding.strip().lower()
+        if encoding not in ENCODING_PACKAGES or encoding in encodings:
+            continue
+        package = ENCODING_PACKAGES[encoding]
+        if package is None or importlib.util.find_spec(package) is not None:
+            encodings.append(encoding)
+    return tuple(encodings)
+
+
+@lru_cache(maxsize=256)
+def negotiate(accept_encoding: str, encodings: Tuple[str, ...]) -> Optional[str]:
+    """
+    Pick the response encoding for an Accept-Encoding header.
+    
+    Args:
+        accept_encoding: Accept-Encoding request header ("" if absent)
+        encodings: Encodings the server supports, most preferred first
+        
+    Returns:
+        The encoding with the highest client q-value (server order breaks
+        ties), or None to send the response uncompressed
+    """
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name] = weight
+    
+    best, best_weight = None, 0.0
+    for encoding in encodings:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def is_compressible(content_type: str) -> bool:
+    """Whether responses of this Content-Type are worth compressing."""
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return media_type.startswith("text/") or media_type.endswith("+json") or media_type in COMPRESSIBLE_TYPES
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing text and JSON responses.
+    
+    Implemented at the ASGI level (like MetricsMiddleware) so streaming
+    responses are compressed as they are sent instead of being buffered.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), available_encodings())
+        start_message = None
+        compressor = None
+        passthrough = False
+        
+        async def send_compressed(message):
+            nonlocal start_message, compressor, passthrough
+            message_type = message["type"]
+            
+            if message_type == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                if is_compressible(headers.get("content-type", "")):
+                    headers.add_vary_header("Accept-Encoding")
+                    passthrough = (
+                        encoding is None
+                        or "content-encoding" in headers
+                        or message["status"] in (204, 304)
+                    )
+                else:
+                    passthrough = True
+                if passthrough:
+                    await send(message)
+                else:
+                    # Wait for the first chunk to decide between one-shot and streaming
+                    start_message = message
+                return
+            
+            if passthrough or message_type != "http.response.body":
+                await send(message)
+                return
+            
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            
+            if start_message is not None:
+                headers = MutableHeaders(scope=start_message)
+                if not more_body and len(body) < settings.COMPRESSION_MINIMUM_SIZE:
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                
+                compressor = new_compressor(encoding)
+                headers["Content-Encoding"] = encoding
+                # The compressed bytes differ from the tagged ones; keep the ETag as a weak one
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = f"W/{etag}"
+                if more_body:
+                    del headers["Content-Length"]
+                    body = compressor.compress(body, final=False)
+                else:
+                    body = compressor.compress(body, final=True)
+                    headers["Content-Length"] = str(len(body))
+                await send(start_message)
+                start_message = None
+            else:
+                body = compressor.compress(body, final=not more_body)
+            
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+        
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,100 @@
+"""
+ETags and conditional GETs for polled read endpoints.
+
+A route's ETag is a digest of its path and query string and the versions
+of the collections it reads (services/counter_service.py), so it changes
+whenever any of those collections is written. When the client sends
+If-None-Match with the current ETag the route answers 304 Not Modified
+after a single primary-key read of the counters, without running its query
+or serializing anything.
+
+The versions are read before the query and both reads go to the primary, so
+a response is never tagged with a version newer than its data; a lagging
+secondary could otherwise pin a stale response behind a current ETag.
+Compressed responses carry the weak form of the ETag (W/"..."), like nginx
+does; If-None-Match uses weak comparison, so both forms match.
+"""
+import hashlib
+from typing import Iterable, Optional
+from fastapi import Request, Response, status
+from config import settings
+from database import READ_ANALYTICS, READ_PRIMARY
+from services.counter_service import get_versions
+
+# Part of every ETag; bump when the JSON of the tagged routes changes shape
+REPRESENTATION_VERSION = 1
+
+# Caches may store responses but must revalidate them on every use
+CACHE_CONTROL = "private, no-cache"
+
+
+def tagged_read_policy() -> str:
+    """
+    Read policy for the queries of ETag-tagged routes (see module docstring).
+    
+    With ETags on, reads that READ_ANALYTICS would send to secondaries go
+    to the primary instead; turning ETAGS_ENABLED off moves them back.
+    """
+    return READ_PRIMARY if settings.ETAGS_ENABLED else READ_ANALYTICS
+
+
+def make_etag(request: Request, versions: dict) -> str:
+    """
+    Build the strong ETag of a request for the given collection versions.
+    
+    Args:
+        request: Incoming request (path and query parameters)
+        versions: Collection name to version, from get_versions
+        
+    Returns:
+        Quoted ETag value
+    """
+    parts = [str(REPRESENTATION_VERSION), request.url.path]
+    parts.extend(f"{key}={value}" for key, value in sorted(request.query_params.multi_items()))
+    parts.extend(f"{name}:{versions[name]}" for name in sorted(versions))
+    digest = hashlib.blake2b("\n".join(parts).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+async def conditional_get(request: Request, response: Response, collections: Iterable[str]) -> Optional[Response]:
+    """
+    Tag a GET response with the ETag of the collections it reads.
+    
+    Args:
+        request: Incoming request
+        response: The route's injected Response, which receives the ETag
+        collections: Collections the route's response is computed from
+        
+    Returns:
+        A 304 response to return as is when the client's copy is current,
+        otherwise None (and the route runs its query). The versions read are
+        left in `request.state.collection_versions` (None when ETags are off)
+        for validating read cache entries.
+    """
+    request.state.collection_versions = None
+    if not settings.ETAGS_ENABLED:
+        return None
+    
+    versions = await get_versions(collections)
+    request.state.collection_versions = versions
+    etag = make_etag(request, versions)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,78 @@
+"""
+Fast JSON responses for list endpoints.
+
+List routes used to build a validated Pydantic model per row, which FastAPI
+then validated and serialized a second time for `response_model` before
+json.dumps encoded it. With FAST_JSON_RESPONSES enabled, rows are built as
+plain dicts of the response schema (the routes' *_doc_to_dict helpers) and
+returned in a FastJSONResponse, which FastAPI sends as is: `response_model`
+still documents the schema, but nothing is validated or converted again.
+
+FastJSONResponse is also the apps' default response class, so every other
+route is encoded with orjson too. Without orjson installed it falls back to
+the standard json module with the same output.
+"""
+import json
+from datetime import date, datetime
+from typing import Any, Callable, Iterable, Optional
+from bson import ObjectId
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from config import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """Encode values the JSON encoders do not handle natively."""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if orjson is None and isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded with orjson; datetimes and ObjectIds are handled like Pydantic."""
+    
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, default=_default)
+        return json.dumps(
+            content, default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode("utf-8")
+
+
+def list_response(
+    docs: Iterable[dict],
+    to_dict: Callable[[dict], dict],
+    to_model: Callable[[dict], Any],
+    response: Optional[Response] = None
+):
+    """
+    Serialize the rows of a list endpoint.
+    
+    Args:
+        docs: MongoDB documents
+        to_dict: Builds the response schema of one document as a plain dict
+        to_model: Builds the validated response model of one document
+        response: The route's injected Response; headers set on it (e.g.
+            X-Next-Cursor) are copied to the returned response
+            
+    Returns:
+        A FastJSONResponse of plain dicts, or a list of models for
+        `response_model` validation when FAST_JSON_RESPONSES is off
+    """
+    if not settings.FAST_JSON_RESPONSES:
+        return [to_model(doc) for doc in docs]
+    
+    headers = None
+    if response is not None:
+        headers = {
+            key: value for key, value in response.headers.items()
+            if key not in ("content-length", "content-type")
+        }
+    return FastJSONResponse([to_dict(doc) for doc in docs], headers=headers)
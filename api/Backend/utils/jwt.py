@@ -1,16 +1,103 @@
 """
 JWT token utilities for authentication.
+
+python-jose is imported by the functions that sign and verify tokens, so it
+is loaded on the first authenticated request instead of at startup.
 """
+import hashlib
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from config import settings
+from models.user import UserRole
 
 security = HTTPBearer()
 
 
+class TokenCache:
+    """
+    Bounded LRU cache of verified token payloads.
+    
+    Entries are keyed by the SHA-256 digest of the token (the raw token is
+    never stored) and expire at the token's own `exp` claim, so a cached
+    token is never accepted after it would have failed verification.
+    """
+    
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+    
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+    
+    def get(self, token: str) -> Optional[dict]:
+        """
+        Return the cached payload of a token, if present and not expired.
+        
+        Args:
+            token: JWT token string
+            
+        Returns:
+            Decoded payload, or None on a miss
+        """
+        key = self._key(token)
+        entry = self._entries.get(key)
+        
+        if entry is None or entry[1] <= time.time():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+    
+    def put(self, token: str, payload: dict):
+        """
+        Cache a verified payload until the token's `exp` claim.
+        
+        Args:
+            token: JWT token string
+            payload: Payload returned by a successful jwt.decode
+        """
+        expires_at = payload.get("exp")
+        if not isinstance(expires_at, (int, float)) or self.maxsize <= 0:
+            return
+        
+        key = self._key(token)
+        self._entries[key] = (payload, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Drop all cached payloads and reset the counters."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+    
+    def stats(self) -> dict:
+        """Return cache size and hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / lookups, 4) if lookups else 0
+        }
+
+
+token_cache = TokenCache(settings.JWT_CACHE_SIZE)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT access token.
@@ -22,6 +109,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     Returns:
         Encoded JWT token string
     """
+    from jose import jwt
+    
     to_encode = data.copy()
     
     if expires_delta:
@@ -52,12 +141,21 @@ def verify_token(token: str) -> dict:
     Raises:
         HTTPException: If token is invalid or expired
     """
+    if settings.JWT_CACHE_ENABLED:
+        payload = token_cache.get(token)
+        if payload is not None:
+            return payload
+    
+    from jose import JWTError, jwt
+    
     try:
         payload = jwt.decode(
             token, 
             settings.JWT_SECRET_KEY, 
             algorithms=[settings.JWT_ALGORITHM]
         )
+        if settings.JWT_CACHE_ENABLED:
+            token_cache.put(token, payload)
         return payload
     except JWTError:
         raise HTTPException(
@@ -96,3 +194,16 @@ async def get_current_user(
     return {"username": username, "role": payload.get("role")}
 
 
+async def require_admin(current_user: dict = Depends(get_current_user)) -> dict:
+    """
+    Dependency allowing only administrators.
+    
+    Raises:
+        HTTPException: 403 if the authenticated user is not an admin
+    """
+    if current_user.get("role") != UserRole.ADMIN.value:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Administrator access required"
+        )
+    return current_user
@@ -0,0 +1,110 @@
+"""
+Keyset (cursor) pagination utilities.
+
+Cursors are opaque, URL-safe tokens that encode the sort key of the last row
+of a page. The next page is fetched with a range query on that key, so every
+page costs the same index seek regardless of how deep it is (unlike skip).
+"""
+import base64
+import json
+from typing import Optional
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException, Response, status
+
+# Response header carrying the cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+DEFAULT_PAGE_SIZE = 1000
+MAX_PAGE_SIZE = 1000
+
+# Numeric ID order; studentId breaks ties between IDs of the same number
+STUDENT_SORT = [("studentNumber", 1), ("studentId", 1)]
+
+
+def encode_cursor(data: dict) -> str:
+    """
+    Encode a sort key into an opaque cursor token.
+    
+    Args:
+        data: JSON-serializable sort key values
+        
+    Returns:
+        URL-safe cursor string
+    """
+    raw = json.dumps(data, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """
+    Decode a cursor token produced by encode_cursor.
+    
+    Args:
+        cursor: Cursor string from a previous response
+        
+    Returns:
+        Decoded sort key values
+        
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(data, dict):
+            raise ValueError("cursor must encode an object")
+        return data
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def student_cursor_filter(cursor: str) -> dict:
+    """Build the range filter for students sorted by STUDENT_SORT."""
+    data = decode_cursor(cursor)
+    if not isinstance(data.get("s"), str) or type(data.get("n")) is not int:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return {
+        "$or": [
+            {"studentNumber": {"$gt": data["n"]}},
+            {"studentNumber": data["n"], "studentId": {"$gt": data["s"]}}
+        ]
+    }
+
+
+def student_cursor(doc: dict) -> str:
+    """Cursor positioned after a student document."""
+    return encode_cursor({"n": doc["studentNumber"], "s": doc["studentId"]})
+
+
+def marks_cursor_filter(cursor: str) -> dict:
+    """Build the range filter for marks sorted by year desc, term asc, _id asc."""
+    data = decode_cursor(cursor)
+    try:
+        year = int(data["y"])
+        term = str(data["t"])
+        last_id = ObjectId(data["i"])
+    except (KeyError, TypeError, ValueError, InvalidId):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    
+    return {
+        "$or": [
+            {"year": {"$lt": year}},
+            {"year": year, "term": {"$gt": term}},
+            {"year": year, "term": term, "_id": {"$gt": last_id}}
+        ]
+    }
+
+
+def marks_cursor(doc: dict) -> str:
+    """Cursor positioned after a marks document."""
+    return encode_cursor({"y": doc["year"], "t": doc["term"], "i": str(doc["_id"])})
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]):
+    """Expose the next page cursor on the response, if there is one."""
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
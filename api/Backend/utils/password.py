@@ -1,10 +1,33 @@
 """
 Password hashing utilities using bcrypt.
+
+bcrypt is deliberately slow (hundreds of milliseconds per call), so the
+async variants run it on a dedicated, bounded thread pool instead of the
+event loop. Use them from request handlers and services.
+
+passlib and bcrypt are imported on the first hash or verify (login, user
+creation, seeding), not at startup, since most requests never need them.
 """
-from passlib.context import CryptContext
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from config import settings
+from utils.metrics import metrics
+
+# Dedicated pool so hashing never competes with (or exhausts) the loop's default executor.
+# Threads are only started when the first task is submitted.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="bcrypt"
+)
 
-# Configure bcrypt password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    """Return the bcrypt CryptContext, importing passlib on first use."""
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 def hash_password(password: str) -> str:
@@ -17,7 +40,10 @@ def hash_password(password: str) -> str:
     Returns:
         Hashed password string
     """
-    return pwd_context.hash(password)
+    start = time.perf_counter()
+    hashed = get_pwd_context().hash(password)
+    metrics.observe_password_hashing("hash", time.perf_counter() - start)
+    return hashed
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -31,6 +57,38 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         True if password matches, False otherwise
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    start = time.perf_counter()
+    matches = get_pwd_context().verify(plain_password, hashed_password)
+    metrics.observe_password_hashing("verify", time.perf_counter() - start)
+    return matches
 
 
+async def hash_password_async(password: str) -> str:
+    """
+    Hash a password on the bcrypt thread pool without blocking the event loop.
+    
+    Args:
+        password: Plain text password
+        
+    Returns:
+        Hashed password string
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password on the bcrypt thread pool without blocking the event loop.
+    
+    Args:
+        plain_password: Plain text password to verify
+        hashed_password: Hashed password to compare against
+        
+    Returns:
+        True if password matches, False otherwise
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _hash_executor, verify_password, plain_password, hashed_password
+    )
@@ -0,0 +1,64 @@
+"""
+Text normalization helpers for student search.
+
+Student documents store a normalized copy of the name (`nameLower`) and its
+words (`nameWords`). Both are indexed, so searches become anchored prefix
+queries on lowercase fields, which MongoDB serves from the index instead of
+scanning the collection with a case-insensitive regex.
+"""
+import re
+import unicodedata
+from typing import List
+
+_WORD_SPLIT = re.compile(r"[^\w]+")
+_STUDENT_ID_QUERY = re.compile(r"^(?:stu-?)?(\d+)$", re.IGNORECASE)
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text for case- and accent-insensitive matching.
+    
+    Args:
+        text: Raw text (e.g. a student name or search query)
+        
+    Returns:
+        Lowercase text without accents and with single spaces
+    """
+    if not text.isascii():
+        decomposed = unicodedata.normalize("NFKD", text)
+        text = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(text.casefold().split())
+
+
+def name_words(normalized: str) -> List[str]:
+    """Split normalized text into its distinct words."""
+    return sorted({word for word in _WORD_SPLIT.split(normalized) if word})
+
+
+def name_search_fields(name: str) -> dict:
+    """
+    Build the search fields stored on a student document.
+    
+    Args:
+        name: Student name
+        
+    Returns:
+        Dict with `nameLower` and `nameWords`
+    """
+    normalized = normalize_text(name)
+    return {"nameLower": normalized, "nameWords": name_words(normalized)}
+
+
+def prefix_regex(prefix: str) -> dict:
+    """Anchored, escaped regex matching values that start with `prefix`."""
+    return {"$regex": f"^{re.escape(prefix)}"}
+
+
+def student_id_prefix(query: str) -> str:
+    """
+    Return the studentId prefix a query refers to, or an empty string.
+    
+    Accepts "STU-001", "stu-00", "stu0" or just the digits ("001").
+    """
+    match = _STUDENT_ID_QUERY.match(query.strip())
+    return f"STU-{match.group(1)}" if match else ""
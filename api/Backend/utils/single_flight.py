@@ -0,0 +1,104 @@
+"""
+Request coalescing ("single flight") for identical concurrent reads.
+
+When many clients ask for the same data at once (a class of teachers
+opening the dashboard), only the first request runs the query; requests
+for the same key that arrive while it is in flight await the same result
+instead of running the query again:
+
+    students = await single_flight.do(key, lambda: collection.find(query).to_list(...), versions)
+
+Keys must identify the query completely (route plus every parameter, see
+read_cache.cache_key). ETag routes also pass the collection versions they
+read (request.state.collection_versions), so a request that starts after a
+write never joins a query started before it. Without versions a joined
+request may get the result of a query that started just before a write
+completed, the same bounded lag as an analytics read.
+
+The query runs in its own task, so a client disconnecting does not cancel
+it for the others. Followers share the leader's result object, which must
+be treated as read-only. Counts per group (the key's namespace) are
+exported as singleflight_* metrics.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+from config import settings
+
+
+class SingleFlight:
+    """Per-worker registry of in-flight calls by key."""
+    
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._calls: Dict[str, asyncio.Future] = {}
+        self.reset_stats()
+    
+    def reset_stats(self):
+        """Reset the executed and collapsed call counters."""
+        self.executed: Dict[str, int] = {}
+        self.collapsed: Dict[str, int] = {}
+    
+    @staticmethod
+    def _group(key: str) -> str:
+        return key.split(":", 1)[0].split("?", 1)[0]
+    
+    async def do(self, key: str, call: Callable[[], Awaitable[Any]], versions: Optional[dict] = None) -> Any:
+        """
+        Run `call()` unless an identical call is in flight, and return its result.
+        
+        Args:
+            key: Identifies the query and all of its parameters
+            call: Coroutine function running the query
+            versions: Collection versions the caller read, if any
+            
+        Returns:
+            The result of `call()` (or of the in-flight call it joined)
+            
+        Raises:
+            Whatever `call()` raised; every joined caller gets the same error
+        """
+        if not self.enabled:
+            return await call()
+        
+        group = self._group(key)
+        if versions:
+            key = key + "#" + ",".join(f"{name}={versions[name]}" for name in sorted(versions))
+        
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(call())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+            self.executed[group] = self.executed.get(group, 0) + 1
+        else:
+            self.collapsed[group] = self.collapsed.get(group, 0) + 1
+        
+        # A cancelled caller must not cancel the call for the others
+        return await asyncio.shield(task)
+    
+    def _finish(self, key: str, task: asyncio.Future):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the error as retrieved in case every caller went away
+        if not task.cancelled():
+            task.exception()
+    
+    def stats(self) -> dict:
+        """Executed and collapsed calls per group, and calls in flight."""
+        groups = {}
+        for group in sorted(set(self.executed) | set(self.collapsed)):
+            executed = self.executed.get(group, 0)
+            collapsed = self.collapsed.get(group, 0)
+            groups[group] = {
+                "executed": executed,
+                "collapsed": collapsed,
+                "collapsedRate": round(collapsed / (executed + collapsed), 4) if executed + collapsed else 0
+            }
+        return {
+            "enabled": self.enabled,
+            "inFlight": len(self._calls),
+            "groups": groups
+        }
+
+
+single_flight = SingleFlight(enabled=settings.SINGLE_FLIGHT_ENABLED)
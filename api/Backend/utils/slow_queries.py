@@ -0,0 +1,242 @@
+"""
+Slow MongoDB command log with optional explain capture.
+
+A pymongo CommandListener times every command; commands slower than
+SLOW_QUERY_THRESHOLD_MS are logged as structured JSON ("[SLOW QUERY] {...}")
+and kept in a bounded in-memory log served by GET /admin/slow-queries.
+Each entry records the route that issued the command, the command and
+collection, the duration and the *shape* of its filter: values are replaced
+by "?" so entries group by query pattern and no student data is logged.
+
+The route comes from a context variable set by RequestScopeMiddleware;
+Motor copies the request's context into the driver thread that runs the
+command, so the listener sees the route of the request being served.
+
+With SLOW_QUERY_EXPLAIN enabled (debug mode), a sample of slow reads is
+re-run as `explain` (queryPlanner verbosity, nothing is executed) on a
+background thread; the winning plan's stages are attached to the entry and
+collection scans are flagged with "collscan": true.
+"""
+import json
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from pymongo import monitoring
+from config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# ASGI scope of the request being handled (None outside requests)
+request_scope: ContextVar[Optional[dict]] = ContextVar("request_scope", default=None)
+
+# Driver housekeeping and our own explain commands are never logged
+IGNORED_COMMANDS = {
+    "hello", "ismaster", "isMaster", "ping", "buildInfo", "saslStart", "saslContinue",
+    "endSessions", "killCursors", "explain"
+}
+
+# Read commands that can be explained without side effects
+EXPLAINABLE_COMMANDS = {"find", "aggregate", "count", "distinct"}
+
+# Fields of a command that hold its filter
+FILTER_FIELDS = {"find": "filter", "count": "query", "distinct": "query", "findAndModify": "query"}
+
+
+def value_shape(value: Any) -> Any:
+    """Replace the values of a filter with "?", keeping field and operator names."""
+    if isinstance(value, dict):
+        return {key: value_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)) and value and all(isinstance(item, dict) for item in value):
+        return [value_shape(item) for item in value]
+    return "?"
+
+
+def command_shape(command_name: str, command: dict) -> Any:
+    """
+    Describe the query pattern of a command.
+    
+    Returns:
+        Filter shape for finds/counts/updates/deletes, the list of stages
+        (with the $match shapes) for aggregations, or None
+    """
+    if command_name == "aggregate":
+        stages = []
+        for stage in command.get("pipeline", []):
+            name = next(iter(stage), "?")
+            stages.append({name: value_shape(stage[name])} if name == "$match" else name)
+        return stages
+    if command_name in ("update", "delete"):
+        statements = command.get("updates" if command_name == "update" else "deletes") or [{}]
+        return value_shape(statements[0].get("q", {}))
+    field = FILTER_FIELDS.get(command_name)
+    return value_shape(command.get(field, {})) if field else None
+
+
+def current_route() -> str:
+    """Route template (or raw path) of the request being handled."""
+    scope = request_scope.get()
+    if scope is None:
+        return "-"
+    route = scope.get("route")
+    return f"{scope['method']} {getattr(route, 'path', scope['path'])}"
+
+
+def plan_stages(explain: Any, in_plan: bool = False) -> List[dict]:
+    """Collect the stages (and index names) of every winning plan in an explain result."""
+    stages = []
+    if isinstance(explain, dict):
+        if in_plan and "stage" in explain:
+            stages.append({"stage": explain["stage"], "index": explain.get("indexName")})
+        for key, value in explain.items():
+            stages.extend(plan_stages(value, in_plan or key in ("winningPlan", "queryPlan")))
+    elif isinstance(explain, list):
+        for item in explain:
+            stages.extend(plan_stages(item, in_plan))
+    return stages
+
+
+class SlowQueryLog(monitoring.CommandListener):
+    """Command listener keeping the most recent slow commands."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Dict[tuple, tuple] = {}
+        self._explain_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain")
+        self.client = None
+        self.reset()
+    
+    def reset(self):
+        """Clear the log."""
+        with self._lock:
+            self.entries = deque(maxlen=settings.SLOW_QUERY_LOG_SIZE)
+            self.patterns: Dict[str, dict] = {}
+    
+    def started(self, event):
+        if event.command_name in IGNORED_COMMANDS:
+            return
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (
+                event.command, event.database_name, current_route()
+            )
+    
+    def succeeded(self, event):
+        self._finish(event)
+    
+    def failed(self, event):
+        self._finish(event)
+    
+    def _finish(self, event):
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+        duration_ms = event.duration_micros / 1000
+        if pending is None or duration_ms < settings.SLOW_QUERY_THRESHOLD_MS:
+            return
+        
+        command, database_name, route = pending
+        command_name = event.command_name
+        entry = {
+            "time": datetime.utcnow().isoformat() + "Z",
+            "route": route,
+            "command": command_name,
+            "collection": command.get(command_name) if isinstance(command.get(command_name), str) else None,
+            "durationMs": round(duration_ms, 1),
+            "shape": command_shape(command_name, command),
+            "failed": isinstance(event, monitoring.CommandFailedEvent)
+        }
+        if command_name == "find" and command.get("sort"):
+            entry["sort"] = list(command["sort"])
+        
+        pattern = json.dumps([route, command_name, entry["collection"], entry["shape"]], default=str)
+        with self._lock:
+            self.entries.append(entry)
+            stats = self.patterns.setdefault(pattern, {
+                "route": route, "command": command_name, "collection": entry["collection"],
+                "shape": entry["shape"], "count": 0, "totalMs": 0.0, "maxMs": 0.0, "collscan": None
+            })
+            stats["count"] += 1
+            stats["totalMs"] += duration_ms
+            stats["maxMs"] = max(stats["maxMs"], duration_ms)
+        
+        logger.warning(f"[SLOW QUERY] {json.dumps(entry, default=str)}")
+        
+        if (settings.SLOW_QUERY_EXPLAIN and self.client is not None
+                and command_name in EXPLAINABLE_COMMANDS
+                and random.random() < settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE):
+            self._explain_executor.submit(self._explain, entry, pattern, command, database_name)
+    
+    def _explain(self, entry: dict, pattern: str, command: dict, database_name: str):
+        """Run explain for a logged command and attach its plan (background thread)."""
+        # Session, cluster time and read preference fields are not part of the command itself
+        original = {
+            key: value for key, value in command.items()
+            if not key.startswith("$") and key not in ("lsid", "txnNumber")
+        }
+        try:
+            result = self.client[database_name].command(
+                {"explain": original, "verbosity": "queryPlanner"}
+            )
+        except Exception as e:
+            logger.warning(f"[SLOW QUERY] explain failed for {entry['command']} on {entry['collection']}: {e}")
+            return
+        
+        stages = plan_stages(result)
+        collscan = any(stage["stage"] == "COLLSCAN" for stage in stages)
+        with self._lock:
+            entry["plan"] = stages
+            entry["collscan"] = collscan
+            if pattern in self.patterns:
+                self.patterns[pattern]["collscan"] = collscan
+        
+        if collscan:
+            logger.warning(f"[SLOW QUERY] COLLSCAN {json.dumps(entry, default=str)}")
+    
+    def report(self, limit: int = 50) -> dict:
+        """
+        Recent slow commands and totals per query pattern.
+        
+        Args:
+            limit: Maximum number of recent entries
+            
+        Returns:
+            Dict with settings, the newest entries first and patterns by total time
+        """
+        with self._lock:
+            entries = list(self.entries)[-limit:][::-1] if limit > 0 else []
+            patterns = sorted(
+                ({**stats, "totalMs": round(stats["totalMs"], 1), "maxMs": round(stats["maxMs"], 1)}
+                 for stats in self.patterns.values()),
+                key=lambda stats: stats["totalMs"],
+                reverse=True
+            )
+        return {
+            "thresholdMs": settings.SLOW_QUERY_THRESHOLD_MS,
+            "explain": settings.SLOW_QUERY_EXPLAIN,
+            "entries": entries,
+            "patterns": patterns
+        }
+
+
+slow_query_log = SlowQueryLog()
+
+
+class RequestScopeMiddleware:
+    """ASGI middleware exposing the current request's scope to command listeners."""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        token = request_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_scope.reset(token)
@@ -2,8 +2,10 @@
 Vercel Serverless Function Entry Point for FastAPI
 This file is used when deploying to Vercel
 """
+import asyncio
 import os
 import sys
+import time
 from pathlib import Path
 import logging
 
@@ -37,15 +39,22 @@ else:
 
 # Now import FastAPI and backend modules
 from fastapi import FastAPI, Response
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 try:
     from config import settings
-    from database import connect_to_mongo
-    from services.seed_service import SeedService
+    from database import connect_client, connect_to_mongo
     from routes.auth import router as auth_router
     from routes.students import router as students_router
     from routes.marks import router as marks_router
+    from routes.imports import router as imports_router
+    from routes.admin import router as admin_router
+    from utils.compression import CompressionMiddleware
+    from utils.fast_json import FastJSONResponse
+    from utils.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, metrics
+    from utils.pool_metrics import pool_metrics
+    from utils.slow_queries import RequestScopeMiddleware
     logger.info("[OK] All imports successful")
 except ImportError as e:
     logger.error(f"[ERROR] Import failed: {e}")
@@ -59,6 +68,7 @@ app = FastAPI(
     title="Student Academic Management System",
     description="A comprehensive system for managing students and their academic marks",
     version="1.0.0",
+    default_response_class=FastJSONResponse,
     docs_url="/api/docs",
     redoc_url="/api/redoc"
 )
@@ -94,6 +104,8 @@ async def options_handler(full_path: str):
 app.include_router(auth_router)
 app.include_router(students_router)
 app.include_router(marks_router)
+app.include_router(imports_router)
+app.include_router(admin_router)
 
 @app.get("/", tags=["Root"])
 @app.get("/api", tags=["Root"])
@@ -116,6 +128,21 @@ async def health_check():
         "db_initialized": _initialized
     }
 
+@app.get("/health/pool", tags=["Health"])
+@app.get("/api/health/pool", tags=["Health"])
+async def pool_health():
+    """MongoDB connection pool metrics for this instance."""
+    return {
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        **pool_metrics.stats()
+    }
+
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse)
+@app.get("/api/metrics", tags=["Health"], response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Prometheus metrics for this instance (text exposition format)."""
+    return PlainTextResponse(metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
 @app.get("/debug", tags=["Debug"])
 async def debug_info():
     """Debug endpoint - shows system info without DB."""
@@ -136,19 +163,45 @@ async def debug_info():
 
 # Initialize database connection on first request
 _initialized = False
+_init_lock = asyncio.Lock()
 
 async def initialize_db():
-    """Initialize database connection (called on first request)."""
+    """
+    Initialize database connection (called on every request).
+    
+    Single-flight: once initialized, requests only check a flag; on a cold
+    instance concurrent first requests wait for one initialization instead
+    of each running their own. By default this only creates the Motor client
+    (no round trip) - indexes and seed data come from 'python manage.py
+    migrate' / 'seed' at deploy time. Set SERVERLESS_AUTO_SETUP=true to do
+    the full setup on the first request instead.
+    """
     global _initialized
-    if not _initialized:
+    if _initialized:
+        return
+    
+    async with _init_lock:
+        if _initialized:
+            return
         try:
+            start = time.perf_counter()
             logger.info("[INFO] Starting database initialization...")
-            await connect_to_mongo()
-            logger.info("[INFO] MongoDB connected, starting seed...")
-            seed_service = SeedService()
-            await seed_service.run_all_seeds()
+            if settings.SERVERLESS_AUTO_SETUP:
+                from services.seed_service import SeedService
+                from services.stats_service import StatsService
+                from services.student_service import StudentService
+                
+                await connect_to_mongo()
+                logger.info("[INFO] MongoDB connected, starting seed...")
+                seed_service = SeedService()
+                await seed_service.run_all_seeds()
+                await StatsService().ensure_initialized()
+                await StudentService().backfill_search_fields()
+                await StudentService().backfill_student_numbers()
+            else:
+                connect_client()
             _initialized = True
-            logger.info("[OK] Database initialized successfully")
+            logger.info(f"[OK] Database initialized in {(time.perf_counter() - start) * 1000:.0f} ms")
         except Exception as e:
             logger.error(f"[ERROR] Database init failed: {e}")
             logger.exception("Full error traceback:")
@@ -175,6 +228,18 @@ async def init_db_middleware(request, call_next):
     
     return response
 
+# Compress text/JSON responses, including streamed exports
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Route of the current request for the slow query log
+if settings.SLOW_QUERY_THRESHOLD_MS > 0:
+    app.add_middleware(RequestScopeMiddleware)
+
+# Request metrics for GET /metrics (added last, so it also times DB initialization)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Vercel serverless function handler
 # Vercel's Python runtime supports ASGI natively - no Mangum needed!
 # Just export the app directly - Vercel will handle the rest